@@ -0,0 +1,153 @@
+# ArquivoPaginas.py
+#
+# Arquivo único dividido em páginas de tamanho fixo, endereçadas por id.
+# A página 0 é o cabeçalho; as demais guardam um bloco de bytes cada, com
+# um prefixo de 4 bytes indicando o tamanho útil. Toda leitura e escrita de
+# página passa por os.pread/os.pwrite e é contada em 'contador', no mesmo
+# formato do disk_counter das árvores.
+#
+# Com um log (WAL) associado, nenhuma página pode chegar ao disco antes dos
+# registros que a descrevem: enquanto o log tiver registros não duráveis, as
+# escritas ficam adiadas em memória e são aplicadas por aplicar_adiadas()
+# logo após o fsync do log.
+
+import os
+import pickle
+import struct
+
+TAMANHO_PAGINA_PADRAO = 4096
+
+_MAGICO = b'BTPG'
+# mágico, tamanho da página, total de páginas, início da lista livre, tamanho dos metadados
+_CABECALHO = struct.Struct('<4sIqqI')
+_TAMANHO = struct.Struct('<I')
+_LIVRE = 0xFFFFFFFF  # marca de página liberada; seguida do id da próxima livre
+_PROXIMA_LIVRE = struct.Struct('<q')
+
+if hasattr(os, 'pread'):
+    _pread = os.pread
+    _pwrite = os.pwrite
+else:
+    # Windows não tem pread/pwrite: posiciona e lê/escreve
+    def _pread(fd, n, pos):
+        os.lseek(fd, pos, os.SEEK_SET)
+        return os.read(fd, n)
+
+    def _pwrite(fd, dados, pos):
+        os.lseek(fd, pos, os.SEEK_SET)
+        return os.write(fd, dados)
+
+
+class ArquivoPaginas:
+    def __init__(self, caminho, tamanho_pagina=TAMANHO_PAGINA_PADRAO, novo=False):
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+        if novo:
+            flags |= os.O_TRUNC
+        self.caminho = caminho
+        self.fd = os.open(caminho, flags, 0o644)
+        self.contador = {'reads': 0, 'writes': 0}
+        # Metadados livres do usuário do arquivo (raiz, grau, ...), gravados no cabeçalho
+        self.metadados = {}
+        # Alocações e liberações mudam o cabeçalho; ele é regravado sob demanda
+        self.cabecalho_pendente = False
+        self.log = None
+        self.adiadas = {}
+
+        if os.fstat(self.fd).st_size == 0:
+            if tamanho_pagina < _CABECALHO.size + _PROXIMA_LIVRE.size + _TAMANHO.size:
+                raise ValueError(f"Tamanho de página muito pequeno: {tamanho_pagina} bytes.")
+            self.tamanho_pagina = tamanho_pagina
+            self.total_paginas = 1
+            self.livre = 0
+            self.gravar_cabecalho()
+        else:
+            self._ler_cabecalho()
+
+    @property
+    def capacidade(self):
+        """Bytes úteis por página."""
+        return self.tamanho_pagina - _TAMANHO.size
+
+    def _ler_cabecalho(self):
+        bruto = _pread(self.fd, _CABECALHO.size, 0)
+        magico, tamanho, total, livre, n_meta = _CABECALHO.unpack(bruto)
+        if magico != _MAGICO:
+            raise ValueError(f"{self.caminho} não é um arquivo de páginas.")
+        self.tamanho_pagina = tamanho
+        self.total_paginas = total
+        self.livre = livre
+        self.metadados = pickle.loads(_pread(self.fd, n_meta, _CABECALHO.size)) if n_meta else {}
+        self.contador['reads'] += 1
+
+    def gravar_cabecalho(self):
+        meta = pickle.dumps(self.metadados) if self.metadados else b''
+        if _CABECALHO.size + len(meta) > self.tamanho_pagina:
+            raise ValueError("Metadados não cabem na página de cabeçalho.")
+        bruto = _CABECALHO.pack(_MAGICO, self.tamanho_pagina, self.total_paginas, self.livre, len(meta)) + meta
+        _pwrite(self.fd, bruto.ljust(self.tamanho_pagina, b'\0'), 0)
+        self.contador['writes'] += 1
+        self.cabecalho_pendente = False
+
+    def _ler_pagina(self, pid, n):
+        bruto = self.adiadas.get(pid)
+        if bruto is not None:
+            return bruto[:n]
+        self.contador['reads'] += 1
+        return _pread(self.fd, n, pid * self.tamanho_pagina)
+
+    def _gravar_pagina(self, pid, bruto):
+        bruto = bruto.ljust(self.tamanho_pagina, b'\0')
+        if self.log is not None and self.log.pendente:
+            self.adiadas[pid] = bruto
+            return
+        _pwrite(self.fd, bruto, pid * self.tamanho_pagina)
+        self.contador['writes'] += 1
+
+    def aplicar_adiadas(self):
+        """Grava as páginas retidas enquanto o log não estava durável."""
+        adiadas, self.adiadas = self.adiadas, {}
+        for pid, bruto in adiadas.items():
+            _pwrite(self.fd, bruto, pid * self.tamanho_pagina)
+            self.contador['writes'] += 1
+
+    def ler(self, pid):
+        bruto = self._ler_pagina(pid, self.tamanho_pagina)
+        (n,) = _TAMANHO.unpack_from(bruto)
+        if n == _LIVRE:
+            raise ValueError(f"Página {pid} está livre.")
+        return bruto[_TAMANHO.size:_TAMANHO.size + n]
+
+    def escrever(self, pid, dados):
+        if len(dados) > self.capacidade:
+            raise ValueError(f"Bloco de {len(dados)} bytes não cabe na página de {self.tamanho_pagina} bytes; "
+                             "reduza t ou aumente o tamanho da página.")
+        self._gravar_pagina(pid, _TAMANHO.pack(len(dados)) + dados)
+
+    def alocar(self):
+        """Reserva uma página, reaproveitando a lista livre antes de crescer o arquivo."""
+        if self.livre:
+            pid = self.livre
+            bruto = self._ler_pagina(pid, _TAMANHO.size + _PROXIMA_LIVRE.size)
+            (self.livre,) = _PROXIMA_LIVRE.unpack_from(bruto, _TAMANHO.size)
+        else:
+            pid = self.total_paginas
+            self.total_paginas += 1
+        self.cabecalho_pendente = True
+        return pid
+
+    def liberar(self, pid):
+        self.gravar_livre(pid, self.livre)
+        self.livre = pid
+        self.cabecalho_pendente = True
+
+    def gravar_livre(self, pid, proxima):
+        """Marca a página como livre, encadeada à página livre 'proxima'."""
+        self._gravar_pagina(pid, _TAMANHO.pack(_LIVRE) + _PROXIMA_LIVRE.pack(proxima))
+
+    def sincronizar(self):
+        os.fsync(self.fd)
+
+    def fechar(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
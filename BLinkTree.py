@@ -0,0 +1,399 @@
+# BLinkTree.py
+#
+# Árvore B-link (Lehman e Yao): uma Árvore B+ em que todo nó, de qualquer
+# nível, tem um ponteiro para o irmão da direita ('next') e uma chave alta
+# ('alta', o limite superior exclusivo das chaves alcançáveis por ele; None
+# no último nó do nível). Quem chega a um nó que acabou de ser dividido e
+# procura uma chave >= alta simplesmente segue 'next', em vez de recomeçar
+# ou esperar o fim do split.
+#
+# Leituras não pegam latch: cada nó tem um contador de versão, ímpar
+# enquanto um escritor o altera. O leitor lê o que precisa do nó e confere
+# que a versão não mudou; se mudou (ou estava ímpar) lê de novo, esperando na
+# trava do nó só quando encontra uma escrita em andamento.
+#
+# Escritores descem do mesmo jeito, travam só a folha (andando para a
+# direita se preciso) e dividem de baixo para cima: a trava do filho é
+# mantida até a do pai ser pega, então cada inserção segura no máximo duas
+# travas por vez. A ordem (de baixo para cima, da esquerda para a direita)
+# não forma ciclos.
+#
+# Como no artigo, a remoção é preguiçosa: a chave sai da folha e os nós
+# nunca se fundem, então podem ficar abaixo da ocupação mínima (ou vazios),
+# mas nenhum nó deixa a árvore e os ponteiros 'next' continuam válidos.
+
+import threading
+from array import array
+
+from BPlusTree import BPlusTree, BPlusTreeNode
+from BuscaBinaria import posicao_chave, posicao_filho, indice_chave
+from Metricas import registrar
+
+
+class BLinkNode(BPlusTreeNode):
+    __slots__ = ('alta', 'versao', 'trava')
+
+    def __init__(self, t, folha=False):
+        super().__init__(t, folha)
+        self.alta = None
+        self.versao = 0
+        self.trava = threading.Lock()
+
+
+class BLinkTree(BPlusTree):
+    def __init__(self, t=3, compacta=False):
+        self._trava_raiz = threading.Lock()
+        super().__init__(t, compacta)
+
+    def _novo_no(self, folha):
+        node = BLinkNode(self.t, folha)
+        if self.compacta:
+            node.keys = array('q')
+        return node
+
+    @classmethod
+    def construir_em_massa(cls, chaves, t=3, fator_preenchimento=1.0, disk_counter=None, valores=None,
+                           compacta=False):
+        tree = super().construir_em_massa(chaves, t, fator_preenchimento, disk_counter, valores, compacta)
+        # A carga em massa só liga as folhas: liga os outros níveis e
+        # preenche as chaves altas
+        nivel = [tree.raiz]
+        while nivel:
+            for node, direita in zip(nivel, nivel[1:]):
+                node.next = direita
+                node.alta = _menor_chave(direita)
+            nivel[-1].next = None
+            nivel[-1].alta = None
+            nivel = [c for node in nivel if not node.folha for c in node.children]
+        return tree
+
+    # --- Leitura otimista ---
+
+    def _ler(self, node, ler):
+        # Executa 'ler(node)' até obter um resultado com a versão estável
+        while True:
+            versao = node.versao
+            if versao & 1:
+                # Escrita em andamento: espera na trava em vez de girar
+                with node.trava:
+                    pass
+                continue
+            try:
+                resultado = ler(node)
+            except IndexError:
+                continue
+            if node.versao == versao:
+                return resultado
+
+    def _passo(self, node, key, posicao=posicao_filho):
+        """(próximo nó, índice do filho); índice None = seguiu o 'next'."""
+        # Descendo com posicao_chave (início inclusivo de um range) a chave
+        # igual à alta fica neste nó: cópias repetidas dela podem estar aqui
+        passa = posicao is posicao_chave
+
+        def ler(n):
+            if key is not None and n.alta is not None and (key > n.alta if passa else key >= n.alta):
+                return n.next, None
+            if n.folha:
+                return None, None
+            i = 0 if key is None else posicao(n.keys, key)
+            return n.children[i], i
+        return self._ler(node, ler)
+
+    def _descer(self, key, disk_counter=None, trace_callback=None, path=None, mensagem=None,
+                posicao=posicao_filho, pilha=None):
+        # Desce até a folha que cobre 'key'. 'pilha' recebe os nós internos
+        # pelos quais a descida passou (os pais, para os splits).
+        node = self.raiz
+        while True:
+            if disk_counter is not None:
+                disk_counter['reads'] += 1
+            if trace_callback:
+                trace_callback(mensagem.format(keys=list(node.keys)), path, disk_counter)
+            prox, i = self._passo(node, key, posicao)
+            if prox is None:
+                return node
+            if i is None:
+                # Split concorrente: o irmão da direita cobre a chave
+                if path:
+                    path = path[:-1] + [path[-1] + 1]
+            else:
+                if pilha is not None:
+                    pilha.append(node)
+                if path is not None:
+                    path = path + [i]
+            node = prox
+
+    def _ler_folha(self, node, key, ler, disk_counter=None):
+        # A folha devolvida por _descer pode ser dividida antes de ser lida e
+        # a chave ir para o irmão: a chave alta é conferida na mesma leitura
+        # versionada que 'ler', seguindo 'next' como _passo
+        def ler_cobrindo(n):
+            if n.alta is not None and key >= n.alta:
+                return n.next, None
+            return None, ler(n)
+        while True:
+            prox, resultado = self._ler(node, ler_cobrindo)
+            if prox is None:
+                return resultado
+            node = prox
+            if disk_counter is not None:
+                disk_counter['reads'] += 1
+
+    def busca(self, key, disk_counter=None):
+        folha = self._descer(key, disk_counter)
+        return self._ler_folha(folha, key, lambda n: indice_chave(n.keys, key) >= 0, disk_counter)
+
+    def get(self, key, default=None, disk_counter=None):
+        folha = self._descer(key, disk_counter)
+
+        def ler(n):
+            idx = indice_chave(n.keys, key)
+            return n.values[idx] if idx >= 0 else default
+        return self._ler_folha(folha, key, ler, disk_counter)
+
+    def busca_com_trace(self, key, trace_callback):
+        disk_counter = {'reads': 0, 'writes': 0}
+        path = []
+        node = self.raiz
+        while True:
+            disk_counter['reads'] += 1
+            trace_callback(f"Analisando nó {node.keys} para buscar {key}", path, disk_counter)
+            prox, i = self._passo(node, key)
+            if prox is None:
+                break
+            if i is None:
+                trace_callback(f"Chave {key} >= chave alta {node.alta}: seguindo para o irmão", path, disk_counter)
+                path = path[:-1] + [path[-1] + 1] if path else path
+            else:
+                path = path + [i]
+            node = prox
+        if indice_chave(node.keys, key) >= 0:
+            trace_callback(f"Chave {key} encontrada na folha", path, disk_counter)
+            return True
+        trace_callback(f"Chave {key} não encontrada na folha", path, disk_counter)
+        return False
+
+    # Cada folha é lida de uma vez (versão estável) e entregue sem trava
+    # nenhuma. Se a folha for dividida depois de lida, a próxima passa a ser o
+    # nó novo, com chaves que já saíram: por isso a folha seguinte só entrega
+    # chaves >= a chave alta lida junto com a anterior.
+    def range(self, lo=None, hi=None, incluir_lo=True, incluir_hi=False, limite=None, disk_counter=None,
+              valores=False):
+        if limite is not None and limite <= 0:
+            return
+        posicao = posicao_chave if incluir_lo else posicao_filho
+        node = self._descer(lo, disk_counter, posicao=posicao)
+        minimo, incluir_minimo = lo, incluir_lo
+        entregues = 0
+        while node is not None:
+            keys, values, alta, prox = self._ler(node, lambda n: (n.keys[:], n.values[:], n.alta, n.next))
+            i = 0 if minimo is None else (posicao_chave if incluir_minimo else posicao_filho)(keys, minimo)
+            while i < len(keys):
+                k = keys[i]
+                if hi is not None and (k > hi or (k == hi and not incluir_hi)):
+                    return
+                yield (k, values[i]) if valores else k
+                entregues += 1
+                if limite is not None and entregues >= limite:
+                    return
+                i += 1
+            if alta is None:
+                return
+            minimo, incluir_minimo = alta, True
+            node = prox
+            if disk_counter is not None:
+                disk_counter['reads'] += 1
+
+    # --- Escrita ---
+
+    def _travar_cobrindo(self, node, key):
+        # Trava o nó que cobre 'key' no nível de 'node', andando para a direita
+        node.trava.acquire()
+        while node.alta is not None and key >= node.alta:
+            prox = node.next
+            prox.trava.acquire()
+            node.trava.release()
+            node = prox
+        return node
+
+    def _insere(self, key, trace_callback, disk_counter, valor=None, substituir=False):
+        pilha = []
+        # Sem trace nenhuma mensagem é formatada
+        modelo = f"Analisando nó {{keys}} para inserir {key}" if trace_callback else None
+        node = self._descer(key, disk_counter, trace_callback, [] if trace_callback else None, modelo,
+                            pilha=pilha)
+        path = self._caminho(pilha, node) if trace_callback else None
+        node = self._travar_cobrindo(node, key)
+        try:
+            i = posicao_chave(node.keys, key)
+            disk_counter['writes'] += 1
+            node.versao += 1
+            atualizou = substituir and i < len(node.keys) and node.keys[i] == key
+            if atualizou:
+                node.values[i] = valor
+            else:
+                node.keys.insert(i, key)
+                node.values.insert(i, valor)
+            node.versao += 1
+            self._modificado(node)
+            if trace_callback:
+                mensagem = (f"Atualizou o valor da chave {key} na folha" if atualizou
+                            else f"Inseriu chave {key} na folha")
+                trace_callback(mensagem, path, disk_counter)
+
+            # Splits de baixo para cima, com a trava do filho mantida até a do pai
+            while len(node.keys) > 2 * self.t - 1:
+                novo, separador = self._dividir(node, disk_counter)
+                if trace_callback:
+                    trace_callback(f"Split: nó dividido, {separador} sobe para o pai", path, disk_counter)
+                pai = pilha.pop() if pilha else None
+                if pai is None:
+                    with self._trava_raiz:
+                        if node is self.raiz:
+                            nova_raiz = self._novo_no(False)
+                            nova_raiz.keys.append(separador)
+                            nova_raiz.children = [node, novo]
+                            self.raiz = nova_raiz
+                            disk_counter['writes'] += 1
+                            registrar(disk_counter, 'raiz_cresceu')
+                            if trace_callback:
+                                trace_callback("Nova raiz criada após split", [], disk_counter)
+                            return
+                    # Outro escritor já criou uma raiz acima deste nó
+                    pai = self._pai_de(node, separador)
+                pai = self._travar_cobrindo(pai, separador)
+                node.trava.release()
+                node = pai
+                i = posicao_filho(node.keys, separador)
+                node.versao += 1
+                node.keys.insert(i, separador)
+                node.children.insert(i + 1, novo)
+                node.versao += 1
+                disk_counter['writes'] += 1
+                self._modificado(node)
+                if path:
+                    path = path[:-1]
+                if trace_callback:
+                    trace_callback(f"Separador {separador} inserido no pai", path, disk_counter)
+        finally:
+            node.trava.release()
+
+    def _dividir(self, node, disk_counter):
+        # Divide 'node' (já travado) e liga o nó novo à direita dele
+        t = self.t
+        novo = self._novo_no(node.folha)
+        node.versao += 1
+        registrar(disk_counter, 'split')
+        if node.folha:
+            novo.keys = node.keys[t:]
+            novo.values = node.values[t:]
+            node.keys = node.keys[:t]
+            node.values = node.values[:t]
+            separador = novo.keys[0]
+        else:
+            separador = node.keys[t]
+            novo.keys = node.keys[t + 1:]
+            novo.children = node.children[t + 1:]
+            node.keys = node.keys[:t]
+            node.children = node.children[:t + 1]
+        novo.alta = node.alta
+        novo.next = node.next
+        node.alta = separador
+        node.next = novo
+        node.versao += 1
+        disk_counter['writes'] += 2
+        self._modificado(node)
+        self._modificado(novo)
+        return novo, separador
+
+    def _pai_de(self, node, key):
+        # Nó do nível logo acima de 'node' que cobre 'key' (alturas nunca mudam)
+        alvo = _altura(node) + 1
+        atual = self.raiz
+        altura = _altura(atual)
+        while altura > alvo:
+            prox, i = self._passo(atual, key)
+            if i is not None:
+                altura -= 1
+            atual = prox
+        return atual
+
+    def _caminho(self, pilha, folha):
+        # Índices de filho da raiz até a folha (para o trace, sem concorrência)
+        path = []
+        for pai, filho in zip(pilha, pilha[1:] + [folha]):
+            path.append(pai.children.index(filho))
+        return path
+
+    def _remove(self, key, trace_callback, disk_counter):
+        pilha = []
+        modelo = f"Analisando nó {{keys}} para remover {key}" if trace_callback else None
+        node = self._descer(key, disk_counter, trace_callback, [] if trace_callback else None, modelo,
+                            pilha=pilha)
+        path = self._caminho(pilha, node) if trace_callback else None
+        node = self._travar_cobrindo(node, key)
+        try:
+            idx = indice_chave(node.keys, key)
+            if idx < 0:
+                if trace_callback:
+                    trace_callback(f"Chave {key} não encontrada na folha", path, disk_counter)
+                return False
+            node.versao += 1
+            node.keys.pop(idx)
+            node.values.pop(idx)
+            node.versao += 1
+            disk_counter['writes'] += 1
+            self._modificado(node)
+            if trace_callback:
+                trace_callback(f"Removeu chave {key} da folha (sem fusões na B-link)", path, disk_counter)
+            return True
+        finally:
+            node.trava.release()
+
+    def _remover_intervalo(self, lo, hi, incluir_lo, incluir_hi, disk_counter):
+        # Sem fusões, a remoção de um intervalo só anda pelas folhas, com a
+        # trava de uma pega antes de soltar a anterior (da esquerda para a
+        # direita, como em _travar_cobrindo)
+        posicao = posicao_chave if incluir_lo else posicao_filho
+        posicao_hi = posicao_filho if incluir_hi else posicao_chave
+        node = self._descer(lo, disk_counter, posicao=posicao)
+        node.trava.acquire()
+        removidas = 0
+        try:
+            while True:
+                a = 0 if lo is None else posicao(node.keys, lo)
+                b = len(node.keys) if hi is None else posicao_hi(node.keys, hi)
+                if b > a:
+                    node.versao += 1
+                    del node.keys[a:b]
+                    del node.values[a:b]
+                    node.versao += 1
+                    disk_counter['writes'] += 1
+                    self._modificado(node)
+                    removidas += b - a
+                alta = node.alta
+                if alta is None or (hi is not None and (alta > hi or (alta == hi and not incluir_hi))):
+                    return removidas
+                prox = node.next
+                prox.trava.acquire()
+                node.trava.release()
+                node = prox
+                disk_counter['reads'] += 1
+        finally:
+            node.trava.release()
+
+
+def _altura(node):
+    # O primeiro filho de um nó nunca muda: splits só tiram a parte direita
+    altura = 0
+    while not node.folha:
+        node = node.children[0]
+        altura += 1
+    return altura
+
+
+def _menor_chave(node):
+    while not node.folha:
+        node = node.children[0]
+    return node.keys[0]
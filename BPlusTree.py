@@ -1,220 +1,762 @@
 # BPlusTree.py
 
+from array import array
+
+from BuscaBinaria import posicao_chave, posicao_filho, indice_chave
+from Capacidade import Capacidade
+from Metricas import registrar
+from Snapshot import snapshot
+
 class BPlusTreeNode:
+    __slots__ = ('t', 'folha', 'keys', 'values', 'children', 'next', '_snap', '_uid')
+
     def __init__(self, t, folha=False):
         self.t = t
         self.folha = folha
         self.keys = []
+        # Valores ficam só nas folhas, em lista paralela a 'keys'; os nós
+        # internos guardam apenas separadores e mantêm o fanout alto.
+        self.values = []
         self.children = []
         self.next = None
-        self.parent = None
+
+
+def _em_ordem(itens):
+    # Repassa os pares (chave, valor) conferindo que a entrada da carga em
+    # massa está ordenada pela chave.
+    anterior = None
+    primeira = True
+    for item in itens:
+        k = item[0]
+        if not primeira and k < anterior:
+            raise ValueError(f"A carga em massa exige chaves ordenadas ({k} veio depois de {anterior}).")
+        anterior = k
+        primeira = False
+        yield item
+
+
+def _fatiar(itens, alvo, minimo, maximo):
+    # Agrupa um fluxo em blocos de 'alvo' itens. O último bloco, se ficar
+    # abaixo do mínimo, é combinado com o penúltimo (e redividido se estourar).
+    anterior = None
+    atual = []
+    for item in itens:
+        atual.append(item)
+        if len(atual) == alvo:
+            if anterior is not None:
+                yield anterior
+            anterior, atual = atual, []
+    if anterior is None:
+        if atual:
+            yield atual
+        return
+    if not atual or len(atual) >= minimo:
+        yield anterior
+        if atual:
+            yield atual
+        return
+    juntos = anterior + atual
+    if len(juntos) <= maximo:
+        yield juntos
+    else:
+        meio = len(juntos) // 2
+        yield juntos[:meio]
+        yield juntos[meio:]
+
 
 class BPlusTree:
-    def __init__(self, t=3):
+    # compacta=True: chaves em array('q'), como na BTree; os valores das
+    # folhas continuam numa lista. Com bytes_por_no a capacidade de cada nó
+    # é medida em bytes (ver Capacidade.py) e 't' deixa de ser usado.
+    def __init__(self, t=3, compacta=False, bytes_por_no=None):
         self.t = t
-        self.raiz = BPlusTreeNode(t, True)
+        self.compacta = compacta
+        self.capacidade = Capacidade(bytes_por_no) if bytes_por_no is not None else None
+        self.raiz = self._novo_no(True)
+
+    # --- Acesso aos nós ---
+    # Os algoritmos nunca seguem 'children'/'next' diretamente: em memória as
+    # referências são os próprios nós, mas uma subclasse pode guardar ids de
+    # página e buscar os nós sob demanda (ver BPlusTreePaginada).
+
+    def _filho(self, node, i):
+        return node.children[i]
+
+    def _proximo(self, folha):
+        return folha.next
+
+    def _ref(self, node):
+        return node
+
+    def _novo_no(self, folha):
+        node = BPlusTreeNode(self.t, folha)
+        if self.compacta:
+            node.keys = array('q')
+        return node
+
+    def _modificado(self, node):
+        # Chamado depois de toda alteração em um nó
+        pass
+
+    def _liberar(self, node):
+        # Chamado quando um nó deixa de fazer parte da árvore
+        pass
+
+    # --- Ocupação dos nós ---
+    # Em número de chaves (de t-1 a 2t-1) ou, com bytes_por_no, em bytes.
+
+    def _cheio(self, node):
+        if self.capacidade is None:
+            return len(node.keys) >= 2 * self.t - 1
+        return self.capacidade.cheio(node.keys, node.folha)
+
+    def _no_minimo(self, node):
+        # Perder uma chave pode deixar o nó abaixo do mínimo
+        if self.capacidade is None:
+            return len(node.keys) <= self.t - 1
+        return self.capacidade.no_minimo(node.keys, node.folha)
+
+    def _abaixo_do_minimo(self, node):
+        if self.capacidade is None:
+            return len(node.keys) < self.t - 1
+        return self.capacidade.abaixo_do_minimo(node.keys, node.folha)
+
+    def _cabe(self, keys, folha):
+        if self.capacidade is None:
+            return len(keys) <= 2 * self.t - 1
+        return self.capacidade.cabe(keys, folha)
+
+    def _fusao_cabe(self, parent, idx_esquerdo):
+        if self.capacidade is None:
+            return True
+        esquerdo = self._filho(parent, idx_esquerdo)
+        keys = esquerdo.keys[:]
+        if not esquerdo.folha:
+            keys.append(parent.keys[idx_esquerdo])
+        keys.extend(self._filho(parent, idx_esquerdo + 1).keys)
+        return self.capacidade.cabe(keys, esquerdo.folha)
+
+    def _pode_emprestar(self, parent, irmao):
+        if self.capacidade is None:
+            return len(irmao.keys) > self.t - 1
+        # O separador novo pode ser maior que o antigo: o pai precisa de folga
+        return not self._no_minimo(irmao) and not self._cheio(parent)
+
+    def _separador(self, esquerda, direita):
+        # Separador entre a última chave de uma folha e a primeira da seguinte
+        return direita
+
+    # Carga em massa de baixo para cima: as chaves ordenadas enchem as folhas
+    # até o fator de preenchimento, a lista encadeada é ligada na passagem e
+    # os níveis internos são montados sobre as folhas, sem nenhum split.
+    # Cada nó criado conta como uma escrita em disk_counter. 'valores', se
+    # informado, é um iterável paralelo a 'chaves'.
+    @classmethod
+    def construir_em_massa(cls, chaves, t=3, fator_preenchimento=1.0, disk_counter=None, valores=None,
+                           compacta=False, bytes_por_no=None):
+        if not 0 < fator_preenchimento <= 1:
+            raise ValueError("O fator de preenchimento deve estar no intervalo (0, 1].")
+        if disk_counter is None:
+            disk_counter = {'reads': 0, 'writes': 0}
+        tree = cls(t, compacta=compacta) if bytes_por_no is None else cls(t, compacta, bytes_por_no)
+
+        max_chaves = 2 * t - 1
+        alvo = min(max_chaves, max(t - 1, round(fator_preenchimento * max_chaves)))
+        nivel = []  # pares (nó, separador à esquerda da subárvore)
+        anterior = None
+        itens = _em_ordem(zip(chaves, valores) if valores is not None else ((k, None) for k in chaves))
+        if tree.capacidade is None:
+            blocos = _fatiar(itens, alvo, t - 1, max_chaves)
+        else:
+            blocos = tree._fatiar_bytes(itens, True, fator_preenchimento)
+        for bloco in blocos:
+            folha = tree._novo_no(True)
+            folha.keys.extend(k for k, _ in bloco)
+            folha.values = [v for _, v in bloco]
+            if anterior is not None:
+                anterior.next = folha
+                nivel.append((folha, tree._separador(anterior.keys[-1], folha.keys[0])))
+            else:
+                nivel.append((folha, folha.keys[0]))
+            anterior = folha
+            disk_counter['writes'] += 1
+
+        if not nivel:
+            return tree
+
+        max_filhos = 2 * t
+        alvo = min(max_filhos, max(t, round(fator_preenchimento * max_filhos)))
+        while len(nivel) > 1:
+            proximo_nivel = []
+            if tree.capacidade is None:
+                grupos = _fatiar(nivel, alvo, t, max_filhos)
+            else:
+                grupos = tree._fatiar_bytes(nivel, False, fator_preenchimento)
+            for grupo in grupos:
+                node = tree._novo_no(False)
+                node.children = [child for child, _ in grupo]
+                node.keys.extend(menor for _, menor in grupo[1:])
+                proximo_nivel.append((node, grupo[0][1]))
+                disk_counter['writes'] += 1
+            nivel = proximo_nivel
 
-    def insere_com_trace(self, key, trace_callback):
+        tree.raiz = nivel[0][0]
+        return tree
+
+    def _fatiar_bytes(self, itens, folha, fator_preenchimento):
+        # Como _fatiar, mas cada bloco enche até fator_preenchimento (no
+        # mínimo metade) da capacidade em bytes. As chaves são medidas num
+        # contêiner do próprio tipo dos nós, para contar a compressão. Itens:
+        # (chave, valor) nas folhas; (nó, separador) nos nós internos, cujo
+        # primeiro separador sobe para o pai em vez de ficar no nó.
+        capacidade = self.capacidade
+        alvo = max(capacidade.bytes_por_no // 2, fator_preenchimento * capacidade.bytes_por_no)
+        indice = 0 if folha else 1
+
+        def chaves_de(bloco):
+            chaves = self._novo_no(folha).keys
+            chaves.extend(item[indice] for item in (bloco if folha else bloco[1:]))
+            return chaves
+
+        anterior = None
+        atual = []
+        chaves = self._novo_no(folha).keys
+        for item in itens:
+            if atual or folha:
+                chaves.append(item[indice])
+            if atual and capacidade.tamanho(chaves, folha) > alvo:
+                if anterior is not None:
+                    yield anterior
+                anterior, atual = atual, []
+                chaves = chaves_de([item])
+            atual.append(item)
+        if anterior is None:
+            if atual:
+                yield atual
+            return
+        if not capacidade.abaixo_do_minimo(chaves_de(atual), folha):
+            yield anterior
+            yield atual
+            return
+        # Último bloco abaixo do mínimo: junta com o penúltimo (e redivide)
+        juntos = anterior + atual
+        chaves = chaves_de(juntos)
+        if capacidade.cabe(chaves, folha):
+            yield juntos
+            return
+        meio = capacidade.meio(chaves, folha) + (0 if folha else 1)
+        yield juntos[:meio]
+        yield juntos[meio:]
+
+    # Busca pontual sem trace. Na B+ as chaves dos nós internos são apenas
+    # separadores, então a descida sempre vai até a folha.
+    def busca(self, key, disk_counter=None):
+        node = self.raiz
+        while not node.folha:
+            if disk_counter is not None:
+                disk_counter['reads'] += 1
+            node = self._filho(node, posicao_filho(node.keys, key))
+        if disk_counter is not None:
+            disk_counter['reads'] += 1
+        return indice_chave(node.keys, key) >= 0
+
+    def __contains__(self, key):
+        return self.busca(key)
+
+    def snapshot(self, tocados=()):
+        """Cópia congelada da árvore; compartilha com a cópia anterior os nós fora de 'tocados'."""
+        return snapshot(self.raiz, tocados)
+
+    def busca_com_trace(self, key, trace_callback):
         disk_counter = {'reads': 0, 'writes': 0}
+        node = self.raiz
+        path = []
+        while not node.folha:
+            disk_counter['reads'] += 1
+            trace_callback(f"Analisando nó {node.keys} para buscar {key}", path, disk_counter)
+            i = posicao_filho(node.keys, key)
+            node = self._filho(node, i)
+            path = path + [i]
+        disk_counter['reads'] += 1
+        trace_callback(f"Analisando folha {node.keys} para buscar {key}", path, disk_counter)
+        if indice_chave(node.keys, key) >= 0:
+            trace_callback(f"Chave {key} encontrada na folha", path, disk_counter)
+            return True
+        trace_callback(f"Chave {key} não encontrada na folha", path, disk_counter)
+        return False
+
+    # Varredura de intervalo preguiçosa: desce uma vez até a folha inicial e
+    # depois segue a lista encadeada 'next', contando uma leitura por folha.
+    # lo/hi = None deixam o intervalo aberto daquele lado; com valores=True
+    # são entregues pares (chave, valor).
+    def range(self, lo=None, hi=None, incluir_lo=True, incluir_hi=False, limite=None, disk_counter=None,
+              valores=False):
+        if limite is not None and limite <= 0:
+            return
+        # Com lo inclusivo a descida usa bisect_left: chaves repetidas iguais a
+        # lo podem estar à esquerda de um separador igual a lo.
+        posicao = posicao_chave if incluir_lo else posicao_filho
+        node = self.raiz
+        while not node.folha:
+            if disk_counter is not None:
+                disk_counter['reads'] += 1
+            node = self._filho(node, 0 if lo is None else posicao(node.keys, lo))
+        i = 0 if lo is None else posicao(node.keys, lo)
+
+        entregues = 0
+        while node is not None:
+            if disk_counter is not None:
+                disk_counter['reads'] += 1
+            keys = node.keys
+            while i < len(keys):
+                k = keys[i]
+                if hi is not None and (k > hi or (k == hi and not incluir_hi)):
+                    return
+                yield (k, node.values[i]) if valores else k
+                entregues += 1
+                if limite is not None and entregues >= limite:
+                    return
+                i += 1
+            node = self._proximo(node)
+            i = 0
+
+    # --- Interface de índice (chave -> valor) ---
+
+    def get(self, key, default=None, disk_counter=None):
+        node = self.raiz
+        while not node.folha:
+            if disk_counter is not None:
+                disk_counter['reads'] += 1
+            node = self._filho(node, posicao_filho(node.keys, key))
+        if disk_counter is not None:
+            disk_counter['reads'] += 1
+        idx = indice_chave(node.keys, key)
+        return node.values[idx] if idx >= 0 else default
+
+    # Insere ou, se a chave já existir, substitui o valor (upsert).
+    def put(self, key, value, disk_counter=None):
+        if disk_counter is None:
+            disk_counter = {'reads': 0, 'writes': 0}
+        self._insere(key, None, disk_counter, value, substituir=True)
+        return disk_counter
+
+    # Retorna True se a chave existia e foi removida.
+    def delete(self, key, disk_counter=None):
+        if disk_counter is None:
+            disk_counter = {'reads': 0, 'writes': 0}
+        return self._remove(key, None, disk_counter)
+
+    def insere_com_trace(self, key, trace_callback, disk_counter=None):
+        if disk_counter is None:
+            disk_counter = {'reads': 0, 'writes': 0}
+        self._insere(key, trace_callback, disk_counter)
+
+    # Modo sem trace: nenhuma mensagem é formatada e nenhum caminho é montado.
+    # A contagem de acessos a disco é opcional: passe um dicionário para acumulá-la.
+    def insere(self, key, disk_counter=None):
+        if disk_counter is None:
+            disk_counter = {'reads': 0, 'writes': 0}
+        self._insere(key, None, disk_counter)
+        return disk_counter
+
+    def _insere(self, key, trace_callback, disk_counter, valor=None, substituir=False):
         raiz = self.raiz
         disk_counter['reads'] += 1
         
-        if len(raiz.keys) == 2 * self.t - 1:
-            nova_raiz = BPlusTreeNode(self.t, False)
-            nova_raiz.children.append(self.raiz)
-            self.raiz.parent = nova_raiz
+        if self.capacidade is not None:
+            self.capacidade.conferir(key)
+        if self._cheio(raiz):
+            nova_raiz = self._novo_no(False)
+            nova_raiz.children.append(self._ref(self.raiz))
             self._split_child(nova_raiz, 0, trace_callback, [], disk_counter)
             self.raiz = nova_raiz
-            trace_callback("Nova raiz criada após split", [], disk_counter)
+            registrar(disk_counter, 'raiz_cresceu')
+            if trace_callback:
+                trace_callback("Nova raiz criada após split", [], disk_counter)
         
-        self._inserir_nao_cheio(self.raiz, key, trace_callback, [], disk_counter)
+        self._inserir_nao_cheio(self.raiz, key, trace_callback, [] if trace_callback else None, disk_counter,
+                                valor, substituir)
 
-    def _inserir_nao_cheio(self, node, k, trace_callback, path, disk_counter):
-        trace_callback(f"Analisando nó {node.keys} para inserir {k}", path, disk_counter)
+    def _inserir_nao_cheio(self, node, k, trace_callback, path, disk_counter, valor=None, substituir=False):
+        if trace_callback:
+            trace_callback(f"Analisando nó {node.keys} para inserir {k}", path, disk_counter)
         
         if node.folha:
-            i = 0
-            while i < len(node.keys) and k > node.keys[i]:
-                i += 1
-            node.keys.insert(i, k)
+            i = posicao_chave(node.keys, k)
             disk_counter['writes'] += 1
-            trace_callback(f"Inseriu chave {k} na folha", path, disk_counter)
+            if substituir and i < len(node.keys) and node.keys[i] == k:
+                node.values[i] = valor
+                self._modificado(node)
+                if trace_callback:
+                    trace_callback(f"Atualizou o valor da chave {k} na folha", path, disk_counter)
+                return
+            node.keys.insert(i, k)
+            node.values.insert(i, valor)
+            self._modificado(node)
+            if trace_callback:
+                trace_callback(f"Inseriu chave {k} na folha", path, disk_counter)
         else:
-            i = 0
-            while i < len(node.keys) and k > node.keys[i]:
-                i += 1
-            
-            trace_callback(f"Descendo para filho {i}", path + [i], disk_counter)
+            i = posicao_filho(node.keys, k)
+            if trace_callback:
+                trace_callback(f"Descendo para filho {i}", path + [i], disk_counter)
             disk_counter['reads'] += 1
             
-            if len(node.children[i].keys) == 2 * self.t - 1:
+            if self._cheio(self._filho(node, i)):
                 self._split_child(node, i, trace_callback, path, disk_counter)
-                if k > node.keys[i]:
+                if k >= node.keys[i]:
                     i += 1
-            self._inserir_nao_cheio(node.children[i], k, trace_callback, path + [i], disk_counter)
+            self._inserir_nao_cheio(self._filho(node, i), k, trace_callback, path + [i] if trace_callback else None, disk_counter,
+                                    valor, substituir)
 
     def _split_child(self, parent, i, trace_callback, path, disk_counter):
         disk_counter['writes'] += 3
+        registrar(disk_counter, 'split')
         t = self.t
-        full_node = parent.children[i]
-        novo_node = BPlusTreeNode(t, full_node.folha)
-        novo_node.parent = parent
+        full_node = self._filho(parent, i)
+        novo_node = self._novo_no(full_node.folha)
+
+        if self.capacidade is None:
+            mid = t if full_node.folha else t - 1
+        else:
+            mid = self.capacidade.meio(full_node.keys, full_node.folha)
 
         if full_node.folha:
-            mid = t
             novo_node.keys = full_node.keys[mid:]
             full_node.keys = full_node.keys[:mid]
+            novo_node.values = full_node.values[mid:]
+            full_node.values = full_node.values[:mid]
             novo_node.next = full_node.next
-            full_node.next = novo_node
-            parent.keys.insert(i, novo_node.keys[0])
+            full_node.next = self._ref(novo_node)
+            parent.keys.insert(i, self._separador(full_node.keys[-1], novo_node.keys[0]))
         else:
-            mid = t - 1
             parent.keys.insert(i, full_node.keys.pop(mid))
             novo_node.keys = full_node.keys[mid:]
             full_node.keys = full_node.keys[:mid]
             novo_node.children = full_node.children[mid + 1:]
-            for child in novo_node.children:
-                child.parent = novo_node
             full_node.children = full_node.children[:mid + 1]
 
-        parent.children.insert(i + 1, novo_node)
-        trace_callback(f"Split no filho {i}, promoveu chave {parent.keys[i]}", path, disk_counter)
+        parent.children.insert(i + 1, self._ref(novo_node))
+        self._modificado(full_node)
+        self._modificado(novo_node)
+        self._modificado(parent)
+        if trace_callback:
+            trace_callback(f"Split no filho {i}, promoveu chave {parent.keys[i]}", path, disk_counter)
     
 
     # --- LÓGICA DE REMOÇÃO COMPLETAMENTE REESCRITA (VERSÃO 2) ---
     
-    def remover_com_trace(self, key, trace_callback):
-        disk_counter = {'reads': 0, 'writes': 0}
-        self._remover_recursivo(self.raiz, key, trace_callback, [], disk_counter)
-        trace_callback(f"Remoção finalizada para chave {key}", [], disk_counter)
+    def remover_com_trace(self, key, trace_callback, disk_counter=None):
+        if disk_counter is None:
+            disk_counter = {'reads': 0, 'writes': 0}
+        self._remove(key, trace_callback, disk_counter)
+
+    def remover(self, key, disk_counter=None):
+        if disk_counter is None:
+            disk_counter = {'reads': 0, 'writes': 0}
+        self._remove(key, None, disk_counter)
+        return disk_counter
+
+    def _remove(self, key, trace_callback, disk_counter):
+        removida = self._remover_recursivo(self.raiz, key, trace_callback, [] if trace_callback else None, disk_counter)
+        if trace_callback:
+            trace_callback(f"Remoção finalizada para chave {key}", [], disk_counter)
+        return removida
 
     def _remover_recursivo(self, node, k, trace_callback, path, disk_counter):
         disk_counter['reads'] += 1
-        trace_callback(f"Analisando nó {node.keys} para remover {k}", path, disk_counter)
+        if trace_callback:
+            trace_callback(f"Analisando nó {node.keys} para remover {k}", path, disk_counter)
 
         if node.folha:
-            if k in node.keys:
-                # Remove a chave e o valor associado
-                node.keys.remove(k)
+            idx = indice_chave(node.keys, k)
+            if idx >= 0:
+                # Remove a chave e o valor associado. A descida top-down já
+                # garantiu t chaves nesta folha, então ela não entra em underflow.
+                node.keys.pop(idx)
+                node.values.pop(idx)
                 disk_counter['writes'] += 1
-                trace_callback(f"Removeu chave {k} da folha", path, disk_counter)
-                
-                # Após a remoção, se o nó estiver em underflow e não for a raiz, rebalanceia
-                if len(node.keys) < self.t - 1 and node != self.raiz:
-                    self._rebalancear_folha(node, trace_callback, path, disk_counter)
-            else:
+                self._modificado(node)
+                if trace_callback:
+                    trace_callback(f"Removeu chave {k} da folha", path, disk_counter)
+                return True
+            if trace_callback:
                 trace_callback(f"Chave {k} não encontrada na folha", path, disk_counter)
-            return
+            return False
 
         # Para nós internos, encontra o filho correto para descer
-        i = 0
-        while i < len(node.keys) and k >= node.keys[i]:
-            i += 1
+        i = posicao_filho(node.keys, k)
 
-        filho_a_descer = node.children[i]
-        trace_callback(f"Descendo para o filho {i}", path + [i], disk_counter)
+        filho_a_descer = self._filho(node, i)
+        if trace_callback:
+            trace_callback(f"Descendo para o filho {i}", path + [i], disk_counter)
         
         # Estratégia Top-Down: Garante que o filho tenha chaves suficientes ANTES de descer
-        if len(filho_a_descer.keys) == self.t - 1:
+        if self._no_minimo(filho_a_descer):
             self._preencher_filho(node, i, trace_callback, path, disk_counter)
+            if not node.keys:
+                # A fusão esvaziou a raiz e a árvore perdeu um nível: segue
+                # pela nova raiz para que o caminho do trace continue válido
+                return self._remover_recursivo(self.raiz, k, trace_callback, [] if trace_callback else None,
+                                               disk_counter)
             # A estrutura pode ter mudado, recalcula o caminho
-            i = 0
-            while i < len(node.keys) and k >= node.keys[i]:
-                i += 1
+            i = posicao_filho(node.keys, k)
         
-        self._remover_recursivo(node.children[i], k, trace_callback, path + [i], disk_counter)
+        return self._remover_recursivo(self._filho(node, i), k, trace_callback, path + [i] if trace_callback else None, disk_counter)
 
     def _preencher_filho(self, parent, child_idx, trace_callback, path, disk_counter):
         # Tenta emprestar do irmão esquerdo
-        if child_idx > 0 and len(parent.children[child_idx - 1].keys) > self.t - 1:
-            trace_callback(f"Filho {child_idx} com poucas chaves. Pegando emprestado do irmão esquerdo.", path, disk_counter)
+        if child_idx > 0 and self._pode_emprestar(parent, self._filho(parent, child_idx - 1)):
+            if trace_callback:
+                trace_callback(f"Filho {child_idx} com poucas chaves. Pegando emprestado do irmão esquerdo.", path, disk_counter)
             self._pegar_do_anterior(parent, child_idx, disk_counter)
         # Tenta emprestar do irmão direito
-        elif child_idx < len(parent.keys) and len(parent.children[child_idx + 1].keys) > self.t - 1:
-            trace_callback(f"Filho {child_idx} com poucas chaves. Pegando emprestado do irmão direito.", path, disk_counter)
+        elif child_idx < len(parent.keys) and self._pode_emprestar(parent, self._filho(parent, child_idx + 1)):
+            if trace_callback:
+                trace_callback(f"Filho {child_idx} com poucas chaves. Pegando emprestado do irmão direito.", path, disk_counter)
             self._pegar_do_proximo(parent, child_idx, disk_counter)
         # Se não der para emprestar, faz o merge
         else:
+            if not self._fusao_cabe(parent, child_idx if child_idx < len(parent.keys) else child_idx - 1):
+                # Só com capacidade em bytes: o pai não tem folga para um
+                # separador maior e os irmãos juntos não cabem num nó. O filho
+                # segue como está e pode ficar um pouco abaixo do mínimo.
+                if trace_callback:
+                    trace_callback(f"Filho {child_idx} com poucas chaves, sem espaço para empréstimo ou merge.", path, disk_counter)
+                return
             if child_idx < len(parent.keys):
-                trace_callback(f"Não pode pegar emprestado. Fazendo merge com irmão direito.", path, disk_counter)
+                if trace_callback:
+                    trace_callback(f"Não pode pegar emprestado. Fazendo merge com irmão direito.", path, disk_counter)
                 self._fundir_filhos(parent, child_idx, trace_callback, path, disk_counter)
             else:
-                trace_callback(f"Não pode pegar emprestado. Fazendo merge com irmão esquerdo.", path, disk_counter)
+                if trace_callback:
+                    trace_callback(f"Não pode pegar emprestado. Fazendo merge com irmão esquerdo.", path, disk_counter)
                 self._fundir_filhos(parent, child_idx - 1, trace_callback, path, disk_counter)
                 
     def _pegar_do_anterior(self, parent, child_idx, disk_counter):
         disk_counter['reads'] += 2; disk_counter['writes'] += 3
-        filho = parent.children[child_idx]
-        irmao = parent.children[child_idx - 1]
+        registrar(disk_counter, 'emprestimo')
+        filho = self._filho(parent, child_idx)
+        irmao = self._filho(parent, child_idx - 1)
         
-        # Move chave/filho do irmão para o filho atual através do pai
-        filho.keys.insert(0, irmao.keys.pop())
-        if not irmao.folha:
+        if irmao.folha:
+            # Folhas: a chave emprestada sobe copiada como novo separador
+            filho.keys.insert(0, irmao.keys.pop())
+            filho.values.insert(0, irmao.values.pop())
+            parent.keys[child_idx - 1] = self._separador(irmao.keys[-1], filho.keys[0])
+        else:
+            # Nós internos: rotação através do separador do pai
+            filho.keys.insert(0, parent.keys[child_idx - 1])
+            parent.keys[child_idx - 1] = irmao.keys.pop()
             filho.children.insert(0, irmao.children.pop())
-            filho.children[0].parent = filho
-        
-        # Atualiza a chave no pai
-        parent.keys[child_idx - 1] = filho.keys[0]
+        self._modificado(filho)
+        self._modificado(irmao)
+        self._modificado(parent)
 
     def _pegar_do_proximo(self, parent, child_idx, disk_counter):
         disk_counter['reads'] += 2; disk_counter['writes'] += 3
-        filho = parent.children[child_idx]
-        irmao = parent.children[child_idx + 1]
+        registrar(disk_counter, 'emprestimo')
+        filho = self._filho(parent, child_idx)
+        irmao = self._filho(parent, child_idx + 1)
 
-        filho.keys.append(irmao.keys.pop(0))
-        if not irmao.folha:
+        if irmao.folha:
+            filho.keys.append(irmao.keys.pop(0))
+            filho.values.append(irmao.values.pop(0))
+            parent.keys[child_idx] = self._separador(filho.keys[-1], irmao.keys[0])
+        else:
+            filho.keys.append(parent.keys[child_idx])
+            parent.keys[child_idx] = irmao.keys.pop(0)
             filho.children.append(irmao.children.pop(0))
-            filho.children[-1].parent = filho
-        
-        parent.keys[child_idx] = irmao.keys[0]
+        self._modificado(filho)
+        self._modificado(irmao)
+        self._modificado(parent)
 
     def _fundir_filhos(self, parent, idx_esquerdo, trace_callback, path, disk_counter):
         disk_counter['reads'] += 2; disk_counter['writes'] += 2
-        no_esquerdo = parent.children[idx_esquerdo]
-        no_direito = parent.children[idx_esquerdo + 1]
+        registrar(disk_counter, 'fusao')
+        no_esquerdo = self._filho(parent, idx_esquerdo)
+        no_direito = self._filho(parent, idx_esquerdo + 1)
 
         # Move todas as chaves e filhos do nó direito para o esquerdo
+        # (em nós internos o separador do pai desce junto)
+        if not no_esquerdo.folha:
+            no_esquerdo.keys.append(parent.keys[idx_esquerdo])
         no_esquerdo.keys.extend(no_direito.keys)
         if not no_esquerdo.folha:
             no_esquerdo.children.extend(no_direito.children)
-            for child in no_direito.children:
-                child.parent = no_esquerdo
         else:
-            # Se for folha, atualiza a lista encadeada
+            # Se for folha, leva os valores e atualiza a lista encadeada
+            no_esquerdo.values.extend(no_direito.values)
             no_esquerdo.next = no_direito.next
         
         # Remove a chave e o ponteiro do pai
         parent.keys.pop(idx_esquerdo)
         parent.children.pop(idx_esquerdo + 1)
+        self._modificado(no_esquerdo)
+        self._liberar(no_direito)
         
-        trace_callback("Merge completado.", path + [idx_esquerdo], disk_counter)
+        if trace_callback:
+            trace_callback("Merge completado.", path + [idx_esquerdo], disk_counter)
 
-        # Se o pai ficar vazio (e não for a raiz), ele também precisa ser removido
-        if not parent.keys and parent == self.raiz:
+        # Se a raiz ficar sem chaves, o nó fundido passa a ser a raiz
+        if not parent.keys and parent is self.raiz:
             self.raiz = no_esquerdo
-            no_esquerdo.parent = None
-
-    def _rebalancear_folha(self, folha, trace_callback, path, disk_counter):
-        # Esta função simplificada lida com rebalanceamento PÓS remoção na folha
-        # É chamada quando a folha está em underflow
-        parent = folha.parent
-        if parent is None: return # Raiz
-
-        idx_no_pai = parent.children.index(folha)
-
-        # Tenta pegar emprestado do irmão esquerdo
-        if idx_no_pai > 0 and len(parent.children[idx_no_pai - 1].keys) > self.t - 1:
-            trace_callback(f"Folha com poucas chaves. Pegando do irmão esquerdo.", path, disk_counter)
-            self._pegar_do_anterior(parent, idx_no_pai, disk_counter)
-        # Tenta pegar emprestado do irmão direito
-        elif idx_no_pai < len(parent.keys) and len(parent.children[idx_no_pai + 1].keys) > self.t - 1:
-            trace_callback(f"Folha com poucas chaves. Pegando do irmão direito.", path, disk_counter)
-            self._pegar_do_proximo(parent, idx_no_pai, disk_counter)
-        # Faz merge
+            self._liberar(parent)
+            registrar(disk_counter, 'raiz_encolheu')
         else:
-            if idx_no_pai < len(parent.keys):
-                trace_callback(f"Não pode pegar emprestado. Fazendo merge com irmão direito.", path, disk_counter)
-                self._fundir_filhos(parent, idx_no_pai, trace_callback, path, disk_counter)
+            self._modificado(parent)
+
+    # --- Remoção de intervalo ---
+
+    # Remove todas as chaves do intervalo (mesmos limites de range) numa só
+    # passada e retorna quantas saíram. A descida separa a folha onde o
+    # intervalo começa da folha onde ele termina; as subárvores inteiras entre
+    # os dois caminhos são descartadas sem rebalanceamento, e só os nós desses
+    # dois caminhos são consertados no fim. Escritas: O(altura + nós
+    # descartados), em vez de O(k·altura) com uma remoção por chave.
+    def remove_range(self, lo=None, hi=None, incluir_lo=True, incluir_hi=False, disk_counter=None):
+        if disk_counter is None:
+            disk_counter = {'reads': 0, 'writes': 0}
+        if lo is not None and hi is not None and (lo > hi or (lo == hi and not (incluir_lo and incluir_hi))):
+            return 0
+        return self._remover_intervalo(lo, hi, incluir_lo, incluir_hi, disk_counter)
+
+    def _remover_intervalo(self, lo, hi, incluir_lo, incluir_hi, disk_counter):
+        # posicao_chave/posicao_filho dão, para cada limite, o filho que pode
+        # ter a primeira (última) chave do intervalo, como na descida de range
+        limites = (lo, posicao_chave if incluir_lo else posicao_filho,
+                   hi, posicao_filho if incluir_hi else posicao_chave)
+        folhas = []
+        removidas = self._cortar(self.raiz, limites, folhas, disk_counter)
+        for folha, proxima in zip(folhas, folhas[1:]):
+            # As folhas entre duas folhas visitadas foram descartadas
+            if folha.next != self._ref(proxima):
+                folha.next = self._ref(proxima)
+                self._modificado(folha)
+        if removidas:
+            self._encolher_raiz(disk_counter)
+            self._reparar(self.raiz, limites, disk_counter)
+            self._encolher_raiz(disk_counter)
+        return removidas
+
+    def _fronteiras(self, node, limites):
+        lo, pos_lo, hi, pos_hi = limites
+        a = 0 if lo is None else pos_lo(node.keys, lo)
+        b = (len(node.keys) if node.folha else len(node.children) - 1) if hi is None else pos_hi(node.keys, hi)
+        return a, b
+
+    def _cortar(self, node, limites, folhas, disk_counter):
+        # Tira o intervalo da subárvore sem consertar ocupação; 'folhas'
+        # recebe as folhas visitadas (as das bordas de cada subárvore
+        # cortada), da esquerda para a direita
+        disk_counter['reads'] += 1
+        a, b = self._fronteiras(node, limites)
+        if node.folha:
+            folhas.append(node)
+            if b <= a:
+                return 0
+            del node.keys[a:b]
+            del node.values[a:b]
+            disk_counter['writes'] += 1
+            self._modificado(node)
+            return b - a
+        removidas = self._cortar(self._filho(node, a), limites, folhas, disk_counter)
+        if b > a:
+            for i in range(a + 1, b):
+                removidas += self._descartar(self._filho(node, i), disk_counter)
+            removidas += self._cortar(self._filho(node, b), limites, folhas, disk_counter)
+            # Fica o separador à esquerda de b: ele continua acima de tudo em a
+            del node.children[a + 1:b]
+            del node.keys[a:b - 1]
+            disk_counter['writes'] += 1
+            self._modificado(node)
+        return removidas
+
+    def _descartar(self, node, disk_counter):
+        # Libera uma subárvore inteiramente dentro do intervalo
+        disk_counter['reads'] += 1
+        disk_counter['writes'] += 1
+        if node.folha:
+            removidas = len(node.keys)
+        else:
+            removidas = sum(self._descartar(self._filho(node, i), disk_counter) for i in range(len(node.children)))
+        self._liberar(node)
+        return removidas
+
+    def _reparar(self, node, limites, disk_counter):
+        # Depois do corte só os nós dos dois caminhos da fronteira podem estar
+        # abaixo de t-1 chaves (até vazios). Conserta de baixo para cima; um
+        # filho com um único filho não tem como consertar o de baixo, então
+        # depois de cada junção a subárvore resultante é revisitada.
+        if node.folha:
+            return
+        a, b = self._fronteiras(node, limites)
+        for i in sorted({a, b}, reverse=True):
+            self._reparar(self._filho(node, i), limites, disk_counter)
+        for lado in (0, 1):
+            while len(node.children) > 1:
+                i = self._fronteiras(node, limites)[lado]
+                if not self._abaixo_do_minimo(self._filho(node, i)):
+                    break
+                j = i - 1 if i > 0 else i
+                antes = (len(self._filho(node, j).keys), len(self._filho(node, j + 1).keys))
+                if not self._juntar(node, j, disk_counter):
+                    self._reparar(self._filho(node, j), limites, disk_counter)
+                    continue
+                # Redistribuição que não mudou o par: a próxima daria a mesma
+                # divisão. Com chaves de tamanho variável (e prefixos) uma
+                # metade pode ficar abaixo do mínimo, e o filho fica assim.
+                if (len(self._filho(node, j).keys), len(self._filho(node, j + 1).keys)) == antes:
+                    break
+                for k in (j + 1, j):
+                    self._reparar(self._filho(node, k), limites, disk_counter)
+
+    def _juntar(self, parent, j, disk_counter):
+        # Junta os filhos j e j+1; se não couberem num nó, redistribui ao meio
+        # (e retorna True: os dois continuam)
+        disk_counter['reads'] += 2
+        esquerdo = self._filho(parent, j)
+        direito = self._filho(parent, j + 1)
+        keys = esquerdo.keys[:]
+        if not esquerdo.folha:
+            keys.append(parent.keys[j])
+        keys.extend(direito.keys)
+        if self._cabe(keys, esquerdo.folha):
+            esquerdo.keys = keys
+            if esquerdo.folha:
+                esquerdo.values.extend(direito.values)
+                esquerdo.next = direito.next
             else:
-                trace_callback(f"Não pode pegar emprestado. Fazendo merge com irmão esquerdo.", path, disk_counter)
-                self._fundir_filhos(parent, idx_no_pai - 1, trace_callback, path, disk_counter)
\ No newline at end of file
+                esquerdo.children.extend(direito.children)
+            del parent.keys[j]
+            del parent.children[j + 1]
+            disk_counter['writes'] += 2
+            self._modificado(esquerdo)
+            self._modificado(parent)
+            self._liberar(direito)
+            registrar(disk_counter, 'fusao')
+            return False
+        meio = len(keys) // 2 if self.capacidade is None else self.capacidade.meio(keys, esquerdo.folha)
+        if esquerdo.folha:
+            values = esquerdo.values + direito.values
+            esquerdo.keys, direito.keys = keys[:meio], keys[meio:]
+            esquerdo.values, direito.values = values[:meio], values[meio:]
+            parent.keys[j] = self._separador(esquerdo.keys[-1], direito.keys[0])
+        else:
+            children = esquerdo.children + direito.children
+            esquerdo.keys, direito.keys = keys[:meio], keys[meio + 1:]
+            esquerdo.children, direito.children = children[:meio + 1], children[meio + 1:]
+            parent.keys[j] = keys[meio]
+        disk_counter['writes'] += 3
+        self._modificado(esquerdo)
+        self._modificado(direito)
+        self._modificado(parent)
+        registrar(disk_counter, 'redistribuicao')
+        return True
+
+    def _encolher_raiz(self, disk_counter):
+        # Raiz interna com um só filho: a árvore perde um nível
+        while not self.raiz.folha and len(self.raiz.children) == 1:
+            antiga = self.raiz
+            self.raiz = self._filho(antiga, 0)
+            self._liberar(antiga)
+            registrar(disk_counter, 'raiz_encolheu')
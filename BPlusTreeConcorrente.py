@@ -0,0 +1,260 @@
+# BPlusTreeConcorrente.py
+#
+# Árvore B+ que pode ser compartilhada entre threads, com latches de
+# leitura/escrita por nó e acoplamento de latches (latch crabbing).
+#
+# Uma operação desce segurando o latch do pai enquanto pega o do filho. Como
+# a árvore já divide e preenche os filhos de forma preventiva na descida, o
+# filho fica "seguro" (não vai dividir nem fundir por causa desta operação)
+# assim que é tratado, e o latch do pai é solto: cada escritor segura no
+# máximo o pai, o filho e os irmãos que participam de um empréstimo ou
+# fusão. Buscas e varreduras só usam latches compartilhados.
+#
+# O ponteiro 'raiz' tem o seu próprio latch, que faz o papel de pai da raiz:
+# quem pode trocar a raiz (split da raiz cheia, fusão que esvazia a raiz de
+# uma chave) só o solta depois de passar por ela.
+#
+# Ordem dos latches: sempre de cima para baixo e, entre irmãos, da esquerda
+# para a direita (a mesma ordem em que as varreduras andam pelas folhas).
+# Por isso um escritor que precisa de um irmão à esquerda solta o filho e
+# pega os dois de novo na ordem, ainda segurando o pai.
+#
+# As versões com trace (usadas pelo visualizador) não pegam latches e não
+# devem ser chamadas junto com outras threads.
+
+from array import array
+
+from BPlusTree import BPlusTree, BPlusTreeNode
+from BuscaBinaria import posicao_chave, posicao_filho, indice_chave
+from Latch import LatchLeituraEscrita
+from Metricas import registrar
+
+
+class BPlusTreeNodeConcorrente(BPlusTreeNode):
+    __slots__ = ('latch',)
+
+    def __init__(self, t, folha=False):
+        super().__init__(t, folha)
+        self.latch = LatchLeituraEscrita()
+
+
+class BPlusTreeConcorrente(BPlusTree):
+    def __init__(self, t=3, compacta=False):
+        self._latch_raiz = LatchLeituraEscrita()
+        super().__init__(t, compacta)
+
+    def _novo_no(self, folha):
+        node = BPlusTreeNodeConcorrente(self.t, folha)
+        if self.compacta:
+            node.keys = array('q')
+        return node
+
+    # --- Leitura ---
+
+    def _descer_leitura(self, key, posicao=posicao_filho, disk_counter=None):
+        # Retorna a folha de 'key' com o latch compartilhado já pego
+        self._latch_raiz.adquirir_leitura()
+        node = self.raiz
+        node.latch.adquirir_leitura()
+        self._latch_raiz.liberar_leitura()
+        while not node.folha:
+            if disk_counter is not None:
+                disk_counter['reads'] += 1
+            filho = node.children[0 if key is None else posicao(node.keys, key)]
+            filho.latch.adquirir_leitura()
+            node.latch.liberar_leitura()
+            node = filho
+        if disk_counter is not None:
+            disk_counter['reads'] += 1
+        return node
+
+    def busca(self, key, disk_counter=None):
+        folha = self._descer_leitura(key, disk_counter=disk_counter)
+        try:
+            return indice_chave(folha.keys, key) >= 0
+        finally:
+            folha.latch.liberar_leitura()
+
+    def get(self, key, default=None, disk_counter=None):
+        folha = self._descer_leitura(key, disk_counter=disk_counter)
+        try:
+            idx = indice_chave(folha.keys, key)
+            return folha.values[idx] if idx >= 0 else default
+        finally:
+            folha.latch.liberar_leitura()
+
+    # A varredura não segura latch nenhum entre um 'yield' e outro: quem
+    # consome o iterador pode demorar (ou alterar a árvore na mesma thread).
+    # Cada lote é lido com latches compartilhados acoplados ao longo das
+    # folhas; o lote seguinte recomeça por uma nova descida a partir da última
+    # chave entregue, pulando as repetições dela que já saíram.
+    def range(self, lo=None, hi=None, incluir_lo=True, incluir_hi=False, limite=None, disk_counter=None,
+              valores=False):
+        if limite is not None and limite <= 0:
+            return
+        posicao = posicao_chave if incluir_lo else posicao_filho
+        pular = 0
+        entregues = 0
+        while True:
+            lote, fim = self._ler_lote(lo, posicao, pular, hi, incluir_hi, disk_counter)
+            for k, v in lote:
+                yield (k, v) if valores else k
+                entregues += 1
+                if limite is not None and entregues >= limite:
+                    return
+            if fim:
+                return
+            ultima = lote[-1][0]
+            repetidas = 0
+            for k, _ in reversed(lote):
+                if k != ultima:
+                    break
+                repetidas += 1
+            pular = pular + repetidas if lo is not None and ultima == lo and posicao is posicao_chave else repetidas
+            lo = ultima
+            posicao = posicao_chave
+
+    def _ler_lote(self, lo, posicao, pular, hi, incluir_hi, disk_counter):
+        node = self._descer_leitura(lo, posicao, disk_counter)
+        i = 0 if lo is None else posicao(node.keys, lo)
+        lote = []
+        while True:
+            keys = node.keys
+            while pular and i < len(keys) and keys[i] == lo:
+                i += 1
+                pular -= 1
+            while i < len(keys):
+                k = keys[i]
+                if hi is not None and (k > hi or (k == hi and not incluir_hi)):
+                    node.latch.liberar_leitura()
+                    return lote, True
+                lote.append((k, node.values[i]))
+                i += 1
+            proxima = node.next
+            if lote or proxima is None:
+                node.latch.liberar_leitura()
+                return lote, proxima is None
+            # Folha sem nada a entregar: anda para a próxima sem soltar a atual
+            proxima.latch.adquirir_leitura()
+            node.latch.liberar_leitura()
+            node = proxima
+            i = 0
+            if disk_counter is not None:
+                disk_counter['reads'] += 1
+
+    # --- Escrita ---
+
+    def _insere(self, key, trace_callback, disk_counter, valor=None, substituir=False):
+        if trace_callback:
+            return super()._insere(key, trace_callback, disk_counter, valor, substituir)
+        t = self.t
+        self._latch_raiz.adquirir_escrita()
+        node = self.raiz
+        node.latch.adquirir_escrita()
+        disk_counter['reads'] += 1
+        if len(node.keys) == 2 * t - 1:
+            # Raiz cheia: a nova raiz nasce com o latch pego, antes de ser publicada
+            nova_raiz = self._novo_no(False)
+            nova_raiz.latch.adquirir_escrita()
+            nova_raiz.children.append(node)
+            self._split_child(nova_raiz, 0, None, None, disk_counter)
+            self.raiz = nova_raiz
+            registrar(disk_counter, 'raiz_cresceu')
+            node.latch.liberar_escrita()
+            node = nova_raiz
+        self._latch_raiz.liberar_escrita()
+
+        while not node.folha:
+            i = posicao_filho(node.keys, key)
+            disk_counter['reads'] += 1
+            filho = node.children[i]
+            filho.latch.adquirir_escrita()
+            if len(filho.keys) == 2 * t - 1:
+                self._split_child(node, i, None, None, disk_counter)
+                if key >= node.keys[i]:
+                    # O irmão novo só é alcançável por este pai (e pela
+                    # folha dividida), ambos ainda presos: o latch sai na hora
+                    novo = node.children[i + 1]
+                    novo.latch.adquirir_escrita()
+                    filho.latch.liberar_escrita()
+                    filho = novo
+            # Filho não cheio: um split abaixo dele não chega a este pai
+            node.latch.liberar_escrita()
+            node = filho
+
+        try:
+            i = posicao_chave(node.keys, key)
+            disk_counter['writes'] += 1
+            if substituir and i < len(node.keys) and node.keys[i] == key:
+                node.values[i] = valor
+            else:
+                node.keys.insert(i, key)
+                node.values.insert(i, valor)
+            self._modificado(node)
+        finally:
+            node.latch.liberar_escrita()
+
+    def _remove(self, key, trace_callback, disk_counter):
+        if trace_callback:
+            return super()._remove(key, trace_callback, disk_counter)
+        t = self.t
+        self._latch_raiz.adquirir_escrita()
+        prende_raiz = True
+        node = self.raiz
+        node.latch.adquirir_escrita()
+
+        while True:
+            disk_counter['reads'] += 1
+            # A raiz só muda se uma fusão tirar a única chave dela
+            if prende_raiz and (node.folha or len(node.keys) > 1):
+                self._latch_raiz.liberar_escrita()
+                prende_raiz = False
+            if node.folha:
+                break
+            i = posicao_filho(node.keys, key)
+            filho = node.children[i]
+            filho.latch.adquirir_escrita()
+            if len(filho.keys) == t - 1:
+                # Empréstimo ou fusão mexe nos irmãos: solta o filho e pega
+                # irmão esquerdo, filho e irmão direito nessa ordem
+                filho.latch.liberar_escrita()
+                vizinhos = node.children[max(0, i - 1):i + 2]
+                for vizinho in vizinhos:
+                    vizinho.latch.adquirir_escrita()
+                self._preencher_filho(node, i, None, None, disk_counter)
+                if not node.keys:
+                    # A raiz ficou vazia e o nó fundido tomou o lugar dela
+                    filho = self.raiz
+                else:
+                    filho = node.children[posicao_filho(node.keys, key)]
+                for vizinho in vizinhos:
+                    if vizinho is not filho:
+                        vizinho.latch.liberar_escrita()
+            if prende_raiz and self.raiz is node:
+                # Passou pela raiz sem esvaziá-la; se ela foi trocada, o
+                # latch continua até a nova raiz (o filho) ser examinada
+                self._latch_raiz.liberar_escrita()
+                prende_raiz = False
+            node.latch.liberar_escrita()
+            node = filho
+
+        try:
+            idx = indice_chave(node.keys, key)
+            if idx < 0:
+                return False
+            node.keys.pop(idx)
+            node.values.pop(idx)
+            disk_counter['writes'] += 1
+            self._modificado(node)
+            return True
+        finally:
+            node.latch.liberar_escrita()
+
+    def _remover_intervalo(self, lo, hi, incluir_lo, incluir_hi, disk_counter):
+        # O corte e o conserto da BPlusTree mexem em dois caminhos inteiros e
+        # nas subárvores entre eles; aqui cada chave sai com o crabbing de
+        # _remove, sem prender a árvore toda
+        removidas = 0
+        for k in list(self.range(lo, hi, incluir_lo, incluir_hi)):
+            removidas += self._remove(k, None, disk_counter)
+        return removidas
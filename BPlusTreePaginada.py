@@ -0,0 +1,296 @@
+# BPlusTreePaginada.py
+#
+# Árvore B+ guardada em um ArquivoPaginas: cada nó ocupa uma página e os
+# filhos/'next' são ids de página. Os nós passam por um BufferPool: durante
+# uma operação cada página usada fica fixada (o pool serve de mapa de
+# identidade, para que o mesmo nó não seja lido duas vezes) e ao final é
+# desafixada; só a raiz fica fixada o tempo todo. Páginas alteradas são
+# gravadas quando despejadas do pool ou em sincronizar()/fechar().
+#
+# disk_counter passa a refletir páginas realmente lidas e gravadas, mais
+# 'hits' e 'misses' do pool (leituras lógicas = hits + misses); a estimativa
+# manual da BPlusTree continua acumulada em 'simulado' para comparação.
+#
+# Recuperação: ao fim de cada operação que altera a árvore, a imagem nova de
+# cada página alterada, as páginas liberadas e a raiz vão para o WAL num
+# único registro, antes que qualquer uma dessas páginas possa chegar ao
+# arquivo. Ao abrir, os registros do log são reaplicados em ordem (reaplicar
+# imagens é idempotente) e o log é esvaziado; sincronizar() faz o mesmo
+# checkpoint durante o uso. Uma queda no meio de um split ou de uma fusão
+# volta, portanto, ao estado da última operação registrada.
+
+import os
+import pickle
+
+from ArquivoPaginas import ArquivoPaginas, TAMANHO_PAGINA_PADRAO
+from BPlusTree import BPlusTree, BPlusTreeNode
+from BufferPool import BufferPool
+from WAL import WAL
+
+PAGINAS_EM_CACHE_PADRAO = 64
+# Acima deste tamanho o log dispara um checkpoint automático
+TAMANHO_MAXIMO_LOG = 16 * 1024 * 1024
+
+
+class BPlusTreeNodePaginado(BPlusTreeNode):
+    __slots__ = ('pid',)
+
+    def __init__(self, t, folha=False, pid=None):
+        super().__init__(t, folha)
+        self.pid = pid
+
+
+def codificar_no(node):
+    return pickle.dumps((node.folha, node.keys, node.values, node.children, node.next),
+                        protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def decodificar_no(dados, t, pid):
+    folha, keys, values, children, proximo = pickle.loads(dados)
+    node = BPlusTreeNodePaginado(t, folha, pid)
+    node.keys = keys
+    node.values = values
+    node.children = children
+    node.next = proximo
+    return node
+
+
+class BPlusTreePaginada(BPlusTree):
+    def __init__(self, caminho, t=3, tamanho_pagina=TAMANHO_PAGINA_PADRAO, paginas_em_cache=PAGINAS_EM_CACHE_PADRAO,
+                 politica='lru', wal=True, grupo_commit=64):
+        self.arquivo = ArquivoPaginas(caminho, tamanho_pagina)
+        self.pool = BufferPool(paginas_em_cache, politica,
+                               carregar=lambda pid: decodificar_no(self.arquivo.ler(pid), self.t, pid),
+                               gravar=lambda pid, node: self.arquivo.escrever(pid, codificar_no(node)))
+        self.simulado = {'reads': 0, 'writes': 0}
+        # Páginas fixadas pela operação em andamento, e as que ela alterou ou liberou
+        self._nos = {}
+        self._alterados = set()
+        self._liberados = []
+        self.wal = None
+        self.recuperados = 0
+        # Os nós continuam limitados por t; tamanho_pagina é só o das páginas do arquivo
+        self.capacidade = None
+        if wal:
+            self.wal = WAL(caminho + '.wal', grupo_commit, ao_forcar=self.arquivo.aplicar_adiadas)
+            self._recuperar()
+            self.arquivo.log = self.wal
+        meta = self.arquivo.metadados
+        if 'raiz' in meta:
+            # Um arquivo existente define o próprio grau
+            self.t = meta['t']
+            self.raiz = self._carregar(meta['raiz'])
+        else:
+            self.t = t
+            self.raiz = self._novo_no(True)
+            self._concluir(None, self._inicio())
+            self.sincronizar()
+
+    # Persiste uma árvore em memória (por exemplo, vinda da carga em massa)
+    # num arquivo novo e o abre como árvore paginada.
+    @classmethod
+    def a_partir_de(cls, tree, caminho, tamanho_pagina=TAMANHO_PAGINA_PADRAO, **opcoes):
+        arquivo = ArquivoPaginas(caminho, tamanho_pagina, novo=True)
+        pids = {}
+        nivel = [tree.raiz]
+        while nivel:
+            for node in nivel:
+                pids[id(node)] = arquivo.alocar()
+            nivel = [c for node in nivel if not node.folha for c in node.children]
+        nivel = [tree.raiz]
+        while nivel:
+            for node in nivel:
+                copia = BPlusTreeNodePaginado(tree.t, node.folha, pids[id(node)])
+                copia.keys = list(node.keys)
+                copia.values = node.values
+                copia.children = [pids[id(c)] for c in node.children]
+                copia.next = pids[id(node.next)] if node.next is not None else None
+                arquivo.escrever(copia.pid, codificar_no(copia))
+            nivel = [c for node in nivel if not node.folha for c in node.children]
+        arquivo.metadados = {'t': tree.t, 'raiz': pids[id(tree.raiz)]}
+        arquivo.gravar_cabecalho()
+        arquivo.fechar()
+        # Um log antigo no mesmo caminho descreveria outro arquivo
+        if os.path.exists(caminho + '.wal'):
+            os.remove(caminho + '.wal')
+        return cls(caminho, **opcoes)
+
+    @classmethod
+    def construir_em_massa(cls, caminho, chaves, t=3, fator_preenchimento=1.0, disk_counter=None, valores=None,
+                           tamanho_pagina=TAMANHO_PAGINA_PADRAO, **opcoes):
+        tree = BPlusTree.construir_em_massa(chaves, t, fator_preenchimento, valores=valores)
+        paginada = cls.a_partir_de(tree, caminho, tamanho_pagina, **opcoes)
+        if disk_counter is not None:
+            disk_counter['writes'] += paginada.arquivo.total_paginas
+        return paginada
+
+    def sincronizar(self):
+        """Checkpoint: grava as páginas sujas do pool e o cabeçalho, força tudo
+        para o disco e esvazia o log."""
+        if self.wal:
+            self.wal.forcar()
+        self.pool.descarregar()
+        meta = {'t': self.t, 'raiz': self.raiz.pid}
+        if meta != self.arquivo.metadados or self.arquivo.cabecalho_pendente:
+            self.arquivo.metadados = meta
+            self.arquivo.gravar_cabecalho()
+        self.arquivo.sincronizar()
+        if self.wal:
+            self.wal.truncar()
+
+    def fechar(self):
+        if self.arquivo.fd is not None:
+            self.sincronizar()
+        if self.wal:
+            self.wal.fechar()
+        self.arquivo.fechar()
+
+    def _recuperar(self):
+        # Sem raiz o arquivo acabou de ser criado: um log no mesmo caminho
+        # sobrou de outro arquivo e não se aplica a este.
+        if 'raiz' in self.arquivo.metadados:
+            for paginas, liberadas, raiz, total_paginas, livre in self.wal.registros():
+                for pid, dados in paginas.items():
+                    self.arquivo.escrever(pid, dados)
+                for pid, proxima in liberadas:
+                    self.arquivo.gravar_livre(pid, proxima)
+                self.arquivo.metadados = dict(self.arquivo.metadados, raiz=raiz)
+                self.arquivo.total_paginas = total_paginas
+                self.arquivo.livre = livre
+                self.recuperados += 1
+        if self.recuperados:
+            self.arquivo.gravar_cabecalho()
+            self.arquivo.sincronizar()
+        self.wal.truncar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    # --- Acesso aos nós via páginas ---
+
+    def _carregar(self, pid):
+        node = self._nos.get(pid)
+        if node is None:
+            node = self.pool.fixar(pid)
+            self._nos[pid] = node
+        return node
+
+    def _filho(self, node, i):
+        return self._carregar(node.children[i])
+
+    def _proximo(self, folha):
+        # A varredura de intervalo não mantém as folhas fixadas, para que
+        # percorrer muitas folhas não prenda o pool inteiro.
+        if folha.next is None:
+            return None
+        return self.pool.acessar(folha.next)
+
+    def _ref(self, node):
+        return node.pid
+
+    def _novo_no(self, folha):
+        node = BPlusTreeNodePaginado(self.t, folha, self.arquivo.alocar())
+        self._nos[node.pid] = self.pool.novo(node.pid, node)
+        self._alterados.add(node.pid)
+        return node
+
+    def _modificado(self, node):
+        self.pool.marcar_sujo(node.pid)
+        self._alterados.add(node.pid)
+
+    def _liberar(self, node):
+        # A página só é marcada como livre no arquivo depois de registrada
+        # no log, em _concluir.
+        self._nos.pop(node.pid, None)
+        self._alterados.discard(node.pid)
+        self.pool.descartar(node.pid)
+        self._liberados.append(node.pid)
+
+    # --- Delimitação das operações ---
+
+    def _inicio(self, disk_counter=None):
+        # Os eventos estruturais (ver Metricas.py) vão direto para o contador
+        # de quem chamou; as leituras e escritas manuais ficam em 'simulado'
+        self.simulado['eventos'] = None if disk_counter is None else disk_counter.get('eventos')
+        contador = self.arquivo.contador
+        return contador['reads'], contador['writes'], self.pool.estatisticas['hits'], self.pool.estatisticas['misses']
+
+    def _concluir(self, disk_counter, antes):
+        if self._alterados or self._liberados:
+            self._registrar()
+        # Desafixa as páginas usadas na operação. A raiz continua fixada; se
+        # ela mudou, a fixação da nova (feita durante a operação) é a que fica.
+        for pid in self._nos:
+            if pid != self.raiz.pid:
+                self.pool.desafixar(pid)
+        self._nos = {self.raiz.pid: self.raiz}
+        if self.wal and self.wal.tamanho > TAMANHO_MAXIMO_LOG:
+            self.sincronizar()
+        if disk_counter is not None:
+            leituras, escritas, hits, misses = antes
+            disk_counter['reads'] += self.arquivo.contador['reads'] - leituras
+            disk_counter['writes'] += self.arquivo.contador['writes'] - escritas
+            disk_counter['hits'] = disk_counter.get('hits', 0) + self.pool.estatisticas['hits'] - hits
+            disk_counter['misses'] = disk_counter.get('misses', 0) + self.pool.estatisticas['misses'] - misses
+
+    def _registrar(self):
+        # Encadeia as páginas liberadas na lista livre na mesma ordem que
+        # ArquivoPaginas.liberar usará, para que o log descreva exatamente
+        # as páginas que serão gravadas.
+        liberadas = []
+        livre = self.arquivo.livre
+        for pid in self._liberados:
+            liberadas.append((pid, livre))
+            livre = pid
+        if self.wal:
+            paginas = {pid: codificar_no(self._nos[pid]) for pid in self._alterados}
+            self.wal.registrar((paginas, liberadas, self.raiz.pid, self.arquivo.total_paginas, livre))
+        for pid in self._liberados:
+            self.arquivo.liberar(pid)
+        self._alterados = set()
+        self._liberados = []
+
+    def _insere(self, key, trace_callback, disk_counter, valor=None, substituir=False):
+        antes = self._inicio(disk_counter)
+        super()._insere(key, trace_callback, self.simulado, valor, substituir)
+        self._concluir(disk_counter, antes)
+
+    def _remove(self, key, trace_callback, disk_counter):
+        antes = self._inicio(disk_counter)
+        removida = super()._remove(key, trace_callback, self.simulado)
+        self._concluir(disk_counter, antes)
+        return removida
+
+    def _remover_intervalo(self, lo, hi, incluir_lo, incluir_hi, disk_counter):
+        antes = self._inicio(disk_counter)
+        removidas = super()._remover_intervalo(lo, hi, incluir_lo, incluir_hi, self.simulado)
+        self._concluir(disk_counter, antes)
+        return removidas
+
+    def busca(self, key, disk_counter=None):
+        antes = self._inicio()
+        encontrada = super().busca(key, self.simulado)
+        self._concluir(disk_counter, antes)
+        return encontrada
+
+    def get(self, key, default=None, disk_counter=None):
+        antes = self._inicio()
+        valor = super().get(key, default, self.simulado)
+        self._concluir(disk_counter, antes)
+        return valor
+
+    def range(self, lo=None, hi=None, incluir_lo=True, incluir_hi=False, limite=None, disk_counter=None,
+              valores=False):
+        # A varredura é coletada inteira dentro de uma operação: um gerador
+        # deixaria as páginas da descida fixadas em self._nos entre um next e
+        # outro, e qualquer operação no meio (ou outra varredura) as
+        # desafixaria, enquanto o fim da varredura desafixaria as dela.
+        antes = self._inicio()
+        try:
+            resultado = list(super().range(lo, hi, incluir_lo, incluir_hi, limite, self.simulado, valores))
+        finally:
+            self._concluir(disk_counter, antes)
+        return iter(resultado)
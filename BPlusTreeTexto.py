@@ -0,0 +1,95 @@
+# BPlusTreeTexto.py
+#
+# Árvore B+ para chaves str ou bytes, com capacidade dos nós em bytes:
+#   - truncamento de sufixo: o separador que sobe num split (ou muda num
+#     empréstimo) é o menor prefixo da primeira chave da direita que ainda
+#     é maior que a última da esquerda, não a chave inteira;
+#   - compressão de prefixo: cada nó guarda o prefixo comum das suas chaves
+#     uma vez só (ChavesPrefixadas).
+# Separadores curtos e nós sem prefixo repetido fazem caber mais entradas em
+# cada nó: o fanout sobe e a altura cai para o mesmo conjunto de chaves.
+#
+# Cada metade de um split ganha o próprio prefixo, em geral mais longo que o
+# do nó dividido, e pode ficar menor que o mínimo em bytes. Aqui o mínimo é
+# aproximado.
+#
+# A folga de 'cheio' cobre uma entrada, mas não o prefixo que encolhe: uma
+# chave (ou separador) sem o prefixo do nó alonga todos os sufixos, e o nó
+# passa da capacidade mesmo tendo folga; o mesmo vale para o filho que
+# recebe um empréstimo e para o pai que troca de separador. Por isso, depois
+# de cada inserção ou remoção, os nós do caminho (e, na remoção, os irmãos
+# vizinhos) que não cabem mais são divididos de baixo para cima, e a raiz
+# que não cabe vira filha de uma raiz nova.
+
+from BPlusTree import BPlusTree, BPlusTreeNode
+from BuscaBinaria import posicao_filho
+from ChavesTexto import ChavesPrefixadas, separador_curto
+from Metricas import registrar
+
+BYTES_POR_NO_PADRAO = 4096
+
+
+class BPlusTreeTexto(BPlusTree):
+    def __init__(self, t=3, compacta=False, bytes_por_no=BYTES_POR_NO_PADRAO):
+        # 't' e 'compacta' só mantêm a assinatura das outras árvores: o
+        # tamanho dos nós vem de bytes_por_no e as chaves são sempre prefixadas
+        super().__init__(t, compacta, bytes_por_no)
+
+    @classmethod
+    def construir_em_massa(cls, chaves, t=3, fator_preenchimento=1.0, disk_counter=None, valores=None,
+                           compacta=False, bytes_por_no=BYTES_POR_NO_PADRAO):
+        return super().construir_em_massa(chaves, t, fator_preenchimento, disk_counter, valores, compacta,
+                                          bytes_por_no)
+
+    def _novo_no(self, folha):
+        node = BPlusTreeNode(self.t, folha)
+        node.keys = ChavesPrefixadas()
+        return node
+
+    def _separador(self, esquerda, direita):
+        return separador_curto(esquerda, direita)
+
+    def _insere(self, key, trace_callback, disk_counter, valor=None, substituir=False):
+        super()._insere(key, trace_callback, disk_counter, valor, substituir)
+        self._crescer_se_passou(trace_callback, disk_counter)
+
+    def _inserir_nao_cheio(self, node, k, trace_callback, path, disk_counter, valor=None, substituir=False):
+        super()._inserir_nao_cheio(node, k, trace_callback, path, disk_counter, valor, substituir)
+        if not node.folha:
+            self._dividir_se_passou(node, posicao_filho(node.keys, k), trace_callback, path, disk_counter)
+
+    def _remove(self, key, trace_callback, disk_counter):
+        removida = super()._remove(key, trace_callback, disk_counter)
+        self._crescer_se_passou(trace_callback, disk_counter)
+        return removida
+
+    def _remover_recursivo(self, node, k, trace_callback, path, disk_counter):
+        removida = super()._remover_recursivo(node, k, trace_callback, path, disk_counter)
+        # Um empréstimo põe uma chave no filho do caminho e troca o separador
+        # do pai, e o irmão também pode ter emprestado. Sem chaves, 'node' é a
+        # raiz antiga que uma fusão descartou.
+        if not node.folha and node.keys:
+            i = posicao_filho(node.keys, k)
+            for j in (i + 1, i, i - 1):
+                if 0 <= j < len(node.children):
+                    self._dividir_se_passou(node, j, trace_callback, path, disk_counter)
+        return removida
+
+    def _crescer_se_passou(self, trace_callback, disk_counter):
+        while not self._cabe(self.raiz.keys, self.raiz.folha):
+            nova_raiz = self._novo_no(False)
+            nova_raiz.children.append(self._ref(self.raiz))
+            self.raiz = nova_raiz
+            self._dividir_se_passou(nova_raiz, 0, trace_callback, [], disk_counter)
+            registrar(disk_counter, 'raiz_cresceu')
+            if trace_callback:
+                trace_callback("Nova raiz criada: a antiga passou da capacidade", [], disk_counter)
+
+    def _dividir_se_passou(self, parent, i, trace_callback, path, disk_counter):
+        # Uma metade ainda pode não caber quando o nó passou muito do limite
+        filho = self._filho(parent, i)
+        if self._cabe(filho.keys, filho.folha):
+            return
+        self._split_child(parent, i, trace_callback, path, disk_counter)
+        self._dividir_se_passou(parent, i + 1, trace_callback, path, disk_counter)
+        self._dividir_se_passou(parent, i, trace_callback, path, disk_counter)
@@ -1,63 +1,103 @@
 # BStarTree.py
 import math
+from array import array
+
+from BuscaBinaria import posicao_chave, posicao_filho
+from Capacidade import Capacidade, tamanho_chave
+from Metricas import registrar
+from Snapshot import snapshot
 
 # A classe BStarTreeNode é idêntica à BTreeNode,
 # pois reutilizamos a lógica de remoção (com merge 2-para-1).
 class BStarTreeNode:
+    __slots__ = ('t', 'folha', 'keys', 'filhos', 'capacidade', '_snap', '_uid')
+
     def __init__(self, t, folha=False):
         self.t = t
         self.folha = folha
         self.keys = []
         self.filhos = []
+        self.capacidade = None
 
     def encontrar_chave(self, k):
-        idx = 0
-        while idx < len(self.keys) and self.keys[idx] < k:
-            idx += 1
-        return idx
+        return posicao_chave(self.keys, k)
+
+    # Ocupação em chaves ou em bytes, como na BTreeNode
+    def pode_ceder(self, filho):
+        if self.capacidade is None:
+            return len(filho.keys) >= self.t
+        return not self.capacidade.no_minimo(filho.keys, filho.folha)
+
+    def pode_emprestar(self, irmao):
+        if self.capacidade is None:
+            return len(irmao.keys) >= self.t
+        return self.pode_ceder(irmao) and not self.capacidade.cheio(self.keys, self.folha)
+
+    def troca_cabe(self, idx, chave):
+        if self.capacidade is None:
+            return True
+        return (self.capacidade.tamanho(self.keys, self.folha) - tamanho_chave(self.keys[idx])
+                + tamanho_chave(chave) <= self.capacidade.bytes_por_no)
+
+    def fusao_cabe(self, idx):
+        if self.capacidade is None:
+            return True
+        keys = self.filhos[idx].keys[:]
+        keys.append(self.keys[idx])
+        keys.extend(self.filhos[idx + 1].keys)
+        return self.capacidade.cabe(keys, self.filhos[idx].folha)
     
     # Métodos de remoção (reutilizados da B-Tree, com contadores)
     def remover(self, k, trace_callback, path, disk_counter):
         disk_counter['reads'] += 1
-        trace_callback(f"Analisando nó {self.keys} para remover {k}", path, disk_counter)
+        if trace_callback:
+            trace_callback(f"Analisando nó {self.keys} para remover {k}", path, disk_counter)
         idx = self.encontrar_chave(k)
         if idx < len(self.keys) and self.keys[idx] == k:
             if self.folha:
                 self.keys.pop(idx)
                 disk_counter['writes'] += 1
-                trace_callback(f"Removeu chave {k} da folha", path, disk_counter)
+                if trace_callback:
+                    trace_callback(f"Removeu chave {k} da folha", path, disk_counter)
             else:
                 self.remover_de_no_nao_folha(idx, trace_callback, path, disk_counter)
         else:
             if self.folha:
-                trace_callback(f"Chave {k} não encontrada", path, disk_counter)
+                if trace_callback:
+                    trace_callback(f"Chave {k} não encontrada", path, disk_counter)
                 return
             flag = idx == len(self.keys)
-            if len(self.filhos[idx].keys) < self.t:
+            if not self.pode_ceder(self.filhos[idx]):
                 self.preencher(idx, trace_callback, path, disk_counter)
             if flag and idx > len(self.keys):
-                self.filhos[idx - 1].remover(k, trace_callback, path + [idx - 1], disk_counter)
+                self.filhos[idx - 1].remover(k, trace_callback, path + [idx - 1] if trace_callback else None, disk_counter)
             else:
-                self.filhos[idx].remover(k, trace_callback, path + [idx], disk_counter)
+                self.filhos[idx].remover(k, trace_callback, path + [idx] if trace_callback else None, disk_counter)
 
     def remover_de_no_nao_folha(self, idx, trace_callback, path, disk_counter):
         k = self.keys[idx]
-        if len(self.filhos[idx].keys) >= self.t:
-            pred = self.get_predecessor(idx, disk_counter)
+        pred = self.get_predecessor(idx, disk_counter) if self.pode_ceder(self.filhos[idx]) else None
+        succ = None
+        if pred is None or not self.troca_cabe(idx, pred):
+            succ = self.get_sucessor(idx, disk_counter) if self.pode_ceder(self.filhos[idx+1]) else None
+        # Em bytes, sem troca nem fusão que caibam, fica a troca (ver BTreeNode)
+        if succ is None and pred is not None and (self.troca_cabe(idx, pred) or not self.fusao_cabe(idx)):
             self.keys[idx] = pred
             disk_counter['writes'] += 1
-            trace_callback(f"Substituindo {k} pelo predecessor {pred}", path, disk_counter)
-            self.filhos[idx].remover(pred, trace_callback, path + [idx], disk_counter)
-        elif len(self.filhos[idx+1].keys) >= self.t:
-            succ = self.get_sucessor(idx, disk_counter)
+            if trace_callback:
+                trace_callback(f"Substituindo {k} pelo predecessor {pred}", path, disk_counter)
+            self.filhos[idx].remover(pred, trace_callback, path + [idx] if trace_callback else None, disk_counter)
+        elif succ is not None and (self.troca_cabe(idx, succ) or not self.fusao_cabe(idx)):
             self.keys[idx] = succ
             disk_counter['writes'] += 1
-            trace_callback(f"Substituindo {k} pelo sucessor {succ}", path, disk_counter)
-            self.filhos[idx+1].remover(succ, trace_callback, path + [idx + 1], disk_counter)
+            if trace_callback:
+                trace_callback(f"Substituindo {k} pelo sucessor {succ}", path, disk_counter)
+            self.filhos[idx+1].remover(succ, trace_callback, path + [idx + 1] if trace_callback else None, disk_counter)
         else:
-            trace_callback(f"Fazendo merge dos filhos {idx} e {idx+1}", path, disk_counter)
+            if trace_callback:
+                trace_callback(f"Fazendo merge dos filhos {idx} e {idx+1}", path, disk_counter)
             self.fundir(idx, trace_callback, path, disk_counter)
-            self.filhos[idx].remover(k, trace_callback, path + [idx], disk_counter)
+            self.filhos[idx].remover(k, trace_callback, path + [idx] if trace_callback else None, disk_counter)
 
     def get_predecessor(self, idx, disk_counter):
         atual = self.filhos[idx]
@@ -76,114 +116,222 @@ class BStarTreeNode:
         return atual.keys[0]
 
     def preencher(self, idx, trace_callback, path, disk_counter):
-        if idx != 0 and len(self.filhos[idx-1].keys) >= self.t:
+        if idx != 0 and self.pode_emprestar(self.filhos[idx-1]):
             self.pegar_do_anterior(idx, trace_callback, path, disk_counter)
-        elif idx != len(self.keys) and len(self.filhos[idx+1].keys) >= self.t:
+        elif idx != len(self.keys) and self.pode_emprestar(self.filhos[idx+1]):
             self.pegar_do_proximo(idx, trace_callback, path, disk_counter)
         else:
-            if idx != len(self.keys):
-                self.fundir(idx, trace_callback, path, disk_counter)
-            else:
-                self.fundir(idx-1, trace_callback, path, disk_counter)
+            j = idx if idx != len(self.keys) else idx - 1
+            if not self.fusao_cabe(j):
+                if trace_callback:
+                    trace_callback(f"Merge dos filhos {j} e {j+1} não cabe num nó; nada a fazer", path, disk_counter)
+                return
+            self.fundir(j, trace_callback, path, disk_counter)
 
     def pegar_do_anterior(self, idx, trace_callback, path, disk_counter):
         filho = self.filhos[idx]; irmao = self.filhos[idx-1]
         disk_counter['reads'] += 2; disk_counter['writes'] += 3
+        registrar(disk_counter, 'emprestimo')
         filho.keys.insert(0, self.keys[idx-1])
         if not filho.folha: filho.filhos.insert(0, irmao.filhos.pop())
         self.keys[idx-1] = irmao.keys.pop()
-        trace_callback(f"Pegou chave emprestada do irmão à esquerda", path, disk_counter)
+        if trace_callback:
+            trace_callback(f"Pegou chave emprestada do irmão à esquerda", path, disk_counter)
 
     def pegar_do_proximo(self, idx, trace_callback, path, disk_counter):
         filho = self.filhos[idx]; irmao = self.filhos[idx+1]
         disk_counter['reads'] += 2; disk_counter['writes'] += 3
+        registrar(disk_counter, 'emprestimo')
         filho.keys.append(self.keys[idx])
         if not filho.folha: filho.filhos.append(irmao.filhos.pop(0))
         self.keys[idx] = irmao.keys.pop(0)
-        trace_callback(f"Pegou chave emprestada do irmão à direita", path, disk_counter)
+        if trace_callback:
+            trace_callback(f"Pegou chave emprestada do irmão à direita", path, disk_counter)
 
     def fundir(self, idx, trace_callback, path, disk_counter):
         filho = self.filhos[idx]; irmao = self.filhos[idx+1]
         disk_counter['reads'] += 2; disk_counter['writes'] += 2
+        registrar(disk_counter, 'fusao')
         filho.keys.append(self.keys.pop(idx))
         filho.keys.extend(irmao.keys)
         if not filho.folha: filho.filhos.extend(irmao.filhos)
         self.filhos.pop(idx+1)
-        trace_callback(f"Merge realizado", path, disk_counter)
+        if trace_callback:
+            trace_callback(f"Merge realizado", path, disk_counter)
 
 
 class BStarTree:
-    def __init__(self, t=3):
+    # compacta=True: chaves em array('q'), como na BTree
+    # bytes_por_no: capacidade em bytes em vez de t, como na BTree; a
+    # redistribuição equilibra os dois irmãos pelo tamanho e o split 2-para-3
+    # corta em terços do tamanho
+    def __init__(self, t=3, compacta=False, bytes_por_no=None):
         if t < 3:
             raise ValueError("O grau 't' para a Árvore B* deve ser no mínimo 3.")
-        self.raiz = BStarTreeNode(t, True)
         self.t = t
+        self.compacta = compacta
+        self.capacidade = Capacidade(bytes_por_no) if bytes_por_no is not None else None
+        self.raiz = self._novo_no(True)
+
+    def _novo_no(self, folha):
+        node = BStarTreeNode(self.t, folha)
+        node.capacidade = self.capacidade
+        if self.compacta:
+            node.keys = array('q')
+        return node
+
+    def _cheio(self, node):
+        if self.capacidade is None:
+            return len(node.keys) >= 2 * self.t - 1
+        return self.capacidade.cheio(node.keys, node.folha)
+
+    # Busca pontual sem trace: desce da raiz até a folha num laço simples.
+    def busca(self, key, disk_counter=None):
+        node = self.raiz
+        while True:
+            if disk_counter is not None:
+                disk_counter['reads'] += 1
+            i = node.encontrar_chave(key)
+            if i < len(node.keys) and node.keys[i] == key:
+                return True
+            if node.folha:
+                return False
+            node = node.filhos[i]
+
+    def __contains__(self, key):
+        return self.busca(key)
+
+    def snapshot(self, tocados=()):
+        """Cópia congelada da árvore; compartilha com a cópia anterior os nós fora de 'tocados'."""
+        return snapshot(self.raiz, tocados)
 
-    def insere_com_trace(self, key, trace_callback):
+    def busca_com_trace(self, key, trace_callback):
         disk_counter = {'reads': 0, 'writes': 0}
+        node = self.raiz
+        path = []
+        while True:
+            disk_counter['reads'] += 1
+            trace_callback(f"Analisando nó {node.keys} para buscar {key}", path, disk_counter)
+            i = node.encontrar_chave(key)
+            if i < len(node.keys) and node.keys[i] == key:
+                trace_callback(f"Chave {key} encontrada", path, disk_counter)
+                return True
+            if node.folha:
+                trace_callback(f"Chave {key} não encontrada", path, disk_counter)
+                return False
+            node = node.filhos[i]
+            path = path + [i]
+
+    def insere_com_trace(self, key, trace_callback, disk_counter=None):
+        if disk_counter is None:
+            disk_counter = {'reads': 0, 'writes': 0}
+        self._insere(key, trace_callback, disk_counter)
+
+    # Modo sem trace: nenhuma mensagem é formatada e nenhum caminho é montado.
+    # A contagem de acessos a disco é opcional: passe um dicionário para acumulá-la.
+    def insere(self, key, disk_counter=None):
+        if disk_counter is None:
+            disk_counter = {'reads': 0, 'writes': 0}
+        self._insere(key, None, disk_counter)
+        return disk_counter
+
+    def _insere(self, key, trace_callback, disk_counter):
+        if self.capacidade is not None:
+            self.capacidade.conferir(key)
         raiz = self.raiz
         disk_counter['reads'] += 1
-        if len(raiz.keys) == 2 * self.t - 1:
-            new_root = BStarTreeNode(self.t, False)
+        if self._cheio(raiz):
+            new_root = self._novo_no(False)
             new_root.filhos.append(self.raiz)
             disk_counter['writes'] += 1
             self.split_filho_1_para_2(new_root, 0, trace_callback, [], disk_counter)
             self.raiz = new_root
-            trace_callback("Nova raiz criada após split", [], disk_counter)
-            self.insert_recursivo_com_trace(new_root, key, trace_callback, [], disk_counter)
+            registrar(disk_counter, 'raiz_cresceu')
+            if trace_callback:
+                trace_callback("Nova raiz criada após split", [], disk_counter)
+            self.insert_recursivo_com_trace(new_root, key, trace_callback, [] if trace_callback else None, disk_counter)
         else:
-            self.insert_recursivo_com_trace(raiz, key, trace_callback, [], disk_counter)
+            self.insert_recursivo_com_trace(raiz, key, trace_callback, [] if trace_callback else None, disk_counter)
 
     def insert_recursivo_com_trace(self, node, key, trace_callback, path, disk_counter):
-        trace_callback(f"Analisando nó {node.keys} para inserir {key}", path, disk_counter)
-        i = len(node.keys) - 1
+        if trace_callback:
+            trace_callback(f"Analisando nó {node.keys} para inserir {key}", path, disk_counter)
         if node.folha:
-            node.keys.append(None)
-            while i >= 0 and key < node.keys[i]:
-                node.keys[i + 1] = node.keys[i]
-                i -= 1
-            node.keys[i + 1] = key
+            node.keys.insert(posicao_filho(node.keys, key), key)
             disk_counter['writes'] += 1
-            trace_callback(f"Inseriu chave {key}", path, disk_counter)
+            if trace_callback:
+                trace_callback(f"Inseriu chave {key}", path, disk_counter)
         else:
-            while i >= 0 and key < node.keys[i]:
-                i -= 1
-            i += 1
-            
+            i = posicao_filho(node.keys, key)
             disk_counter['reads'] += 1
-            if len(node.filhos[i].keys) == 2 * self.t - 1:
+            if self._cheio(node.filhos[i]):
                 self.handle_filho_cheio(node, i, trace_callback, path, disk_counter)
-                i = len(node.keys)
-                while i > 0 and key < node.keys[i-1]:
-                    i -= 1
-            self.insert_recursivo_com_trace(node.filhos[i], key, trace_callback, path + [i], disk_counter)
+                i = posicao_filho(node.keys, key)
+                if self._cheio(node.filhos[i]):
+                    # A chave agora vai para o irmão que recebeu a redistribuição,
+                    # e ele ficou cheio: split 2-para-3 em vez de descer nele
+                    self._split_2_para_3_com_irmao(node, i, trace_callback, path, disk_counter)
+                    i = posicao_filho(node.keys, key)
+            self.insert_recursivo_com_trace(node.filhos[i], key, trace_callback, path + [i] if trace_callback else None, disk_counter)
 
     def handle_filho_cheio(self, parent, child_idx, trace_callback, path, disk_counter):
         if child_idx < len(parent.filhos) - 1:
             disk_counter['reads'] += 1
-            if len(parent.filhos[child_idx + 1].keys) < 2 * self.t - 1:
-                trace_callback(f"Nó filho cheio. Redistribuindo com irmão direito.", path, disk_counter)
+            if self._pode_redistribuir(parent, child_idx, child_idx + 1):
+                if trace_callback:
+                    trace_callback(f"Nó filho cheio. Redistribuindo com irmão direito.", path, disk_counter)
                 self.redistribuir_chaves(parent, child_idx, child_idx + 1, trace_callback, path, disk_counter)
                 return
         if child_idx > 0:
             disk_counter['reads'] += 1
-            if len(parent.filhos[child_idx - 1].keys) < 2 * self.t - 1:
-                trace_callback(f"Nó filho cheio. Redistribuindo com irmão esquerdo.", path, disk_counter)
+            if self._pode_redistribuir(parent, child_idx, child_idx - 1):
+                if trace_callback:
+                    trace_callback(f"Nó filho cheio. Redistribuindo com irmão esquerdo.", path, disk_counter)
                 self.redistribuir_chaves(parent, child_idx, child_idx - 1, trace_callback, path, disk_counter)
                 return
-        
+        self._split_2_para_3_com_irmao(parent, child_idx, trace_callback, path, disk_counter)
+
+    def _split_2_para_3_com_irmao(self, parent, child_idx, trace_callback, path, disk_counter):
         if child_idx < len(parent.filhos) - 1:
-             trace_callback(f"Irmãos cheios. Tentando split 2-para-3 com irmão direito.", path, disk_counter)
+             if trace_callback:
+                 trace_callback(f"Irmãos cheios. Tentando split 2-para-3 com irmão direito.", path, disk_counter)
              self.split_filho_2_para_3(parent, child_idx, trace_callback, path, disk_counter)
         else:
-             trace_callback(f"Irmãos cheios. Tentando split 2-para-3 com irmão esquerdo.", path, disk_counter)
+             if trace_callback:
+                 trace_callback(f"Irmãos cheios. Tentando split 2-para-3 com irmão esquerdo.", path, disk_counter)
              self.split_filho_2_para_3(parent, child_idx - 1, trace_callback, path, disk_counter)
 
+    def _pode_redistribuir(self, parent, full_node_idx, other_node_idx):
+        if self.capacidade is None:
+            return len(parent.filhos[other_node_idx].keys) < 2 * self.t - 1
+        # Em bytes, só se depois de equilibrar os dois nenhum fica cheio
+        esquerda, _, direita, _ = self._equilibrar(parent, min(full_node_idx, other_node_idx))
+        folha = parent.filhos[full_node_idx].folha
+        return not self.capacidade.cheio(esquerda, folha) and not self.capacidade.cheio(direita, folha)
+
+    def _equilibrar(self, parent, i):
+        # Chaves de filhos[i] e filhos[i+1] mais o separador, cortadas ao meio
+        # em bytes: (esquerda, separador novo, direita, índice do separador)
+        todas = parent.filhos[i].keys[:]
+        todas.append(parent.keys[i])
+        todas.extend(parent.filhos[i + 1].keys)
+        m = self.capacidade.meio(todas, False)
+        return todas[:m], todas[m], todas[m + 1:], m
+
     def redistribuir_chaves(self, parent, full_node_idx, other_node_idx, trace_callback, path, disk_counter):
         disk_counter['writes'] += 3
+        registrar(disk_counter, 'redistribuicao')
         full_node = parent.filhos[full_node_idx]
         other_node = parent.filhos[other_node_idx]
-        if full_node_idx > other_node_idx:
+        if self.capacidade is not None:
+            # Em bytes uma chave só pode não bastar para o nó deixar de estar cheio
+            i = min(full_node_idx, other_node_idx)
+            esquerda, direita = parent.filhos[i], parent.filhos[i + 1]
+            esquerda.keys, parent.keys[i], direita.keys, m = self._equilibrar(parent, i)
+            if not full_node.folha:
+                filhos = esquerda.filhos + direita.filhos
+                esquerda.filhos, direita.filhos = filhos[:m + 1], filhos[m + 1:]
+        elif full_node_idx > other_node_idx:
             other_node.keys.append(parent.keys[other_node_idx])
             parent.keys[other_node_idx] = full_node.keys.pop(0)
             if not full_node.folha:
@@ -193,35 +341,44 @@ class BStarTree:
             parent.keys[full_node_idx] = full_node.keys.pop()
             if not full_node.folha:
                 other_node.filhos.insert(0, full_node.filhos.pop())
-        trace_callback(f"Chaves redistribuídas", path, disk_counter)
+        if trace_callback:
+            trace_callback(f"Chaves redistribuídas", path, disk_counter)
 
     def split_filho_1_para_2(self, parent, i, trace_callback, path, disk_counter):
         disk_counter['writes'] += 3
-        t = self.t
+        registrar(disk_counter, 'split')
         y = parent.filhos[i]
-        z = BStarTreeNode(t, y.folha)
-        middle_key = y.keys[t - 1]
-        z.keys = y.keys[t:]
-        y.keys = y.keys[:t - 1]
+        z = self._novo_no(y.folha)
+        m = self.t - 1 if self.capacidade is None else self.capacidade.meio(y.keys, False)
+        middle_key = y.keys[m]
+        z.keys = y.keys[m + 1:]
+        y.keys = y.keys[:m]
         if not y.folha:
-            z.filhos = y.filhos[t:]
-            y.filhos = y.filhos[:t]
+            z.filhos = y.filhos[m + 1:]
+            y.filhos = y.filhos[:m + 1]
         parent.filhos.insert(i + 1, z)
         parent.keys.insert(i, middle_key)
-        trace_callback(f"Split 1-para-2 no filho {i}, promoveu {middle_key}", path, disk_counter)
+        if trace_callback:
+            trace_callback(f"Split 1-para-2 no filho {i}, promoveu {middle_key}", path, disk_counter)
         
     def split_filho_2_para_3(self, parent, i, trace_callback, path, disk_counter):
         disk_counter['writes'] += 4
-        t = self.t
+        registrar(disk_counter, 'split_2_para_3')
         y = parent.filhos[i]
         z = parent.filhos[i + 1]
         parent_key = parent.keys.pop(i)
-        w = BStarTreeNode(t, y.folha)
-        all_keys = y.keys + [parent_key] + z.keys
+        w = self._novo_no(y.folha)
+        # Cópia de y.keys: mantém o tipo (lista ou array) das chaves
+        all_keys = y.keys[:]
+        all_keys.append(parent_key)
+        all_keys.extend(z.keys)
         all_children = y.filhos + z.filhos
         
-        key_up1_idx = (len(all_keys) // 3)
-        key_up2_idx = 2 * (len(all_keys) // 3) + 1
+        if self.capacidade is None:
+            key_up1_idx = (len(all_keys) // 3)
+            key_up2_idx = 2 * (len(all_keys) // 3) + 1
+        else:
+            key_up1_idx, key_up2_idx = self.capacidade.tercos(all_keys)
         key_up1 = all_keys[key_up1_idx]
         key_up2 = all_keys[key_up2_idx]
         
@@ -230,8 +387,8 @@ class BStarTree:
         z.keys = all_keys[key_up2_idx + 1:]
 
         if not y.folha:
-            children_split1 = (len(all_children) // 3)
-            children_split2 = 2 * (len(all_children) // 3)
+            children_split1 = key_up1_idx + 1
+            children_split2 = key_up2_idx + 1
             y.filhos = all_children[:children_split1]
             w.filhos = all_children[children_split1:children_split2]
             z.filhos = all_children[children_split2:]
@@ -239,16 +396,30 @@ class BStarTree:
         parent.keys.insert(i, key_up1)
         parent.keys.insert(i + 1, key_up2)
         parent.filhos.insert(i + 1, w)
-        trace_callback(f"Split 2-para-3. Promoveu {key_up1} e {key_up2}", path, disk_counter)
+        if trace_callback:
+            trace_callback(f"Split 2-para-3. Promoveu {key_up1} e {key_up2}", path, disk_counter)
 
-    def remover_com_trace(self, key, trace_callback):
-        disk_counter = {'reads': 0, 'writes': 0}
+    def remover_com_trace(self, key, trace_callback, disk_counter=None):
+        if disk_counter is None:
+            disk_counter = {'reads': 0, 'writes': 0}
+        self._remove(key, trace_callback, disk_counter)
+
+    def remover(self, key, disk_counter=None):
+        if disk_counter is None:
+            disk_counter = {'reads': 0, 'writes': 0}
+        self._remove(key, None, disk_counter)
+        return disk_counter
+
+    def _remove(self, key, trace_callback, disk_counter):
         if not self.raiz:
-            trace_callback("Remoção finalizada.", [], disk_counter)
+            if trace_callback:
+                trace_callback("Remoção finalizada.", [], disk_counter)
             return
 
-        self.raiz.remover(key, trace_callback, [], disk_counter)
+        self.raiz.remover(key, trace_callback, [] if trace_callback else None, disk_counter)
         if len(self.raiz.keys) == 0 and not self.raiz.folha:
             disk_counter['reads'] += 1
             self.raiz = self.raiz.filhos[0]
-        trace_callback(f"Remoção finalizada para chave {key}", [], disk_counter)
\ No newline at end of file
+            registrar(disk_counter, 'raiz_encolheu')
+        if trace_callback:
+            trace_callback(f"Remoção finalizada para chave {key}", [], disk_counter)
\ No newline at end of file
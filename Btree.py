@@ -1,60 +1,115 @@
 # Btree.py
 
+from array import array
+
+from BuscaBinaria import posicao_chave, posicao_filho
+from Capacidade import Capacidade, tamanho_chave
+from Metricas import registrar
+from Snapshot import snapshot
+
 class BTreeNode:
+    # Sem __dict__ por nó; '_snap' e '_uid' são usados pelos snapshots
+    __slots__ = ('t', 'folha', 'keys', 'filhos', 'capacidade', '_snap', '_uid')
+
     def __init__(self, t, folha=False):
         self.t = t
         self.folha = folha
         self.keys = []
         self.filhos = []
+        self.capacidade = None
+
+    # Ocupação: de t-1 a 2t-1 chaves ou, com capacidade em bytes, pelo
+    # tamanho codificado do nó (ver Capacidade.py)
+    def pode_ceder(self, filho):
+        # O filho perde uma chave sem ficar abaixo do mínimo
+        if self.capacidade is None:
+            return len(filho.keys) >= self.t
+        return not self.capacidade.no_minimo(filho.keys, filho.folha)
+
+    def pode_emprestar(self, irmao):
+        # Em bytes, a chave que sobe do irmão pode ser maior que a do pai
+        if self.capacidade is None:
+            return len(irmao.keys) >= self.t
+        return self.pode_ceder(irmao) and not self.capacidade.cheio(self.keys, self.folha)
+
+    def troca_cabe(self, idx, chave):
+        # Trocar keys[idx] por um predecessor ou sucessor de outro tamanho
+        if self.capacidade is None:
+            return True
+        return (self.capacidade.tamanho(self.keys, self.folha) - tamanho_chave(self.keys[idx])
+                + tamanho_chave(chave) <= self.capacidade.bytes_por_no)
+
+    def fusao_cabe(self, idx):
+        if self.capacidade is None:
+            return True
+        keys = self.filhos[idx].keys[:]
+        keys.append(self.keys[idx])
+        keys.extend(self.filhos[idx + 1].keys)
+        return self.capacidade.cabe(keys, self.filhos[idx].folha)
 
     # A lógica de remoção reside no próprio nó, de forma recursiva.
     def remover(self, k, trace_callback, path, disk_counter):
         disk_counter['reads'] += 1
-        trace_callback(f"Analisando nó {self.keys} para remover {k}", path, disk_counter)
+        if trace_callback:
+            trace_callback(f"Analisando nó {self.keys} para remover {k}", path, disk_counter)
         
-        idx = 0
-        while idx < len(self.keys) and self.keys[idx] < k:
-            idx += 1
+        idx = posicao_chave(self.keys, k)
 
         if idx < len(self.keys) and self.keys[idx] == k:
             if self.folha:
                 self.keys.pop(idx)
                 disk_counter['writes'] += 1
-                trace_callback(f"Removeu chave {k} da folha", path, disk_counter)
+                if trace_callback:
+                    trace_callback(f"Removeu chave {k} da folha", path, disk_counter)
             else:
                 self.remover_de_no_nao_folha(idx, trace_callback, path, disk_counter)
         else:
             if self.folha:
-                trace_callback(f"Chave {k} não encontrada", path, disk_counter)
+                if trace_callback:
+                    trace_callback(f"Chave {k} não encontrada", path, disk_counter)
                 return
 
             filho_a_descer = self.filhos[idx]
-            if len(filho_a_descer.keys) < self.t:
+            if not self.pode_ceder(filho_a_descer):
                 self.preencher_filho(idx, trace_callback, path, disk_counter)
             
             if idx > len(self.keys):
-                self.filhos[idx - 1].remover(k, trace_callback, path + [idx-1], disk_counter)
+                self.filhos[idx - 1].remover(k, trace_callback, path + [idx-1] if trace_callback else None, disk_counter)
             else:
-                self.filhos[idx].remover(k, trace_callback, path + [idx], disk_counter)
+                self.filhos[idx].remover(k, trace_callback, path + [idx] if trace_callback else None, disk_counter)
 
     def remover_de_no_nao_folha(self, idx, trace_callback, path, disk_counter):
         k = self.keys[idx]
-        if len(self.filhos[idx].keys) >= self.t:
-            pred = self.get_predecessor(idx, disk_counter)
-            trace_callback(f"Substituindo {k} pelo predecessor {pred}", path, disk_counter)
-            self.keys[idx] = pred
-            disk_counter['writes'] += 1
-            self.filhos[idx].remover(pred, trace_callback, path + [idx], disk_counter)
-        elif len(self.filhos[idx+1].keys) >= self.t:
-            succ = self.get_sucessor(idx, disk_counter)
-            trace_callback(f"Substituindo {k} pelo sucessor {succ}", path, disk_counter)
-            self.keys[idx] = succ
-            disk_counter['writes'] += 1
-            self.filhos[idx+1].remover(succ, trace_callback, path + [idx + 1], disk_counter)
+        pred = self.get_predecessor(idx, disk_counter) if self.pode_ceder(self.filhos[idx]) else None
+        succ = None
+        if pred is None or not self.troca_cabe(idx, pred):
+            succ = self.get_sucessor(idx, disk_counter) if self.pode_ceder(self.filhos[idx+1]) else None
+        if succ is None and pred is not None and (self.troca_cabe(idx, pred) or not self.fusao_cabe(idx)):
+            # Sem trocas que caibam e sem fusão que caiba (só em bytes): fica a
+            # troca, e o nó passa da capacidade em menos de uma entrada até o
+            # próximo split
+            self.trocar_pelo_predecessor(idx, pred, trace_callback, path, disk_counter)
+        elif succ is not None and (self.troca_cabe(idx, succ) or not self.fusao_cabe(idx)):
+            self.trocar_pelo_sucessor(idx, succ, trace_callback, path, disk_counter)
         else:
-            trace_callback(f"Fazendo merge dos filhos {idx} e {idx+1}", path, disk_counter)
+            if trace_callback:
+                trace_callback(f"Fazendo merge dos filhos {idx} e {idx+1}", path, disk_counter)
             self.fundir(idx, trace_callback, path, disk_counter)
-            self.filhos[idx].remover(k, trace_callback, path + [idx], disk_counter)
+            self.filhos[idx].remover(k, trace_callback, path + [idx] if trace_callback else None, disk_counter)
+
+    def trocar_pelo_predecessor(self, idx, pred, trace_callback, path, disk_counter):
+        if trace_callback:
+            trace_callback(f"Substituindo {self.keys[idx]} pelo predecessor {pred}", path, disk_counter)
+        self.keys[idx] = pred
+        disk_counter['writes'] += 1
+        self.filhos[idx].remover(pred, trace_callback, path + [idx] if trace_callback else None, disk_counter)
+
+    def trocar_pelo_sucessor(self, idx, succ, trace_callback, path, disk_counter):
+        if trace_callback:
+            trace_callback(f"Substituindo {self.keys[idx]} pelo sucessor {succ}", path, disk_counter)
+        self.keys[idx] = succ
+        disk_counter['writes'] += 1
+        self.filhos[idx+1].remover(succ, trace_callback, path + [idx + 1] if trace_callback else None, disk_counter)
 
     def get_predecessor(self, idx, disk_counter):
         atual = self.filhos[idx]
@@ -73,18 +128,23 @@ class BTreeNode:
         return atual.keys[0]
 
     def preencher_filho(self, idx, trace_callback, path, disk_counter):
-        if idx > 0 and len(self.filhos[idx - 1].keys) >= self.t:
+        if idx > 0 and self.pode_emprestar(self.filhos[idx - 1]):
             self.pegar_do_anterior(idx, trace_callback, path, disk_counter)
-        elif idx < len(self.filhos) - 1 and len(self.filhos[idx + 1].keys) >= self.t:
+        elif idx < len(self.filhos) - 1 and self.pode_emprestar(self.filhos[idx + 1]):
             self.pegar_do_proximo(idx, trace_callback, path, disk_counter)
         else:
-            if idx < len(self.keys):
-                self.fundir(idx, trace_callback, path, disk_counter)
-            else:
-                self.fundir(idx - 1, trace_callback, path, disk_counter)
+            j = idx if idx < len(self.keys) else idx - 1
+            if not self.fusao_cabe(j):
+                # Só em bytes: o pai cheio impediu o empréstimo e os dois
+                # irmãos juntos não cabem num nó; o filho segue no mínimo
+                if trace_callback:
+                    trace_callback(f"Merge dos filhos {j} e {j+1} não cabe num nó; nada a fazer", path, disk_counter)
+                return
+            self.fundir(j, trace_callback, path, disk_counter)
 
     def pegar_do_anterior(self, idx, trace_callback, path, disk_counter):
         disk_counter['reads'] += 2; disk_counter['writes'] += 3
+        registrar(disk_counter, 'emprestimo')
         filho = self.filhos[idx]
         irmao = self.filhos[idx - 1]
         filho.keys.insert(0, self.keys[idx-1])
@@ -92,20 +152,24 @@ class BTreeNode:
             filho.filhos.insert(0, irmao.filhos.pop())
         parent_key = irmao.keys.pop()
         self.keys[idx-1] = parent_key
-        trace_callback("Pegou chave emprestada do irmão à esquerda", path, disk_counter)
+        if trace_callback:
+            trace_callback("Pegou chave emprestada do irmão à esquerda", path, disk_counter)
 
     def pegar_do_proximo(self, idx, trace_callback, path, disk_counter):
         disk_counter['reads'] += 2; disk_counter['writes'] += 3
+        registrar(disk_counter, 'emprestimo')
         filho = self.filhos[idx]
         irmao = self.filhos[idx + 1]
         filho.keys.append(self.keys[idx])
         if not irmao.folha:
             filho.filhos.append(irmao.filhos.pop(0))
         self.keys[idx] = irmao.keys.pop(0)
-        trace_callback("Pegou chave emprestada do irmão à direita", path, disk_counter)
+        if trace_callback:
+            trace_callback("Pegou chave emprestada do irmão à direita", path, disk_counter)
 
     def fundir(self, idx, trace_callback, path, disk_counter):
         disk_counter['reads'] += 2; disk_counter['writes'] += 2
+        registrar(disk_counter, 'fusao')
         filho = self.filhos[idx]
         irmao = self.filhos[idx + 1]
         filho.keys.append(self.keys.pop(idx))
@@ -113,81 +177,161 @@ class BTreeNode:
         if not filho.folha:
             filho.filhos.extend(irmao.filhos)
         self.filhos.pop(idx + 1)
-        trace_callback("Merge realizado.", path + [idx], disk_counter)
+        if trace_callback:
+            trace_callback("Merge realizado.", path + [idx], disk_counter)
 
 
 class BTree:
-    def __init__(self, t=2):
-        self.raiz = BTreeNode(t, True)
+    # compacta=True guarda as chaves de cada nó num array('q') (inteiros de
+    # 64 bits sem objeto por chave) em vez de uma lista.
+    # bytes_por_no: capacidade dos nós em bytes em vez de t (ver Capacidade.py);
+    # split, empréstimo e merge passam a olhar o tamanho codificado do nó.
+    def __init__(self, t=2, compacta=False, bytes_por_no=None):
         self.t = t
+        self.compacta = compacta
+        self.capacidade = Capacidade(bytes_por_no) if bytes_por_no is not None else None
+        self.raiz = self._novo_no(True)
+
+    def _novo_no(self, folha):
+        node = BTreeNode(self.t, folha)
+        node.capacidade = self.capacidade
+        if self.compacta:
+            node.keys = array('q')
+        return node
 
-    def insere_com_trace(self, key, trace_callback):
+    def _cheio(self, node):
+        if self.capacidade is None:
+            return len(node.keys) == 2 * self.t - 1
+        return self.capacidade.cheio(node.keys, node.folha)
+
+    # Busca pontual sem trace: desce da raiz até a folha num laço simples.
+    def busca(self, key, disk_counter=None):
+        node = self.raiz
+        while True:
+            if disk_counter is not None:
+                disk_counter['reads'] += 1
+            i = posicao_chave(node.keys, key)
+            if i < len(node.keys) and node.keys[i] == key:
+                return True
+            if node.folha:
+                return False
+            node = node.filhos[i]
+
+    def __contains__(self, key):
+        return self.busca(key)
+
+    def snapshot(self, tocados=()):
+        """Cópia congelada da árvore; compartilha com a cópia anterior os nós fora de 'tocados'."""
+        return snapshot(self.raiz, tocados)
+
+    def busca_com_trace(self, key, trace_callback):
         disk_counter = {'reads': 0, 'writes': 0}
+        node = self.raiz
+        path = []
+        while True:
+            disk_counter['reads'] += 1
+            trace_callback(f"Analisando nó {node.keys} para buscar {key}", path, disk_counter)
+            i = posicao_chave(node.keys, key)
+            if i < len(node.keys) and node.keys[i] == key:
+                trace_callback(f"Chave {key} encontrada", path, disk_counter)
+                return True
+            if node.folha:
+                trace_callback(f"Chave {key} não encontrada", path, disk_counter)
+                return False
+            node = node.filhos[i]
+            path = path + [i]
+
+    def insere_com_trace(self, key, trace_callback, disk_counter=None):
+        if disk_counter is None:
+            disk_counter = {'reads': 0, 'writes': 0}
+        self._insere(key, trace_callback, disk_counter)
+
+    # Modo sem trace: nenhuma mensagem é formatada e nenhum caminho é montado.
+    # A contagem de acessos a disco é opcional: passe um dicionário para acumulá-la.
+    def insere(self, key, disk_counter=None):
+        if disk_counter is None:
+            disk_counter = {'reads': 0, 'writes': 0}
+        self._insere(key, None, disk_counter)
+        return disk_counter
+
+    def _insere(self, key, trace_callback, disk_counter):
+        if self.capacidade is not None:
+            self.capacidade.conferir(key)
         raiz = self.raiz
         disk_counter['reads'] += 1
-        if len(raiz.keys) == 2 * self.t - 1:
-            nova_raiz = BTreeNode(self.t, False)
+        if self._cheio(raiz):
+            nova_raiz = self._novo_no(False)
             nova_raiz.filhos.append(self.raiz)
             disk_counter['writes'] += 1
             self._split_filho(nova_raiz, 0, trace_callback, [], disk_counter)
             self.raiz = nova_raiz
-            trace_callback("Nova raiz criada após split", [], disk_counter)
-            self._insert_recursivo(self.raiz, key, trace_callback, [], disk_counter)
-        else:
-            self._insert_recursivo(self.raiz, key, trace_callback, [], disk_counter)
+            registrar(disk_counter, 'raiz_cresceu')
+            if trace_callback:
+                trace_callback("Nova raiz criada após split", [], disk_counter)
+        self._insert_recursivo(self.raiz, key, trace_callback, [] if trace_callback else None, disk_counter)
 
     def _insert_recursivo(self, node, key, trace_callback, path, disk_counter):
-        trace_callback(f"Analisando nó {node.keys} para inserir {key}", path, disk_counter)
-        i = len(node.keys) - 1
+        if trace_callback:
+            trace_callback(f"Analisando nó {node.keys} para inserir {key}", path, disk_counter)
         if node.folha:
-            node.keys.append(None)
-            while i >= 0 and key < node.keys[i]:
-                node.keys[i + 1] = node.keys[i]
-                i -= 1
-            node.keys[i + 1] = key
+            node.keys.insert(posicao_filho(node.keys, key), key)
             disk_counter['writes'] += 1
-            trace_callback(f"Inseriu chave {key}", path, disk_counter)
+            if trace_callback:
+                trace_callback(f"Inseriu chave {key}", path, disk_counter)
         else:
-            while i >= 0 and key < node.keys[i]:
-                i -= 1
-            i += 1
-            
+            i = posicao_filho(node.keys, key)
             disk_counter['reads'] += 1
-            if len(node.filhos[i].keys) == 2 * self.t - 1:
+            if self._cheio(node.filhos[i]):
                 self._split_filho(node, i, trace_callback, path, disk_counter)
                 if key > node.keys[i]:
                     i += 1
-            self._insert_recursivo(node.filhos[i], key, trace_callback, path + [i], disk_counter)
+            self._insert_recursivo(node.filhos[i], key, trace_callback, path + [i] if trace_callback else None, disk_counter)
 
     def _split_filho(self, parent, i, trace_callback, path, disk_counter):
         disk_counter['writes'] += 3
-        t = self.t
+        registrar(disk_counter, 'split')
         y = parent.filhos[i]
-        z = BTreeNode(t, y.folha)
-        middle_key = y.keys[t - 1]
+        z = self._novo_no(y.folha)
+        # A chave do meio sobe; em bytes, a que divide o tamanho ao meio
+        m = self.t - 1 if self.capacidade is None else self.capacidade.meio(y.keys, False)
+        middle_key = y.keys[m]
         
-        z.keys = y.keys[t:]
-        y.keys = y.keys[:t - 1]
+        z.keys = y.keys[m + 1:]
+        y.keys = y.keys[:m]
         
         if not y.folha:
-            z.filhos = y.filhos[t:]
-            y.filhos = y.filhos[:t]
+            z.filhos = y.filhos[m + 1:]
+            y.filhos = y.filhos[:m + 1]
             
         parent.filhos.insert(i + 1, z)
         parent.keys.insert(i, middle_key)
-        trace_callback(f"Split no filho {i}, promoveu chave {middle_key}", path, disk_counter)
+        if trace_callback:
+            trace_callback(f"Split no filho {i}, promoveu chave {middle_key}", path, disk_counter)
 
-    def remover_com_trace(self, key, trace_callback):
-        disk_counter = {'reads': 0, 'writes': 0}
+    def remover_com_trace(self, key, trace_callback, disk_counter=None):
+        if disk_counter is None:
+            disk_counter = {'reads': 0, 'writes': 0}
+        self._remove(key, trace_callback, disk_counter)
+
+    def remover(self, key, disk_counter=None):
+        if disk_counter is None:
+            disk_counter = {'reads': 0, 'writes': 0}
+        self._remove(key, None, disk_counter)
+        return disk_counter
+
+    def _remove(self, key, trace_callback, disk_counter):
         if not self.raiz:
-            trace_callback("Remoção finalizada.", [], disk_counter)
+            if trace_callback:
+                trace_callback("Remoção finalizada.", [], disk_counter)
             return
         
         # A chamada inicial é feita na raiz, que então usa seus próprios métodos
-        self.raiz.remover(key, trace_callback, [], disk_counter)
+        self.raiz.remover(key, trace_callback, [] if trace_callback else None, disk_counter)
 
         if len(self.raiz.keys) == 0 and not self.raiz.folha:
             disk_counter['reads'] += 1
             self.raiz = self.raiz.filhos[0]
+            registrar(disk_counter, 'raiz_encolheu')
 
-        trace_callback(f"Remoção finalizada para chave {key}", [], disk_counter)
\ No newline at end of file
+        if trace_callback:
+            trace_callback(f"Remoção finalizada para chave {key}", [], disk_counter)
\ No newline at end of file
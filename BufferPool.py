@@ -0,0 +1,173 @@
+# BufferPool.py
+#
+# Cache limitado de páginas entre as árvores e o armazenamento. Cada quadro
+# guarda o objeto da página já decodificado, quantas vezes ele está fixado
+# (pin) e se foi alterado. Páginas fixadas nunca são despejadas; quando o
+# pool passa da capacidade, a vítima é escolhida por LRU ou CLOCK entre as
+# não fixadas e, se estiver suja, é gravada antes de sair (write-back).
+#
+# Sem funções de carga/gravação o pool funciona só como simulação: conta
+# acertos e faltas para qualquer chave (por exemplo, a identidade de um nó
+# em memória), sem I/O.
+
+from collections import OrderedDict
+
+POLITICAS = ('lru', 'clock')
+
+
+class _Quadro:
+    __slots__ = ('pagina', 'fixacoes', 'sujo', 'referenciado', 'posicao')
+
+    def __init__(self, pagina):
+        self.pagina = pagina
+        self.fixacoes = 0
+        self.sujo = False
+        self.referenciado = True
+        self.posicao = None
+
+
+class BufferPool:
+    def __init__(self, capacidade, politica='lru', carregar=None, gravar=None):
+        if capacidade < 1:
+            raise ValueError("O buffer pool precisa de pelo menos uma página.")
+        if politica not in POLITICAS:
+            raise ValueError(f"Política de substituição desconhecida: {politica!r} (use {', '.join(POLITICAS)}).")
+        self.capacidade = capacidade
+        self.politica = politica
+        self._carregar = carregar
+        self._gravar = gravar
+        # Em LRU a ordem do OrderedDict é a ordem de uso; em CLOCK os quadros
+        # ocupam posições fixas num relógio percorrido pelo ponteiro.
+        self._quadros = OrderedDict()
+        self._relogio = []
+        self._posicoes_livres = []
+        self._ponteiro = 0
+        self.estatisticas = {'hits': 0, 'misses': 0, 'evictions': 0, 'writebacks': 0}
+
+    def __len__(self):
+        return len(self._quadros)
+
+    def __contains__(self, pid):
+        return pid in self._quadros
+
+    @property
+    def taxa_acerto(self):
+        total = self.estatisticas['hits'] + self.estatisticas['misses']
+        return self.estatisticas['hits'] / total if total else 0.0
+
+    def fixar(self, pid):
+        """Retorna a página fixada; cada fixar pede um desafixar correspondente."""
+        quadro = self._quadros.get(pid)
+        if quadro is not None:
+            self.estatisticas['hits'] += 1
+            if self.politica == 'lru':
+                self._quadros.move_to_end(pid)
+            else:
+                quadro.referenciado = True
+        else:
+            self.estatisticas['misses'] += 1
+            pagina = self._carregar(pid) if self._carregar else None
+            quadro = self._instalar(pid, pagina)
+        quadro.fixacoes += 1
+        return quadro.pagina
+
+    def desafixar(self, pid, sujo=False):
+        quadro = self._quadros.get(pid)
+        if quadro is None:
+            return
+        quadro.fixacoes -= 1
+        if sujo:
+            quadro.sujo = True
+        if quadro.fixacoes == 0 and len(self._quadros) > self.capacidade:
+            self._despejar(self.capacidade)
+
+    def acessar(self, pid):
+        """Fixa e desafixa em seguida: uma leitura lógica, para simulação."""
+        pagina = self.fixar(pid)
+        self.desafixar(pid)
+        return pagina
+
+    def novo(self, pid, pagina):
+        """Instala uma página recém-criada, já fixada e suja, sem ler o disco."""
+        quadro = self._instalar(pid, pagina)
+        quadro.fixacoes += 1
+        quadro.sujo = True
+        return pagina
+
+    def marcar_sujo(self, pid):
+        quadro = self._quadros.get(pid)
+        if quadro is not None:
+            quadro.sujo = True
+
+    def descartar(self, pid):
+        """Remove a página sem gravá-la (ela foi liberada no armazenamento)."""
+        quadro = self._quadros.pop(pid, None)
+        if quadro is not None:
+            self._liberar_posicao(quadro)
+
+    def descarregar(self):
+        """Grava todas as páginas sujas, mantendo-as no cache."""
+        for pid, quadro in self._quadros.items():
+            if quadro.sujo:
+                self._escrever(pid, quadro)
+
+    # --- Substituição ---
+
+    def _instalar(self, pid, pagina):
+        if len(self._quadros) >= self.capacidade:
+            self._despejar(self.capacidade - 1)
+        quadro = _Quadro(pagina)
+        self._quadros[pid] = quadro
+        if self.politica == 'clock':
+            if self._posicoes_livres:
+                quadro.posicao = self._posicoes_livres.pop()
+                self._relogio[quadro.posicao] = pid
+            else:
+                quadro.posicao = len(self._relogio)
+                self._relogio.append(pid)
+        return quadro
+
+    def _liberar_posicao(self, quadro):
+        if quadro.posicao is not None:
+            self._relogio[quadro.posicao] = None
+            self._posicoes_livres.append(quadro.posicao)
+
+    def _despejar(self, limite):
+        # Se todas as páginas estiverem fixadas o pool excede a capacidade
+        # temporariamente; o excesso é despejado quando alguma for desafixada.
+        while len(self._quadros) > limite:
+            pid = self._vitima()
+            if pid is None:
+                return
+            quadro = self._quadros.pop(pid)
+            self._liberar_posicao(quadro)
+            if quadro.sujo:
+                self._escrever(pid, quadro)
+            self.estatisticas['evictions'] += 1
+
+    def _vitima(self):
+        if self.politica == 'lru':
+            for pid, quadro in self._quadros.items():
+                if quadro.fixacoes == 0:
+                    return pid
+            return None
+        # CLOCK: segunda chance. Duas voltas bastam para limpar todos os bits.
+        for _ in range(2 * len(self._relogio)):
+            pid = self._relogio[self._ponteiro]
+            self._ponteiro = (self._ponteiro + 1) % len(self._relogio)
+            if pid is None:
+                continue
+            quadro = self._quadros[pid]
+            if quadro.fixacoes:
+                continue
+            if quadro.referenciado:
+                quadro.referenciado = False
+                continue
+            return pid
+        return None
+
+    def _escrever(self, pid, quadro):
+        if self._gravar:
+            self._gravar(pid, quadro.pagina)
+        quadro.sujo = False
+        self.estatisticas['writebacks'] += 1
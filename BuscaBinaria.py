@@ -0,0 +1,22 @@
+# BuscaBinaria.py
+#
+# Busca dentro de um nó, compartilhada pelas três árvores. As chaves de um
+# nó estão sempre ordenadas, então bisect resolve cada nível em O(log t)
+# em vez do laço linear O(t).
+
+from bisect import bisect_left, bisect_right
+
+# Posição da primeira chave >= k: onde k está, ou onde deveria ser inserida.
+posicao_chave = bisect_left
+
+# Posição logo após a última chave <= k. É o filho a seguir quando chaves
+# iguais ao separador ficam à direita (B+) e o ponto de inserção estável.
+posicao_filho = bisect_right
+
+
+def indice_chave(keys, k):
+    """Índice de k em keys, ou -1 se a chave não estiver no nó."""
+    i = bisect_left(keys, k)
+    if i < len(keys) and keys[i] == k:
+        return i
+    return -1
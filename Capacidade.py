@@ -0,0 +1,101 @@
+# Capacidade.py
+#
+# Capacidade dos nós em bytes, em vez de 2t-1 chaves. O tamanho de um nó é
+# um cabeçalho fixo, um ponteiro por entrada (filho ou valor; os nós
+# internos têm um filho a mais que chaves) e o tamanho codificado de cada
+# chave: inteiros e floats ocupam 8 bytes, str conta em UTF-8 e bytes conta
+# o próprio comprimento. Com chaves de tamanho variável o número de entradas
+# de cada nó passa a depender das chaves que ele guarda.
+#
+# As árvores decidem de cima para baixo, antes de saber qual entrada vai
+# entrar ou sair, então as regras usam o maior tamanho possível de uma
+# entrada ('limite', 1/8 do nó; chaves maiores são recusadas):
+#   cheio         talvez não caiba mais uma entrada: divide antes de descer
+#   no mínimo     perder uma entrada pode deixá-lo abaixo de 'minimo'
+#   minimo        (capacidade - 3·limite) / 2: dois irmãos que não podem
+#                 emprestar, mais o separador do pai, sempre cabem num nó
+
+CABECALHO = 16
+PONTEIRO = 8
+
+
+def tamanho_chave(k):
+    if isinstance(k, (bytes, bytearray)):
+        return len(k)
+    if isinstance(k, str):
+        return len(k) if k.isascii() else len(k.encode('utf-8'))
+    if isinstance(k, (int, float)):
+        return 8
+    raise ValueError(f"Chave do tipo {type(k).__name__} não tem tamanho codificado.")
+
+
+def tamanho_chaves(keys):
+    # Contêineres compactos sabem o próprio tamanho (ver ChavesTexto)
+    tamanho = getattr(keys, 'bytes', None)
+    if tamanho is not None:
+        return tamanho
+    if hasattr(keys, 'itemsize'):
+        return keys.itemsize * len(keys)
+    return sum(map(tamanho_chave, keys))
+
+
+class Capacidade:
+    __slots__ = ('bytes_por_no', 'limite', 'minimo')
+
+    def __init__(self, bytes_por_no):
+        if bytes_por_no < 256:
+            raise ValueError("A capacidade em bytes de um nó deve ser de pelo menos 256.")
+        self.bytes_por_no = bytes_por_no
+        self.limite = bytes_por_no // 8
+        self.minimo = (bytes_por_no - 3 * self.limite) // 2
+
+    def conferir(self, k):
+        if tamanho_chave(k) + PONTEIRO > self.limite:
+            raise ValueError(f"Chave de {tamanho_chave(k)} bytes não cabe no limite de {self.limite} bytes "
+                             f"por entrada (1/8 de um nó de {self.bytes_por_no}).")
+
+    def tamanho(self, keys, folha):
+        return CABECALHO + tamanho_chaves(keys) + PONTEIRO * (len(keys) + (0 if folha else 1))
+
+    def cheio(self, keys, folha):
+        return self.tamanho(keys, folha) + self.limite > self.bytes_por_no
+
+    def no_minimo(self, keys, folha):
+        return self.tamanho(keys, folha) - self.limite < self.minimo
+
+    def abaixo_do_minimo(self, keys, folha):
+        return self.tamanho(keys, folha) < self.minimo
+
+    def cabe(self, keys, folha):
+        return self.tamanho(keys, folha) <= self.bytes_por_no
+
+    def meio(self, keys, folha):
+        """Ponto de divisão em bytes: numa folha, a metade direita começa em
+        keys[meio]; num nó interno, keys[meio] sobe para o pai."""
+        entradas = [tamanho_chave(k) + PONTEIRO for k in keys]
+        metade = sum(entradas) / 2
+        acumulado = 0
+        for i, tamanho in enumerate(entradas):
+            acumulado += tamanho
+            if acumulado >= metade:
+                break
+        # Folha: a entrada que cruza a metade fica à esquerda; nó interno: ela sobe
+        meio = i + 1 if folha else i
+        return min(max(meio, 1), len(keys) - 1 if folha else len(keys) - 2)
+
+    def tercos(self, keys):
+        """Pontos de divisão em bytes de um split 2-para-3 (Árvore B*): keys[i]
+        e keys[j] sobem para o pai."""
+        entradas = [tamanho_chave(k) + PONTEIRO for k in keys]
+        total = sum(entradas)
+        cortes = []
+        acumulado = 0
+        for i, tamanho in enumerate(entradas):
+            acumulado += tamanho
+            if acumulado >= total * (len(cortes) + 1) / 3:
+                cortes.append(i)
+                if len(cortes) == 2:
+                    break
+        i = min(max(cortes[0], 1), len(keys) - 4)
+        j = min(max(cortes[1], i + 2), len(keys) - 2)
+        return i, j
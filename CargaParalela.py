@@ -0,0 +1,162 @@
+# CargaParalela.py
+#
+# Carga em massa da Árvore B+ repartida entre processos. A entrada ordenada é
+# cortada em faixas contíguas; cada processo monta com construir_em_massa a
+# parte de baixo da árvore da sua faixa e devolve os níveis numa forma plana
+# (chaves e valores concatenados, tamanho de cada folha e número de filhos de
+# cada nó interno), que atravessa o pipe como poucos objetos grandes em vez de
+# um grafo de nós. O processo principal remonta os nós, emenda a lista de
+# folhas nas fronteiras das faixas e monta os níveis de cima por cima de todas.
+#
+# As fronteiras caem em múltiplos de uma "unidade" (o número de chaves de uma
+# subárvore cheia de altura h), então os agrupamentos de cada nível até h são
+# os mesmos da carga serial: o resultado é idêntico ao de construir_em_massa.
+# A última faixa fica com o resto, e com ele as mesmas emendas de fim de nível.
+#
+# Montar os nós no processo principal continua serial, mas custa por nó, não
+# por chave: a validação da ordem, o corte em blocos e a cópia das chaves
+# ficam nos processos.
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from BPlusTree import BPlusTree, _fatiar
+
+
+def _alvos(t, fator_preenchimento):
+    # Ocupação usada pela carga em massa em folhas e nós internos
+    max_chaves = 2 * t - 1
+    max_filhos = 2 * t
+    return (min(max_chaves, max(t - 1, round(fator_preenchimento * max_chaves))),
+            min(max_filhos, max(t, round(fator_preenchimento * max_filhos))))
+
+
+def _niveis(raiz):
+    # Níveis da árvore, das folhas para a raiz
+    niveis = [[raiz]]
+    while not niveis[-1][0].folha:
+        niveis.append([c for node in niveis[-1] for c in node.children])
+    niveis.reverse()
+    return niveis
+
+
+def _serializar_faixa(chaves, valores, t, fator_preenchimento, compacta, altura):
+    tree = BPlusTree.construir_em_massa(chaves, t, fator_preenchimento, valores=valores, compacta=compacta)
+    niveis = _niveis(tree.raiz)[:altura + 1]
+    folhas = niveis[0]
+    planas = array('q') if compacta else []
+    for folha in folhas:
+        planas.extend(folha.keys)
+    vals = None
+    if valores is not None:
+        vals = [v for folha in folhas for v in folha.values]
+    tamanhos = array('I', (len(folha.keys) for folha in folhas))
+    filhos = [array('I', (len(node.children) for node in nivel)) for nivel in niveis[1:]]
+    return planas, vals, tamanhos, filhos
+
+
+def _remontar(tree, serializada, disk_counter):
+    # Refaz os nós de uma faixa; devolve o nível mais alto como pares
+    # (nó, menor chave da subárvore), como em construir_em_massa
+    planas, vals, tamanhos, filhos = serializada
+    nivel = []
+    inicio = 0
+    for tamanho in tamanhos:
+        fim = inicio + tamanho
+        folha = tree._novo_no(True)
+        folha.keys = planas[inicio:fim]
+        folha.values = vals[inicio:fim] if vals is not None else [None] * tamanho
+        nivel.append((folha, folha.keys[0]))
+        inicio = fim
+    for i in range(len(nivel) - 1):
+        nivel[i][0].next = nivel[i + 1][0]
+    disk_counter['writes'] += len(nivel)
+
+    for quantos in filhos:
+        acima = []
+        inicio = 0
+        for n in quantos:
+            grupo = nivel[inicio:inicio + n]
+            node = tree._novo_no(False)
+            node.children = [child for child, _ in grupo]
+            node.keys.extend(menor for _, menor in grupo[1:])
+            acima.append((node, grupo[0][1]))
+            inicio += n
+        disk_counter['writes'] += len(acima)
+        nivel = acima
+    return nivel
+
+
+def construir_em_paralelo(chaves, t=3, fator_preenchimento=1.0, trabalhadores=None, disk_counter=None,
+                          valores=None, compacta=False):
+    """Mesma árvore que BPlusTree.construir_em_massa, montada por 'trabalhadores' processos."""
+    if not 0 < fator_preenchimento <= 1:
+        raise ValueError("O fator de preenchimento deve estar no intervalo (0, 1].")
+    if trabalhadores is None:
+        trabalhadores = os.cpu_count() or 1
+    if trabalhadores < 1:
+        raise ValueError("O número de trabalhadores deve ser pelo menos 1.")
+    if disk_counter is None:
+        disk_counter = {'reads': 0, 'writes': 0}
+    # As faixas são fatiadas: range e listas atravessam o pipe inteiros
+    if not isinstance(chaves, (range, list, tuple)):
+        chaves = list(chaves)
+    if valores is not None:
+        valores = list(valores)
+        if len(valores) != len(chaves):
+            raise ValueError("A carga em massa exige um valor para cada chave.")
+    n = len(chaves)
+
+    # Unidade: chaves de uma subárvore cheia de altura 'altura'. Sobe a
+    # altura enquanto cada trabalhador ainda recebe pelo menos uma unidade.
+    alvo_folha, alvo_interno = _alvos(t, fator_preenchimento)
+    altura = 0
+    unidade = alvo_folha
+    while n // (unidade * alvo_interno) >= trabalhadores:
+        altura += 1
+        unidade *= alvo_interno
+    unidades = n // unidade
+    if trabalhadores == 1 or unidades < 2:
+        return BPlusTree.construir_em_massa(chaves, t, fator_preenchimento, disk_counter, valores, compacta)
+
+    faixas = min(trabalhadores, unidades)
+    cortes = [i * unidades // faixas * unidade for i in range(faixas)] + [n]
+    for corte in cortes[1:-1]:
+        # Dentro de cada faixa a ordem é conferida pelo próprio trabalhador
+        if chaves[corte] < chaves[corte - 1]:
+            raise ValueError(f"A carga em massa exige chaves ordenadas "
+                             f"({chaves[corte]} veio depois de {chaves[corte - 1]}).")
+
+    with ProcessPoolExecutor(max_workers=faixas) as executor:
+        futuros = [executor.submit(_serializar_faixa, chaves[a:b], None if valores is None else valores[a:b],
+                                   t, fator_preenchimento, compacta, altura)
+                   for a, b in zip(cortes, cortes[1:])]
+        tree = BPlusTree(t, compacta=compacta)
+        nivel = []
+        anterior = None
+        for futuro in futuros:
+            partes = _remontar(tree, futuro.result(), disk_counter)
+            # Emenda a lista de folhas na fronteira com a faixa anterior
+            primeira = partes[0][0]
+            while not primeira.folha:
+                primeira = primeira.children[0]
+            if anterior is not None:
+                anterior.next = primeira
+            anterior = partes[-1][0]
+            while not anterior.folha:
+                anterior = anterior.children[-1]
+            nivel.extend(partes)
+
+    max_filhos = 2 * t
+    while len(nivel) > 1:
+        proximo_nivel = []
+        for grupo in _fatiar(nivel, alvo_interno, t, max_filhos):
+            node = tree._novo_no(False)
+            node.children = [child for child, _ in grupo]
+            node.keys.extend(menor for _, menor in grupo[1:])
+            proximo_nivel.append((node, grupo[0][1]))
+            disk_counter['writes'] += 1
+        nivel = proximo_nivel
+    tree.raiz = nivel[0][0]
+    return tree
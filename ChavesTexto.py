@@ -0,0 +1,106 @@
+# ChavesTexto.py
+#
+# Apoio a chaves str/bytes na Árvore B+.
+#
+# separador_curto escolhe o menor separador entre duas chaves (truncamento
+# de sufixo): qualquer s com esquerda < s <= direita encaminha a busca do
+# mesmo jeito que a própria chave da direita, então basta o prefixo dela que
+# já é maior que a esquerda.
+#
+# ChavesPrefixadas guarda as chaves ordenadas de um nó como um prefixo comum
+# e os sufixos. Para o resto da árvore ela se comporta como a lista de
+# chaves (índices, fatias, insert, pop, bisect), entregando sempre as chaves
+# completas; por dentro só os sufixos ocupam espaço. O prefixo encolhe quando
+# entra uma chave que não o tem; quando chaves saem ele não cresce de volta,
+# só na próxima fatia (um split, por exemplo) que recalcula o nó.
+
+from collections.abc import MutableSequence
+
+from Capacidade import tamanho_chave
+
+
+def prefixo_comum(a, b):
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return a[:i]
+
+
+def separador_curto(esquerda, direita):
+    """Menor s com esquerda < s <= direita (a própria direita se forem iguais)."""
+    if not esquerda < direita:
+        return direita
+    return direita[:len(prefixo_comum(esquerda, direita)) + 1]
+
+
+class ChavesPrefixadas(MutableSequence):
+    __slots__ = ('prefixo', 'sufixos', 'bytes')
+
+    def __init__(self, chaves=()):
+        chaves = list(chaves)
+        # prefixo None: nó vazio, ainda sem tipo (str ou bytes)
+        self.prefixo = prefixo_comum(chaves[0], chaves[-1]) if chaves else None
+        n = len(self.prefixo) if chaves else 0
+        self.sufixos = [k[n:] for k in chaves]
+        self.bytes = self._medir()
+
+    def _medir(self):
+        if self.prefixo is None:
+            return 0
+        return tamanho_chave(self.prefixo) + sum(map(tamanho_chave, self.sufixos))
+
+    def _encolher(self, k):
+        # Reduz o prefixo ao que ele tem em comum com k
+        if self.prefixo is None:
+            self.prefixo = k
+            self.bytes = tamanho_chave(k)
+            return
+        if k.startswith(self.prefixo):
+            return
+        novo = prefixo_comum(self.prefixo, k)
+        resto = self.prefixo[len(novo):]
+        self.sufixos = [resto + s for s in self.sufixos]
+        self.prefixo = novo
+        self.bytes = self._medir()
+
+    def __len__(self):
+        return len(self.sufixos)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return ChavesPrefixadas([self.prefixo + s for s in self.sufixos[i]])
+        return self.prefixo + self.sufixos[i]
+
+    def __setitem__(self, i, k):
+        if isinstance(i, slice):
+            chaves = list(self)
+            chaves[i] = k
+            self.__init__(chaves)
+            return
+        self._encolher(k)
+        antigo = self.sufixos[i]
+        self.sufixos[i] = k[len(self.prefixo):]
+        self.bytes += tamanho_chave(self.sufixos[i]) - tamanho_chave(antigo)
+
+    def __delitem__(self, i):
+        removidos = self.sufixos[i] if isinstance(i, slice) else [self.sufixos[i]]
+        del self.sufixos[i]
+        self.bytes -= sum(map(tamanho_chave, removidos))
+        if not self.sufixos:
+            self.prefixo = None
+            self.bytes = 0
+
+    def insert(self, i, k):
+        self._encolher(k)
+        sufixo = k[len(self.prefixo):]
+        self.sufixos.insert(i, sufixo)
+        self.bytes += tamanho_chave(sufixo)
+
+    def __iter__(self):
+        prefixo = self.prefixo
+        for s in self.sufixos:
+            yield prefixo + s
+
+    def __repr__(self):
+        return repr(list(self))
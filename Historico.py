@@ -0,0 +1,194 @@
+# Historico.py
+#
+# Histórico de operações com checkpoints, para a linha do tempo do
+# visualizador. Guarda o log das operações que mudam a árvore (inserções e
+# remoções) e, a cada 'a_cada' operações, um checkpoint compacto da árvore.
+# Ir para a operação n restaura o checkpoint mais próximo antes de n e
+# reaplica no máximo a_cada operações do log, sem trace: a latência de um
+# salto depende de a_cada e do tamanho da árvore, não de n. Se a árvore
+# atual já está entre esse checkpoint e n, ela só avança, sem restaurar.
+#
+# O checkpoint não é uma cópia dos nós: é a árvore em pré-ordem em vetores
+# planos, um código por nó (2·chaves + folha) num array('l') e todas as
+# chaves em sequência (num array('q') quando são inteiros). Restaurar
+# reconstrói os nós com o _novo_no de uma árvore nova da mesma fábrica, então
+# compacta e bytes_por_no se mantêm, e a forma é exatamente a do momento do
+# checkpoint; reinserir as chaves daria outra forma. Os valores das folhas da
+# B+ só são guardados se algum não for None, e as chaves altas da B-link
+# (que, com a remoção preguiçosa, não se deduzem dos irmãos) vão junto.
+#
+# Memória: passando de max_checkpoints, a_cada dobra e metade dos
+# checkpoints é descartada. O total fica em max_checkpoints árvores mais o
+# log; em troca, um salto passa a reaplicar até o novo a_cada. Quando o
+# histórico é truncado (uma operação nova depois de voltar), a_cada volta ao
+# menor valor que cabe no tamanho novo, e os checkpoints que faltam nesse
+# espaçamento são refeitos reaplicando o log uma vez.
+#
+#   historico = Historico(tree, lambda: BPlusTree(t=3))
+#   historico.executar('insere', 42)
+#   tree = historico.ir_para(40000)
+
+from array import array
+
+from Snapshot import filhos
+
+OPERACOES = ('insere', 'remover')
+
+
+def _compactar(chaves):
+    try:
+        return array('q', chaves)
+    except (TypeError, OverflowError):
+        return tuple(chaves)
+
+
+def checkpoint(tree):
+    """Árvore em pré-ordem: (códigos dos nós, chaves, valores das folhas, chaves altas)."""
+    codigos = array('l')
+    chaves = []
+    valores = []
+    altas = []
+    pilha = [tree.raiz]
+    while pilha:
+        node = pilha.pop()
+        codigos.append(2 * len(node.keys) + node.folha)
+        chaves.extend(node.keys)
+        if hasattr(node, 'alta'):
+            altas.append(node.alta)
+        if node.folha:
+            valores.extend(getattr(node, 'values', ()))
+        else:
+            pilha.extend(reversed(filhos(node)))
+    if all(v is None for v in valores):
+        valores = None
+    return codigos, _compactar(chaves), valores, altas or None
+
+
+def restaurar(dados, tree):
+    """Reconstrói em 'tree' (vazia) a árvore de um checkpoint."""
+    codigos, chaves, valores, altas = dados
+    posicao = posicao_valores = 0
+    nos = []
+    pilha = []
+    for codigo in codigos:
+        n, folha = codigo >> 1, bool(codigo & 1)
+        node = tree._novo_no(folha)
+        node.keys.extend(chaves[posicao:posicao + n])
+        posicao += n
+        if hasattr(node, 'values') and folha:
+            node.values = list(valores[posicao_valores:posicao_valores + n]) if valores is not None else [None] * n
+            posicao_valores += n
+        if altas is not None:
+            node.alta = altas[len(nos)]
+        nos.append(node)
+        # Pilha de (nó interno, filhos que faltam)
+        if pilha:
+            pai, faltam = pilha[-1]
+            filhos(pai).append(node)
+            if faltam == 1:
+                pilha.pop()
+            else:
+                pilha[-1] = (pai, faltam - 1)
+        if not folha:
+            pilha.append((node, n + 1))
+    tree.raiz = nos[0]
+    if hasattr(tree.raiz, 'next'):
+        _religar(tree.raiz)
+    return tree
+
+
+def _religar(raiz):
+    # Ponteiros 'next': entre as folhas na B+ e em todos os níveis na B-link
+    nivel = [raiz]
+    while nivel:
+        if nivel[0].folha or hasattr(nivel[0], 'alta'):
+            for node, direita in zip(nivel, nivel[1:]):
+                node.next = direita
+        nivel = [c for node in nivel if not node.folha for c in node.children]
+
+
+class Historico:
+    def __init__(self, tree, fabrica, a_cada=256, max_checkpoints=64):
+        # fabrica() devolve uma árvore vazia com a mesma configuração de 'tree'
+        if a_cada < 1 or max_checkpoints < 2:
+            raise ValueError("O histórico precisa de a_cada >= 1 e de pelo menos dois checkpoints.")
+        self.tree = tree
+        self.fabrica = fabrica
+        self.a_cada = self.a_cada_inicial = a_cada
+        self.max_checkpoints = max_checkpoints
+        self.operacoes = []
+        # checkpoints[i]: a árvore depois de i·a_cada operações
+        self.checkpoints = [checkpoint(tree)]
+        # Operações do log aplicadas em self.tree
+        self.posicao = 0
+        # Último salto: (operação do checkpoint restaurado ou None, operações reaplicadas)
+        self.ultimo_salto = (None, 0)
+
+    def __len__(self):
+        return len(self.operacoes)
+
+    def executar(self, op, key):
+        resultado = getattr(self.tree, op)(key)
+        self.registrar(op, key)
+        return resultado
+
+    def registrar(self, op, key):
+        """Anota uma operação já aplicada em self.tree. Depois de um salto para
+        trás, as operações que vinham depois da posição atual são descartadas."""
+        if op not in OPERACOES:
+            raise ValueError(f"Operação '{op}' não altera a árvore; use uma de {OPERACOES}.")
+        if self.posicao < len(self.operacoes):
+            self._truncar()
+        self.operacoes.append((op, key))
+        self.posicao += 1
+        if self.posicao == len(self.checkpoints) * self.a_cada:
+            self.checkpoints.append(checkpoint(self.tree))
+            if len(self.checkpoints) > self.max_checkpoints:
+                self.a_cada *= 2
+                self.checkpoints = self.checkpoints[::2]
+
+    def _espacamento(self, n):
+        # Menor a_cada (o inicial vezes uma potência de 2) em que n operações
+        # cabem em max_checkpoints checkpoints
+        a_cada = self.a_cada_inicial
+        while n // a_cada + 1 > self.max_checkpoints:
+            a_cada *= 2
+        return a_cada
+
+    def _truncar(self):
+        del self.operacoes[self.posicao:]
+        a_cada = self._espacamento(self.posicao)
+        if a_cada == self.a_cada:
+            del self.checkpoints[self.posicao // a_cada + 1:]
+            return
+        # Espaçamento de um histórico mais longo: refaz os checkpoints a partir
+        # do primeiro, numa árvore à parte (self.tree já está na posição)
+        tree = restaurar(self.checkpoints[0], self.fabrica())
+        checkpoints = [self.checkpoints[0]]
+        for i, (op, key) in enumerate(self.operacoes, 1):
+            getattr(tree, op)(key)
+            if i % a_cada == 0:
+                checkpoints.append(checkpoint(tree))
+        self.a_cada = a_cada
+        self.checkpoints = checkpoints
+
+    def ir_para(self, n):
+        """Deixa self.tree no estado depois de n operações e a devolve."""
+        n = max(0, min(n, len(self.operacoes)))
+        inicio = n // self.a_cada * self.a_cada
+        restaurado = None
+        if not inicio <= self.posicao <= n:
+            self.tree = restaurar(self.checkpoints[n // self.a_cada], self.fabrica())
+            self.posicao = restaurado = inicio
+        reaplicadas = n - self.posicao
+        for op, key in self.operacoes[self.posicao:n]:
+            getattr(self.tree, op)(key)
+        self.posicao = n
+        self.ultimo_salto = (restaurado, reaplicadas)
+        return self.tree
+
+    def memoria(self):
+        """Chaves guardadas nos checkpoints e operações no log."""
+        return {'checkpoints': len(self.checkpoints), 'a_cada': self.a_cada,
+                'chaves_em_checkpoints': sum(len(c[1]) for c in self.checkpoints),
+                'operacoes': len(self.operacoes)}
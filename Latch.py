@@ -0,0 +1,50 @@
+# Latch.py
+#
+# Latch de leitura e escrita para os nós da árvore concorrente. Vários
+# leitores podem segurar o latch ao mesmo tempo; um escritor exige
+# exclusividade. Escritores têm preferência: enquanto um espera, leitores
+# novos também esperam, então uma sequência de buscas não trava as
+# inserções para sempre.
+
+import threading
+
+
+class LatchLeituraEscrita:
+    __slots__ = ('_condicao', '_leitores', '_escritor', '_escritores_esperando', '_leitores_esperando')
+
+    def __init__(self):
+        self._condicao = threading.Condition(threading.Lock())
+        self._leitores = 0
+        self._escritor = False
+        self._escritores_esperando = 0
+        self._leitores_esperando = 0
+
+    def adquirir_leitura(self):
+        with self._condicao:
+            if self._escritor or self._escritores_esperando:
+                self._leitores_esperando += 1
+                while self._escritor or self._escritores_esperando:
+                    self._condicao.wait()
+                self._leitores_esperando -= 1
+            self._leitores += 1
+
+    def liberar_leitura(self):
+        with self._condicao:
+            self._leitores -= 1
+            # Sem contenção (o caso comum) ninguém precisa ser acordado
+            if not self._leitores and self._escritores_esperando:
+                self._condicao.notify_all()
+
+    def adquirir_escrita(self):
+        with self._condicao:
+            self._escritores_esperando += 1
+            while self._escritor or self._leitores:
+                self._condicao.wait()
+            self._escritores_esperando -= 1
+            self._escritor = True
+
+    def liberar_escrita(self):
+        with self._condicao:
+            self._escritor = False
+            if self._escritores_esperando or self._leitores_esperando:
+                self._condicao.notify_all()
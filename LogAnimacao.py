@@ -0,0 +1,205 @@
+# LogAnimacao.py
+#
+# Log de animação em deltas. Cada passo do trace guarda apenas os nós que
+# mudaram desde o passo anterior, com o estado de antes e o de depois
+# (folha, chaves, uids dos filhos). O visualizador mantém uma única árvore
+# de exibição (nós NoVisual) e aplica ou desfaz esses deltas, então a
+# memória cresce com o trabalho de cada operação e não com o tamanho da
+# árvore, e dá para avançar, voltar e pular para qualquer passo.
+#
+# Os deltas saem da comparação entre snapshots consecutivos (ver
+# Snapshot.py): subárvores compartilhadas são o mesmo objeto e nem são
+# visitadas, então gerar um delta custa O(nós copiados), não O(n).
+
+from Snapshot import filhos
+
+
+def _estado(copia):
+    return (copia.folha, tuple(copia.keys), tuple(f._uid for f in filhos(copia)), hasattr(copia, 'next'))
+
+
+class Comparador:
+    """Compara cada snapshot com o anterior e devolve os nós que mudaram."""
+
+    def __init__(self):
+        # Última cópia registrada de cada nó
+        self.copias = {}
+
+    def alteracoes(self, raiz_snapshot):
+        """Lista de (uid, estado antes, estado depois); antes é None para nós novos."""
+        alteracoes = []
+        pilha = [raiz_snapshot]
+        while pilha:
+            copia = pilha.pop()
+            anterior = self.copias.get(copia._uid)
+            if anterior is copia:
+                continue
+            antes = _estado(anterior) if anterior is not None else None
+            depois = _estado(copia)
+            if antes != depois:
+                alteracoes.append((copia._uid, antes, depois))
+            self.copias[copia._uid] = copia
+            pilha.extend(filhos(copia))
+        return alteracoes
+
+    def podar(self, alcancaveis):
+        self.copias = {uid: copia for uid, copia in self.copias.items() if uid in alcancaveis}
+
+
+class NoVisual:
+    """Nó da árvore exibida, identificado pelo uid do nó vivo correspondente."""
+
+    # 'next' só é atribuído nos nós da B+ (hasattr distingue as árvores)
+    __slots__ = ('uid', 'folha', 'keys', 'children', 'pai', 'next', '_texto', '_largura', '_largura_sub',
+                 '_deslocamentos', '_chaves_sub', '_altura_sub', '_x', '_y')
+
+    def __init__(self, uid, encadeada):
+        self.uid = uid
+        self.folha = True
+        self.keys = []
+        self.children = []
+        self.pai = None
+        if encadeada:
+            # Folhas da B+: o desenho liga as folhas em sequência
+            self.next = None
+        # Cache do layout do visualizador
+        self._texto = None
+        self._largura = None
+        self._largura_sub = None
+        self._deslocamentos = None
+        # Resumo da subárvore (nível de detalhe com zoom afastado), calculado
+        # e invalidado junto com a largura da subárvore
+        self._chaves_sub = 0
+        self._altura_sub = 0
+
+    def invalidar(self):
+        """Descarta o layout deste nó e a largura de subárvore dos ancestrais."""
+        self._texto = self._largura = None
+        node = self
+        while node is not None:
+            node._largura_sub = None
+            node = node.pai
+
+
+class Passo:
+    __slots__ = ('alteracoes', 'raiz_antes', 'raiz_depois', 'message', 'path', 'disk_counter')
+
+    def __init__(self, alteracoes, raiz_antes, raiz_depois, message, path, disk_counter):
+        self.alteracoes = alteracoes
+        self.raiz_antes = raiz_antes
+        self.raiz_depois = raiz_depois
+        self.message = message
+        self.path = path
+        self.disk_counter = disk_counter
+
+
+class LogAnimacao:
+    def __init__(self):
+        self.passos = []
+        # Quantos passos da operação atual estão aplicados na árvore exibida
+        self.atual = 0
+        self.nos = {}
+        self.raiz = None
+        # Cópias do último passo gravado e a raiz dele
+        self._comparador = Comparador()
+        self._raiz_registrada = None
+        self._vivos = 0
+
+    @property
+    def no_raiz(self):
+        return self.nos.get(self.raiz)
+
+    def inicializar(self, raiz_snapshot):
+        """Mostra o estado atual da árvore sem passos para animar."""
+        self.registrar(raiz_snapshot, None, None, None)
+        self.ir_para(1)
+        self.passos = []
+        self.atual = 0
+
+    def nova_operacao(self):
+        # Uma operação nova parte do estado final da anterior
+        self.ir_para(len(self.passos))
+        self.passos = []
+        self.atual = 0
+        # Nós que saíram da árvore (fusões) só servem para desfazer passos
+        # antigos; a limpeza é O(n), então só roda quando eles já são muitos.
+        if len(self.nos) > 2 * self._vivos + 64:
+            self._podar()
+
+    def _podar(self):
+        alcancaveis = set()
+        pilha = [self.no_raiz] if self.no_raiz is not None else []
+        while pilha:
+            node = pilha.pop()
+            alcancaveis.add(node.uid)
+            pilha.extend(node.children)
+        self.nos = {uid: node for uid, node in self.nos.items() if uid in alcancaveis}
+        self._comparador.podar(alcancaveis)
+        self._vivos = len(alcancaveis)
+
+    def registrar(self, raiz_snapshot, message, path, disk_counter):
+        alteracoes = self._comparador.alteracoes(raiz_snapshot)
+        self.passos.append(Passo(alteracoes, self._raiz_registrada, raiz_snapshot._uid, message, path, disk_counter))
+        self._raiz_registrada = raiz_snapshot._uid
+
+    # --- Navegação ---
+
+    def avancar(self):
+        if self.atual >= len(self.passos):
+            return False
+        passo = self.passos[self.atual]
+        self._aplicar([(uid, depois) for uid, _, depois in passo.alteracoes])
+        self.raiz = passo.raiz_depois
+        self.atual += 1
+        return True
+
+    def voltar(self):
+        if self.atual == 0:
+            return False
+        self.atual -= 1
+        passo = self.passos[self.atual]
+        self._aplicar([(uid, antes) for uid, antes, _ in passo.alteracoes])
+        self.raiz = passo.raiz_antes
+        return True
+
+    def ir_para(self, indice):
+        indice = max(0, min(indice, len(self.passos)))
+        while self.atual < indice:
+            self.avancar()
+        while self.atual > indice:
+            self.voltar()
+
+    @property
+    def passo_atual(self):
+        return self.passos[self.atual - 1] if self.atual else None
+
+    def _aplicar(self, estados):
+        # Primeiro cria/atualiza todos os nós, depois liga os filhos: um
+        # filho novo pode aparecer depois do pai na lista.
+        for uid, estado in estados:
+            if estado is None:
+                self.nos.pop(uid, None)
+                continue
+            node = self.nos.get(uid)
+            if node is None:
+                node = self.nos[uid] = NoVisual(uid, estado[3])
+            node.folha = estado[0]
+            node.keys = list(estado[1])
+        alterados = []
+        for uid, estado in estados:
+            if estado is not None:
+                node = self.nos[uid]
+                alterados.append(node)
+                node.children = [self.nos[f] for f in estado[2]]
+                # Um filho que volta sem ter mudado (ex.: o irmão absorvido numa
+                # fusão desfeita) recupera os próprios filhos, cujo 'pai'
+                # ainda aponta para quem os tinha recebido.
+                for filho in node.children:
+                    filho.pai = node
+                    for neto in filho.children:
+                        neto.pai = filho
+                        if neto._largura_sub is None:
+                            filho._largura_sub = None
+        # Só com os pais corrigidos dá para invalidar o caminho até a raiz
+        for node in alterados:
+            node.invalidar()
@@ -0,0 +1,228 @@
+# Metricas.py
+#
+# Métricas estruturais das árvores: splits, fusões, empréstimos,
+# redistribuições e crescimento/encolhimento da raiz.
+#
+# Os eventos viajam no próprio disk_counter, que já passa por todos os
+# métodos (inclusive os dos nós da B e da B*): se ele tiver a chave
+# 'eventos', um dict evento -> quantidade, cada método estrutural soma ali
+# com registrar(). Sem essa chave, o caso comum, registrar só faz um get, e
+# só nos eventos estruturais, nunca no caminho de uma busca.
+#
+# Metricas executa operações numa árvore com um disk_counter desses e junta,
+# por tipo de operação, o total de cada evento e histogramas por operação:
+# quantos splits uma inserção causou (os picos de latência dos splits em
+# cascata aparecem na cauda), leituras, escritas e latência. Acompanha a
+# altura ao longo das operações e mede a estrutura sob demanda (nós por
+# nível e distribuição do preenchimento). Exporta em JSON ou no formato de
+# texto do Prometheus.
+#
+#   m = Metricas(tree)
+#   for k in chaves:
+#       m.executar('insere', k)
+#   print(m.para_prometheus())
+
+from bisect import bisect_left
+import json
+import time
+
+EVENTOS = ('split', 'split_2_para_3', 'redistribuicao', 'emprestimo', 'fusao', 'raiz_cresceu', 'raiz_encolheu')
+
+# Limites superiores (inclusivos) dos baldes de cada histograma
+LIMITES_EVENTOS = (0, 1, 2, 3, 4, 6, 8)
+LIMITES_ACESSOS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+LIMITES_LATENCIA_US = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000, 10000, 50000)
+LIMITES_PREENCHIMENTO = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+
+def registrar(disk_counter, evento):
+    eventos = disk_counter.get('eventos')
+    if eventos is not None:
+        eventos[evento] = eventos.get(evento, 0) + 1
+
+
+class Histograma:
+    __slots__ = ('limites', 'contagens', 'soma', 'total')
+
+    def __init__(self, limites):
+        self.limites = tuple(limites)
+        # Um balde por limite e o último para o que passar de todos
+        self.contagens = [0] * (len(self.limites) + 1)
+        self.soma = 0
+        self.total = 0
+
+    def observar(self, valor):
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+    def para_dict(self):
+        return {'limites': list(self.limites), 'contagens': list(self.contagens), 'soma': self.soma,
+                'total': self.total}
+
+
+def _filhos(tree, node):
+    # A árvore paginada guarda ids nos nós internos: usa o acesso dela
+    if hasattr(tree, '_filho'):
+        return [tree._filho(node, i) for i in range(len(node.children))]
+    return node.filhos
+
+
+def altura(tree):
+    h = 1
+    node = tree.raiz
+    while not node.folha:
+        node = _filhos(tree, node)[0]
+        h += 1
+    return h
+
+
+def estrutura(tree):
+    """Altura, nós e chaves por nível e a distribuição do preenchimento dos
+    nós (chaves / 2t-1, ou bytes / bytes_por_no com capacidade em bytes)."""
+    capacidade = getattr(tree, 'capacidade', None)
+    preenchimento = Histograma(LIMITES_PREENCHIMENTO)
+    nos_por_nivel = []
+    chaves = 0
+    nivel = [tree.raiz]
+    while nivel:
+        nos_por_nivel.append(len(nivel))
+        proximo = []
+        for node in nivel:
+            chaves += len(node.keys)
+            if capacidade is not None:
+                preenchimento.observar(capacidade.tamanho(node.keys, node.folha) / capacidade.bytes_por_no)
+            else:
+                preenchimento.observar(len(node.keys) / (2 * tree.t - 1))
+            if not node.folha:
+                proximo.extend(_filhos(tree, node))
+        nivel = proximo
+    return {'altura': len(nos_por_nivel), 'nos': sum(nos_por_nivel), 'chaves': chaves,
+            'nos_por_nivel': nos_por_nivel, 'preenchimento': preenchimento}
+
+
+class _PorOperacao:
+    __slots__ = ('total', 'eventos', 'por_evento', 'leituras', 'escritas', 'latencia_us')
+
+    def __init__(self):
+        self.total = 0
+        self.eventos = dict.fromkeys(EVENTOS, 0)
+        # Para cada evento, quantas vezes ele aconteceu em cada operação
+        self.por_evento = {evento: Histograma(LIMITES_EVENTOS) for evento in EVENTOS}
+        self.leituras = Histograma(LIMITES_ACESSOS)
+        self.escritas = Histograma(LIMITES_ACESSOS)
+        self.latencia_us = Histograma(LIMITES_LATENCIA_US)
+
+    def para_dict(self):
+        return {'total': self.total, 'eventos': dict(self.eventos),
+                'eventos_por_operacao': {e: h.para_dict() for e, h in self.por_evento.items()},
+                'leituras': self.leituras.para_dict(), 'escritas': self.escritas.para_dict(),
+                'latencia_us': self.latencia_us.para_dict()}
+
+
+class Metricas:
+    # Não é thread-safe: numa árvore concorrente, um Metricas por thread
+    def __init__(self, tree):
+        self.tree = tree
+        self.operacoes = {}
+        self.n = 0
+        # (operações executadas, altura): um ponto inicial e um a cada
+        # crescimento ou encolhimento da raiz
+        self.alturas = [(0, altura(tree))]
+
+    def executar(self, op, *args, **kwargs):
+        """Executa tree.<op>(*args) medindo eventos, acessos e latência; retorna o resultado da operação."""
+        disk_counter = {'reads': 0, 'writes': 0, 'eventos': {}}
+        metodo = getattr(self.tree, op)
+        inicio = time.perf_counter_ns()
+        resultado = metodo(*args, disk_counter=disk_counter, **kwargs)
+        ns = time.perf_counter_ns() - inicio
+        self.n += 1
+        self._acumular(op, disk_counter, ns)
+        return resultado
+
+    def _acumular(self, op, disk_counter, ns):
+        por_op = self.operacoes.get(op)
+        if por_op is None:
+            por_op = self.operacoes[op] = _PorOperacao()
+        por_op.total += 1
+        eventos = disk_counter['eventos']
+        for evento, histograma in por_op.por_evento.items():
+            quantos = eventos.get(evento, 0)
+            por_op.eventos[evento] += quantos
+            histograma.observar(quantos)
+        por_op.leituras.observar(disk_counter['reads'])
+        por_op.escritas.observar(disk_counter['writes'])
+        por_op.latencia_us.observar(ns / 1e3)
+        if 'raiz_cresceu' in eventos or 'raiz_encolheu' in eventos:
+            self.alturas.append((self.n, altura(self.tree)))
+
+    def eventos(self):
+        """Total de cada evento somando todas as operações."""
+        total = dict.fromkeys(EVENTOS, 0)
+        for por_op in self.operacoes.values():
+            for evento, quantos in por_op.eventos.items():
+                total[evento] += quantos
+        return total
+
+    def para_dict(self, com_estrutura=True):
+        dados = {'arvore': type(self.tree).__name__, 'operacoes_executadas': self.n,
+                 'eventos': self.eventos(),
+                 'operacoes': {op: por_op.para_dict() for op, por_op in self.operacoes.items()},
+                 'alturas': [list(par) for par in self.alturas]}
+        if com_estrutura:
+            # Percorre a árvore inteira
+            e = estrutura(self.tree)
+            e['preenchimento'] = e['preenchimento'].para_dict()
+            dados['estrutura'] = e
+        return dados
+
+    def para_json(self, com_estrutura=True, **opcoes):
+        return json.dumps(self.para_dict(com_estrutura), ensure_ascii=False, **opcoes)
+
+    def para_prometheus(self, prefixo='arvore', com_estrutura=True):
+        """Formato de texto do Prometheus (exposition format 0.0.4)."""
+        rotulo_arvore = f'arvore="{type(self.tree).__name__}"'
+        linhas = []
+
+        def cabecalho(nome, tipo, ajuda):
+            linhas.append(f"# HELP {prefixo}_{nome} {ajuda}")
+            linhas.append(f"# TYPE {prefixo}_{nome} {tipo}")
+
+        def histograma(nome, rotulos, h):
+            acumulado = 0
+            for limite, contagem in zip(h.limites + ('+Inf',), h.contagens):
+                acumulado += contagem
+                linhas.append(f'{prefixo}_{nome}_bucket{{{rotulos},le="{limite}"}} {acumulado}')
+            linhas.append(f"{prefixo}_{nome}_sum{{{rotulos}}} {h.soma}")
+            linhas.append(f"{prefixo}_{nome}_count{{{rotulos}}} {h.total}")
+
+        cabecalho("operacoes_total", "counter", "Operações executadas.")
+        for op, por_op in self.operacoes.items():
+            linhas.append(f'{prefixo}_operacoes_total{{{rotulo_arvore},operacao="{op}"}} {por_op.total}')
+        cabecalho("eventos_total", "counter", "Eventos estruturais (splits, fusões, empréstimos...).")
+        for op, por_op in self.operacoes.items():
+            for evento, quantos in por_op.eventos.items():
+                linhas.append(f'{prefixo}_eventos_total{{{rotulo_arvore},operacao="{op}",evento="{evento}"}} '
+                              f'{quantos}')
+        cabecalho("eventos_por_operacao", "histogram", "Quantas vezes cada evento ocorreu numa mesma operação.")
+        for op, por_op in self.operacoes.items():
+            for evento, h in por_op.por_evento.items():
+                histograma("eventos_por_operacao", f'{rotulo_arvore},operacao="{op}",evento="{evento}"', h)
+        for nome, ajuda in (("leituras", "Leituras de nós por operação."),
+                            ("escritas", "Escritas de nós por operação."),
+                            ("latencia_us", "Latência por operação, em microssegundos.")):
+            cabecalho(nome, "histogram", ajuda)
+            for op, por_op in self.operacoes.items():
+                histograma(nome, f'{rotulo_arvore},operacao="{op}"', getattr(por_op, nome))
+        cabecalho("altura", "gauge", "Altura da árvore.")
+        linhas.append(f"{prefixo}_altura{{{rotulo_arvore}}} {self.alturas[-1][1]}")
+        if com_estrutura:
+            e = estrutura(self.tree)
+            cabecalho("nos", "gauge", "Nós da árvore.")
+            linhas.append(f"{prefixo}_nos{{{rotulo_arvore}}} {e['nos']}")
+            cabecalho("chaves", "gauge", "Chaves guardadas nos nós (separadores incluídos).")
+            linhas.append(f"{prefixo}_chaves{{{rotulo_arvore}}} {e['chaves']}")
+            cabecalho("preenchimento", "histogram", "Preenchimento dos nós (fração da capacidade).")
+            histograma("preenchimento", rotulo_arvore, e['preenchimento'])
+        return "\n".join(linhas) + "\n"
@@ -0,0 +1,169 @@
+# Rastro.py
+#
+# Trace em eventos tipados, gravado em JSONL (um objeto JSON por linha) para
+# ser reproduzido depois no visualizador sem executar as operações de novo.
+#
+# RastroJSONL é um trace_callback: executar() roda a operação em modo trace
+# com um disk_counter que conta os eventos estruturais (ver Metricas.py), e
+# cada passo vira uma linha com o tipo do evento ('split', 'fusao',
+# 'emprestimo'... ou 'passo' quando nada mudou de estrutura), o caminho, o
+# uid do nó destacado, os contadores, um timestamp monotônico e o estado
+# novo dos nós que mudaram desde o passo anterior (o mesmo delta do
+# LogAnimacao). A primeira linha é o estado inicial inteiro. As linhas vão
+# para o arquivo por um buffer grande, sem uma escrita por passo.
+#
+#   {"seq": 3, "tipo": "split", "op": "insere", "chave": 42, "t": 1234567,
+#    "mensagem": "...", "caminho": [0], "no": 7, "contador": {"reads": 2, "writes": 3},
+#    "raiz": 9, "nos": [[uid, folha, chaves, uids dos filhos, encadeada], ...]}
+#
+# ReproducaoJSONL lê um desses arquivos como um LogAnimacao: na abertura só
+# anota onde começa cada linha, e cada evento é lido e decodificado quando a
+# reprodução chega nele. O estado "antes" de cada nó, usado para voltar, sai
+# da própria árvore exibida no momento em que o passo é aplicado.
+
+from array import array
+import json
+import time
+
+from LogAnimacao import Comparador, LogAnimacao, Passo
+from Snapshot import nos_no_caminho
+
+TAMANHO_BUFFER = 1 << 20
+# Tipos que não vêm de eventos estruturais
+TIPOS = ('estado_inicial', 'operacao', 'passo', 'fim')
+
+
+def _nos(alteracoes):
+    return [[uid, folha, list(keys), list(filhos), encadeada]
+            for uid, _, (folha, keys, filhos, encadeada) in alteracoes]
+
+
+class RastroJSONL:
+    def __init__(self, tree, caminho):
+        self.tree = tree
+        self._arquivo = open(caminho, 'w', encoding='utf-8', buffering=TAMANHO_BUFFER)
+        self._comparador = Comparador()
+        self._seq = 0
+        self._op = None
+        self._chave = None
+        self._tocados = set()
+        self._vistos = {}
+        raiz = tree.snapshot()
+        self._gravar('estado_inicial', "Estado inicial", None, None, {'reads': 0, 'writes': 0},
+                     raiz._uid, self._comparador.alteracoes(raiz))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+    def fechar(self):
+        self._arquivo.close()
+
+    def executar(self, op, key):
+        """Executa tree.<op>_com_trace (op: insere, remover ou busca) gravando os passos."""
+        self._op, self._chave = op, key
+        self._tocados = set()
+        self._vistos = {}
+        self._gravar('operacao', f"{op} {key}", None, None, {'reads': 0, 'writes': 0}, None, [])
+        if op == 'busca':
+            disk_counter = None
+            resultado = self.tree.busca_com_trace(key, self)
+        else:
+            disk_counter = {'reads': 0, 'writes': 0, 'eventos': {}}
+            resultado = getattr(self.tree, f"{op}_com_trace")(key, self, disk_counter)
+        # Mudanças depois do último passo (a raiz que encolhe, por exemplo)
+        raiz = self.tree.snapshot(self._tocados | {self.tree.raiz})
+        self._gravar('fim', f"{op} {key} concluída", None, None, disk_counter or {'reads': 0, 'writes': 0},
+                     raiz._uid, self._comparador.alteracoes(raiz))
+        return resultado
+
+    def __call__(self, message, path, disk_counter):
+        caminho = nos_no_caminho(self.tree.raiz, path) if path is not None else []
+        self._tocados.update(caminho)
+        raiz = self.tree.snapshot(self._tocados)
+        no = caminho[-1]._uid if caminho and len(caminho) == len(path) + 1 else None
+        # O tipo do passo é o evento estrutural que aconteceu desde o anterior
+        eventos = disk_counter.get('eventos') or {}
+        novos = [e for e, n in eventos.items() if n > self._vistos.get(e, 0)]
+        self._vistos = dict(eventos)
+        self._gravar(novos[0] if novos else 'passo', message, path, no, disk_counter, raiz._uid,
+                     self._comparador.alteracoes(raiz))
+
+    def _gravar(self, tipo, mensagem, caminho, no, disk_counter, raiz, alteracoes):
+        self._seq += 1
+        evento = {'seq': self._seq, 'tipo': tipo, 'op': self._op, 'chave': self._chave,
+                  't': time.monotonic_ns(), 'mensagem': mensagem, 'caminho': caminho, 'no': no,
+                  'contador': {'reads': disk_counter['reads'], 'writes': disk_counter['writes']},
+                  'raiz': raiz, 'nos': _nos(alteracoes)}
+        # Chaves que o JSON não representa (bytes) viram o repr
+        self._arquivo.write(json.dumps(evento, ensure_ascii=False, default=repr))
+        self._arquivo.write("\n")
+
+
+class _PassosDoArquivo:
+    # Sequência de passos de uma ReproducaoJSONL, montados sob demanda
+    def __init__(self, reproducao):
+        self._reproducao = reproducao
+        self._montados = []
+
+    def __len__(self):
+        return len(self._reproducao._inicios) - 1
+
+    def __getitem__(self, i):
+        if i == len(self._montados):
+            # A reprodução avança em ordem: o passo i é pedido quando a
+            # árvore exibida está no estado anterior a ele
+            self._montados.append(self._reproducao._montar(i + 1))
+        return self._montados[i]
+
+
+class ReproducaoJSONL(LogAnimacao):
+    def __init__(self, caminho):
+        super().__init__()
+        self._arquivo = open(caminho, 'rb')
+        self._inicios = array('q')
+        posicao = 0
+        for linha in self._arquivo:
+            if linha.strip():
+                self._inicios.append(posicao)
+            posicao += len(linha)
+        if not self._inicios:
+            raise ValueError(f"O arquivo {caminho} não tem eventos.")
+        inicial = self._evento(0)
+        if inicial['tipo'] != 'estado_inicial':
+            raise ValueError(f"O arquivo {caminho} não começa pelo estado inicial da árvore.")
+        self._aplicar([(uid, self._estado(no)) for uid, *no in inicial['nos']])
+        self.raiz = inicial['raiz']
+        self._vivos = len(self.nos)
+        self.passos = _PassosDoArquivo(self)
+
+    def fechar(self):
+        self._arquivo.close()
+
+    def _evento(self, i):
+        self._arquivo.seek(self._inicios[i])
+        return json.loads(self._arquivo.readline())
+
+    @staticmethod
+    def _estado(no):
+        folha, keys, filhos, encadeada = no
+        return (folha, tuple(keys), tuple(filhos), encadeada)
+
+    def _estado_exibido(self, uid):
+        node = self.nos.get(uid)
+        if node is None:
+            return None
+        return (node.folha, tuple(node.keys), tuple(f.uid for f in node.children), hasattr(node, 'next'))
+
+    def _montar(self, i):
+        evento = self._evento(i)
+        alteracoes = [(uid, self._estado_exibido(uid), self._estado(no)) for uid, *no in evento['nos']]
+        tipo = evento['tipo']
+        mensagem = evento['mensagem'] if tipo == 'passo' else f"[{tipo}] {evento['mensagem']}"
+        raiz = evento['raiz'] if evento['raiz'] is not None else self.raiz
+        return Passo(alteracoes, self.raiz, raiz, mensagem, evento['caminho'], evento['contador'])
+
+    def nova_operacao(self):
+        raise ValueError("Um trace carregado de arquivo só pode ser reproduzido.")
@@ -0,0 +1,88 @@
+# Snapshot.py
+#
+# Cópias congeladas da árvore para a animação, com compartilhamento
+# estrutural. Cada nó vivo guarda em '_snap' a última cópia feita dele; a
+# cópia seguinte reaproveita essa cópia (e toda a subárvore abaixo dela) e só
+# refaz os nós que podem ter mudado. Assim cada passo custa O(altura·t) em
+# vez de copiar a árvore inteira.
+#
+# Quem mostra onde a árvore pode ter mudado é o caminho do trace: as três
+# árvores só alteram os nós do caminho de descida e os filhos deles (split,
+# empréstimo e fusão mexem no nó atual e em seus irmãos). Por isso os nós
+# 'tocados' são sempre copiados de novo, e os filhos deles são conferidos
+# (chaves e lista de filhos) antes de a cópia anterior ser reaproveitada.
+# As cópias nunca devem ser alteradas: elas são compartilhadas entre passos.
+# Cada nó vivo recebe um '_uid' estável, herdado pelas suas cópias, que
+# identifica o mesmo nó de um quadro para o outro.
+
+import copy
+import itertools
+
+_uids = itertools.count(1)
+
+
+def filhos(node):
+    return node.children if hasattr(node, 'children') else node.filhos
+
+
+def nos_no_caminho(raiz, caminho):
+    """Nós da raiz até o fim de 'caminho' (lista de índices de filho)."""
+    nos = []
+    node = raiz
+    for i in [None] + list(caminho or []):
+        if i is not None:
+            lista = filhos(node)
+            if i >= len(lista):
+                break
+            node = lista[i]
+        nos.append(node)
+    return nos
+
+
+def snapshot(raiz, tocados=()):
+    tocados = {id(node) for node in tocados}
+    tocados.add(id(raiz))
+    return _copiar(raiz, tocados)
+
+
+def _copiar(node, tocados):
+    if id(node) not in tocados:
+        anterior = getattr(node, '_snap', None)
+        if anterior is not None and _ainda_valida(node, anterior):
+            return anterior
+    if getattr(node, '_uid', None) is None:
+        node._uid = next(_uids)
+    copia = copy.copy(node)
+    copia._snap = None
+    # Fatia: mantém o tipo das chaves (lista ou array), e a comparação em
+    # _ainda_valida continua valendo
+    copia.keys = node.keys[:]
+    if hasattr(node, 'values'):
+        copia.values = list(node.values)
+    if hasattr(node, 'next'):
+        # A ordem das folhas é a ordem do desenho; o ponteiro vivo não vale na cópia
+        copia.next = None
+    lista = [_copiar(filho, tocados) if id(filho) in tocados else _reaproveitar(filho) for filho in filhos(node)]
+    if hasattr(node, 'children'):
+        copia.children = lista
+    else:
+        copia.filhos = lista
+    node._snap = copia
+    return copia
+
+
+def _reaproveitar(node):
+    anterior = getattr(node, '_snap', None)
+    if anterior is not None and _ainda_valida(node, anterior):
+        return anterior
+    return _copiar(node, ())
+
+
+def _ainda_valida(node, anterior):
+    # Netos de um nó tocado não mudam de conteúdo, só de pai: basta conferir
+    # as chaves e se cada filho ainda aponta para a mesma cópia.
+    if anterior.folha != node.folha or anterior.keys != node.keys:
+        return False
+    vivos, copiados = filhos(node), filhos(anterior)
+    return len(vivos) == len(copiados) and all(
+        getattr(v, '_snap', None) is c for v, c in zip(vivos, copiados))
@@ -1,11 +1,35 @@
 # TreeVisualizerGUI.py
 
+import os
+import random
+import time
 import tkinter as tk
-import copy
+from tkinter import filedialog
+
+from BufferPool import BufferPool
+from Historico import Historico
+from LogAnimacao import LogAnimacao
+from Rastro import ReproducaoJSONL
+from Snapshot import filhos, nos_no_caminho
 
 class TreeVisualizerGUI:
     HORIZONTAL_SPACING = 30
     VERTICAL_SPACING = 90
+    # Cache simulado de nós: mostra leituras lógicas x físicas na barra de status
+    PAGINAS_EM_CACHE = 4
+    # Transição suave entre quadros: número de passos intermediários e
+    # duração máxima (sempre menor que o intervalo entre passos)
+    PASSOS_TRANSICAO = 8
+    DURACAO_TRANSICAO_MS = 250
+    # Zoom e nível de detalhe: abaixo de LARGURA_MINIMA_SUBARVORE pixels na
+    # tela uma subárvore vira um resumo (chaves e altura). Na vertical o zoom
+    # para em ESCALA_VERTICAL_MINIMA para os níveis continuarem distinguíveis.
+    ZOOM_MINIMO = 1e-6
+    ZOOM_MAXIMO = 4.0
+    FATOR_ZOOM = 1.25
+    ESCALA_VERTICAL_MINIMA = 0.3
+    LARGURA_MINIMA_SUBARVORE = 120
+    FONTE_MINIMA = 6
 
     def __init__(self, master, tree_class, tree_name, t_param, colors):
         self.master = master
@@ -35,6 +59,12 @@ class TreeVisualizerGUI:
         self.delete_btn = tk.Button(control_frame, text="Remover", command=self.remover_chave)
         self.delete_btn.pack(side=tk.LEFT)
 
+        self.search_btn = tk.Button(control_frame, text="Buscar", command=self.buscar_chave)
+        self.search_btn.pack(side=tk.LEFT, padx=5)
+
+        self.generate_btn = tk.Button(control_frame, text="Gerar N chaves", command=self.gerar_arvore)
+        self.generate_btn.pack(side=tk.LEFT)
+
         self.speed_scale = tk.Scale(
             control_frame, from_=100, to=3000, orient=tk.HORIZONTAL,
             label="Tempo entre passos (ms)", length=250
@@ -42,8 +72,52 @@ class TreeVisualizerGUI:
         self.speed_scale.set(1000)
         self.speed_scale.pack(side=tk.RIGHT, padx=10)
 
+        # Controles de reprodução: a animação pode ser pausada, andar passo a
+        # passo em qualquer sentido ou pular direto para um passo.
+        playback_frame = tk.Frame(master)
+        playback_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10)
+
+        self.back_btn = tk.Button(playback_frame, text="◀ Passo", command=self.passo_anterior)
+        self.back_btn.pack(side=tk.LEFT)
+
+        self.pause_btn = tk.Button(playback_frame, text="Pausar", width=9, command=self.alternar_pausa)
+        self.pause_btn.pack(side=tk.LEFT, padx=5)
+
+        self.forward_btn = tk.Button(playback_frame, text="Passo ▶", command=self.proximo_passo)
+        self.forward_btn.pack(side=tk.LEFT)
+
+        self.step_scale = tk.Scale(playback_frame, from_=0, to=0, orient=tk.HORIZONTAL, showvalue=True,
+                                   label="Passo da operação", command=self._ao_mover_passo)
+        self.step_scale.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=10)
+
+        self.suavizar = tk.BooleanVar(value=True)
+        tk.Checkbutton(playback_frame, text="Transição suave", variable=self.suavizar).pack(side=tk.LEFT)
+
+        tk.Button(playback_frame, text="Abrir trace", command=self.abrir_trace).pack(side=tk.RIGHT, padx=(5, 0))
+        tk.Button(playback_frame, text="Centralizar", command=self.centralizar).pack(side=tk.RIGHT)
+        tk.Button(playback_frame, text="+", width=2,
+                  command=lambda: self.aplicar_zoom(self.FATOR_ZOOM)).pack(side=tk.RIGHT, padx=5)
+        tk.Button(playback_frame, text="−", width=2,
+                  command=lambda: self.aplicar_zoom(1 / self.FATOR_ZOOM)).pack(side=tk.RIGHT)
+
+        # Linha do tempo: o estado da árvore depois de qualquer operação da
+        # sessão, restaurado pelo histórico de checkpoints (ver Historico.py)
+        timeline_frame = tk.Frame(master)
+        timeline_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10)
+
+        self.timeline_scale = tk.Scale(timeline_frame, from_=0, to=0, orient=tk.HORIZONTAL, showvalue=True,
+                                       label="Linha do tempo (operação)", command=self._ao_mover_linha_do_tempo)
+        self.timeline_scale.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
         self.canvas = tk.Canvas(master, bg='white')
         self.canvas.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        # Roda do mouse aproxima/afasta em torno do cursor; arrastar move a vista
+        self.canvas.bind("<MouseWheel>", lambda e: self.aplicar_zoom(
+            self.FATOR_ZOOM if e.delta > 0 else 1 / self.FATOR_ZOOM, e.x, e.y))
+        self.canvas.bind("<Button-4>", lambda e: self.aplicar_zoom(self.FATOR_ZOOM, e.x, e.y))
+        self.canvas.bind("<Button-5>", lambda e: self.aplicar_zoom(1 / self.FATOR_ZOOM, e.x, e.y))
+        self.canvas.bind("<ButtonPress-1>", self._iniciar_arraste)
+        self.canvas.bind("<B1-Motion>", self._arrastar)
         
         try:
             self.btree = tree_class(t=t_param)
@@ -51,22 +125,38 @@ class TreeVisualizerGUI:
             self.status_label.config(text=str(e), fg="red")
             self.insert_btn.config(state=tk.DISABLED)
             self.delete_btn.config(state=tk.DISABLED)
+            self.search_btn.config(state=tk.DISABLED)
+            self.generate_btn.config(state=tk.DISABLED)
 
-        self.animation_steps = []
+        self.pool = BufferPool(self.PAGINAS_EM_CACHE, 'lru')
+        self.historico = Historico(self.btree, lambda: tree_class(t=t_param))
+        self._movendo_linha = False
+        self.log = LogAnimacao()
+        self.log.inicializar(self.btree.snapshot())
+        self._agendado = None
+        self._movendo_escala = False
+        # Desenho retido: itens do canvas por uid do nó, reaproveitados entre quadros
+        self._itens = {}
+        self._item_vazio = None
+        self._coords = {}
+        self._transicao = []
+        self._transicao_agendada = None
+        # Vista: tela = mundo * zoom + deslocamento; o centro da raiz é x=0 no mundo
+        self.zoom = 1.0
+        self.pan_x = None
+        self.pan_y = 0.0
+        self._arraste = None
+        self._quadro = None
         self.master.update_idletasks()
-        self.desenhar_arvore(self.btree.raiz, f"Árvore {tree_name} (t={t_param}) inicializada.")
+        self.desenhar_arvore(self.log.no_raiz, f"Árvore {tree_name} (t={t_param}) inicializada.")
 
     def inserir_chave(self):
         try:
             key = int(self.entry.get())
             self.entry.delete(0, tk.END)
-            self.animation_steps = []
-            
-            def trace_callback(message, highlighted_path, disk_counter):
-                cloned_root = copy.deepcopy(self.btree.raiz)
-                self.animation_steps.append((cloned_root, message, highlighted_path, disk_counter.copy()))
-            
-            self.btree.insere_com_trace(key, trace_callback)
+            self._iniciar_operacao()
+            self.btree.insere_com_trace(key, self._registrar_passo)
+            self._registrar_operacao('insere', key)
             self.play_animation()
         except ValueError:
             self.status_label.config(text="Erro: Por favor, insira um número inteiro.", fg="red")
@@ -80,13 +170,23 @@ class TreeVisualizerGUI:
         try:
             key = int(self.entry.get())
             self.entry.delete(0, tk.END)
-            self.animation_steps = []
-
-            def trace_callback(message, highlighted_path, disk_counter):
-                cloned_root = copy.deepcopy(self.btree.raiz)
-                self.animation_steps.append((cloned_root, message, highlighted_path, disk_counter.copy()))
+            self._iniciar_operacao()
+            self.btree.remover_com_trace(key, self._registrar_passo)
+            self._registrar_operacao('remover', key)
+            self.play_animation()
+        except ValueError:
+            self.status_label.config(text="Erro: Por favor, insira um número inteiro.", fg="red")
+        except Exception as e:
+            self.status_label.config(text=f"Erro inesperado: {e}", fg="red")
+            import traceback
+            traceback.print_exc()
 
-            self.btree.remover_com_trace(key, trace_callback)
+    def buscar_chave(self):
+        try:
+            key = int(self.entry.get())
+            self.entry.delete(0, tk.END)
+            self._iniciar_operacao()
+            self.btree.busca_com_trace(key, self._registrar_passo)
             self.play_animation()
         except ValueError:
             self.status_label.config(text="Erro: Por favor, insira um número inteiro.", fg="red")
@@ -95,24 +195,257 @@ class TreeVisualizerGUI:
             import traceback
             traceback.print_exc()
 
-    def play_animation(self, index=0):
-        if index >= len(self.animation_steps):
-            if self.animation_steps:
-                final_root, _, _, final_disk_counter = self.animation_steps[-1]
-                self.desenhar_arvore(final_root, "Animação concluída.", disk_counter=final_disk_counter)
+    def gerar_arvore(self):
+        # Troca a árvore por uma nova com as chaves 1..N, para inspecionar
+        # árvores grandes; a B+ usa a carga em massa, as outras inserem em
+        # ordem aleatória.
+        try:
+            n = int(self.entry.get())
+            if n < 0:
+                raise ValueError
+        except ValueError:
+            self.status_label.config(text="Erro: Por favor, insira um número inteiro não negativo.", fg="red")
             return
-        
-        node, message, highlighted_path, disk_counter = self.animation_steps[index]
-        self.desenhar_arvore(node, message, highlighted_path, disk_counter)
-        
-        delay = self.speed_scale.get()
-        self.master.after(delay, lambda: self.play_animation(index + 1))
+        self.entry.delete(0, tk.END)
+        self._cancelar_agendamento()
+        classe = type(self.btree)
+        if hasattr(classe, 'construir_em_massa'):
+            tree = classe.construir_em_massa(range(1, n + 1), t=self.btree.t)
+        else:
+            tree = classe(t=self.btree.t)
+            chaves = list(range(1, n + 1))
+            random.shuffle(chaves)
+            for key in chaves:
+                tree.insere(key)
+        # A árvore gerada é o novo início da linha do tempo
+        self.historico = Historico(tree, self.historico.fabrica)
+        self._atualizar_linha_do_tempo()
+        self._trocar_arvore(tree, f"Árvore gerada com {n} chaves.")
+
+    def _trocar_arvore(self, tree, mensagem):
+        # Os nós são outros: o desenho e o log de animação recomeçam
+        self.btree = tree
+        # O histórico reaplica operações sem trace, e a cópia guardada em cada
+        # nó pelo último snapshot pode estar velha: todos os nós são copiados
+        nos = []
+        pilha = [tree.raiz]
+        while pilha:
+            node = pilha.pop()
+            nos.append(node)
+            pilha.extend(filhos(node))
+        self.log = LogAnimacao()
+        self.log.inicializar(tree.snapshot(nos))
+        self._remover_itens(list(self._itens))
+        self._movendo_escala = True
+        self.step_scale.config(to=0)
+        self._movendo_escala = False
+        self.desenhar_arvore(self.log.no_raiz, mensagem)
+
+    def _registrar_operacao(self, op, key):
+        # Depois de voltar na linha do tempo, uma operação nova descarta as
+        # que vinham depois
+        self.historico.registrar(op, key)
+        self._atualizar_linha_do_tempo()
+
+    def _atualizar_linha_do_tempo(self):
+        self._movendo_linha = True
+        self.timeline_scale.config(to=len(self.historico))
+        self.timeline_scale.set(self.historico.posicao)
+        self._movendo_linha = False
+
+    def _ao_mover_linha_do_tempo(self, valor):
+        if self._movendo_linha or int(valor) == self.historico.posicao:
+            return
+        self._cancelar_agendamento()
+        inicio = time.perf_counter()
+        tree = self.historico.ir_para(int(valor))
+        ms = (time.perf_counter() - inicio) * 1e3
+        n = self.historico.posicao
+        restaurado, reaplicadas = self.historico.ultimo_salto
+        origem = f"checkpoint da operação {restaurado}" if restaurado is not None else "estado anterior"
+        operacao = f" ({' '.join(map(str, self.historico.operacoes[n - 1]))})" if n else ""
+        self._trocar_arvore(tree, f"Depois da operação {n} de {len(self.historico)}{operacao}: "
+                                  f"{origem} + {reaplicadas} reaplicadas em {ms:.1f} ms.")
+
+    def abrir_trace(self):
+        # Reproduz um trace gravado por RastroJSONL (ver Rastro.py); os
+        # eventos são lidos do arquivo à medida que a reprodução avança
+        caminho = filedialog.askopenfilename(title="Abrir trace",
+                                             filetypes=[("Trace JSONL", "*.jsonl"), ("Todos os arquivos", "*")])
+        if not caminho:
+            return
+        try:
+            log = ReproducaoJSONL(caminho)
+        except (OSError, ValueError) as e:
+            self.status_label.config(text=f"Erro ao abrir o trace: {e}", fg="red")
+            return
+        self._cancelar_agendamento()
+        if isinstance(self.log, ReproducaoJSONL):
+            self.log.fechar()
+        self.log = log
+        # A árvore da janela não corresponde ao trace: só a reprodução fica ativa
+        for botao in (self.insert_btn, self.delete_btn, self.search_btn, self.generate_btn, self.timeline_scale):
+            botao.config(state=tk.DISABLED)
+        self._remover_itens(list(self._itens))
+        self._movendo_escala = True
+        self.step_scale.config(to=len(log.passos), label="Passo do trace")
+        self.step_scale.set(0)
+        self._movendo_escala = False
+        self.desenhar_arvore(self.log.no_raiz, f"Trace {os.path.basename(caminho)} carregado: "
+                                               f"{len(log.passos)} passos. Use Reproduzir ou a barra de passos.")
+
+    def _iniciar_operacao(self):
+        self._cancelar_agendamento()
+        self.log.nova_operacao()
+        # Nós por onde a operação passou: são os únicos que o snapshot copia
+        self._tocados = set()
+        self._pool_antes = dict(self.pool.estatisticas)
+        self._ultimo_no = None
+
+    def _registrar_passo(self, message, highlighted_path, disk_counter):
+        # Cada passo vira um delta: o snapshot compartilha com o anterior tudo
+        # o que a operação não tocou, e o log guarda só os nós que mudaram.
+        caminho = nos_no_caminho(self.btree.raiz, highlighted_path) if highlighted_path is not None else []
+        self._tocados.update(caminho)
+        node = caminho[-1] if caminho and len(caminho) == len(highlighted_path) + 1 else None
+        raiz_snapshot = self.btree.snapshot(self._tocados)
+        self.log.registrar(raiz_snapshot, message, highlighted_path, self._contador_com_pool(node, disk_counter))
+
+    def _contador_com_pool(self, node, disk_counter):
+        # Cada nó destacado pela primeira vez no passo conta como uma leitura
+        # lógica no cache simulado; passos seguidos no mesmo nó não contam de novo.
+        # A página é o '_uid' do nó, atribuído pelo snapshot do passo: o id()
+        # de um nó liberado pode ser reaproveitado por um nó novo
+        if node is not None and node is not self._ultimo_no:
+            self.pool.acessar(node._uid)
+            self._ultimo_no = node
+        contador = disk_counter.copy()
+        contador['hits'] = self.pool.estatisticas['hits'] - self._pool_antes['hits']
+        contador['misses'] = self.pool.estatisticas['misses'] - self._pool_antes['misses']
+        return contador
+
+    # --- Reprodução ---
+
+    def play_animation(self):
+        self._movendo_escala = True
+        self.step_scale.config(to=len(self.log.passos))
+        self._movendo_escala = False
+        self.pause_btn.config(text="Pausar")
+        self._tocar()
+
+    def _tocar(self):
+        self._agendado = None
+        if not self.log.avancar():
+            self.pause_btn.config(text="Reproduzir")
+            self.mostrar_passo(concluida=True)
+            return
+        self.mostrar_passo()
+        self._agendado = self.master.after(self.speed_scale.get(), self._tocar)
+
+    def _cancelar_agendamento(self):
+        if self._agendado is not None:
+            self.master.after_cancel(self._agendado)
+            self._agendado = None
+        self.pause_btn.config(text="Reproduzir")
+
+    def alternar_pausa(self):
+        if self._agendado is not None:
+            self._cancelar_agendamento()
+        else:
+            if self.log.atual >= len(self.log.passos):
+                self.log.ir_para(0)
+            self.pause_btn.config(text="Pausar")
+            self._tocar()
+
+    def proximo_passo(self):
+        self._cancelar_agendamento()
+        if self.log.avancar():
+            self.mostrar_passo()
+
+    def passo_anterior(self):
+        self._cancelar_agendamento()
+        if self.log.voltar():
+            self.mostrar_passo()
+
+    def _ao_mover_passo(self, valor):
+        if self._movendo_escala:
+            return
+        self._cancelar_agendamento()
+        self.log.ir_para(int(valor))
+        self.mostrar_passo()
+
+    def mostrar_passo(self, concluida=False):
+        passo = self.log.passo_atual
+        self._movendo_escala = True
+        self.step_scale.set(self.log.atual)
+        self._movendo_escala = False
+        if passo is None:
+            self.desenhar_arvore(self.log.no_raiz, "Início da operação.")
+        elif concluida:
+            self.desenhar_arvore(self.log.no_raiz, "Animação concluída.", disk_counter=passo.disk_counter)
+        else:
+            self.desenhar_arvore(self.log.no_raiz, passo.message, passo.path, passo.disk_counter)
+
+    # --- Vista: zoom e deslocamento ---
+
+    def aplicar_zoom(self, fator, px=None, py=None):
+        # O ponto sob o cursor (ou o centro do canvas) fica parado na tela
+        if px is None:
+            px, py = self.canvas.winfo_width() / 2, self.canvas.winfo_height() / 2
+        if self.pan_x is None:
+            self.pan_x = self.canvas.winfo_width() / 2
+        zoom = min(self.ZOOM_MAXIMO, max(self.ZOOM_MINIMO, self.zoom * fator))
+        escala_y, nova_escala_y = self._escala_vertical(self.zoom), self._escala_vertical(zoom)
+        self.pan_x = px - (px - self.pan_x) / self.zoom * zoom
+        self.pan_y = py - (py - self.pan_y) / escala_y * nova_escala_y
+        self.zoom = zoom
+        self._redesenhar()
+
+    def centralizar(self):
+        self.zoom = 1.0
+        self.pan_x = self.canvas.winfo_width() / 2
+        self.pan_y = 0.0
+        self._redesenhar()
+
+    def _iniciar_arraste(self, event):
+        self._arraste = (event.x, event.y)
+
+    def _arrastar(self, event):
+        if self._arraste is None:
+            return
+        x0, y0 = self._arraste
+        self._arraste = (event.x, event.y)
+        if self.pan_x is None:
+            self.pan_x = self.canvas.winfo_width() / 2
+        self.pan_x += event.x - x0
+        self.pan_y += event.y - y0
+        self._redesenhar()
+
+    def _escala_vertical(self, zoom):
+        return max(zoom, self.ESCALA_VERTICAL_MINIMA)
+
+    def _redesenhar(self):
+        # Mudança de vista: refaz só o posicionamento e o desenho do que está
+        # visível, sem transição suave
+        if self._quadro is None:
+            return
+        self._terminar_transicao()
+        root_node, highlighted_path = self._quadro
+        self._posicionar(root_node, highlighted_path, animar=False)
 
     def desenhar_arvore(self, root_node, message, highlighted_path=None, disk_counter=None):
-        self.canvas.delete("all")
+        self._terminar_transicao()
+        self._quadro = None
         self.status_label.config(text=message)
         
-        if disk_counter:
+        if disk_counter and 'hits' in disk_counter:
+            logicas = disk_counter['hits'] + disk_counter['misses']
+            fisicas = disk_counter['misses']
+            taxa = disk_counter['hits'] / logicas if logicas else 0.0
+            writes = disk_counter.get('writes', 0)
+            self.disk_access_label.config(text=f"Leituras: {logicas} lógicas, {fisicas} físicas "
+                                               f"(acerto {taxa:.0%}), {writes} escritas")
+        elif disk_counter:
             reads = disk_counter.get('reads', 0)
             writes = disk_counter.get('writes', 0)
             self.disk_access_label.config(text=f"Acessos a Disco: {reads} leituras, {writes} escritas")
@@ -120,16 +453,37 @@ class TreeVisualizerGUI:
             self.disk_access_label.config(text="Acessos a Disco: 0 leituras, 0 escritas")
         
         if not root_node or (not root_node.keys and root_node.folha):
-            canvas_width = self.canvas.winfo_width()
-            canvas_height = self.canvas.winfo_height()
-            self.canvas.create_text(
-                canvas_width / 2, canvas_height / 2,
-                text="Árvore vazia", font=("Helvetica", 16, "italic"), fill="grey"
-            )
+            self._remover_itens(list(self._itens))
+            if self._item_vazio is None:
+                canvas_width = self.canvas.winfo_width()
+                canvas_height = self.canvas.winfo_height()
+                self._item_vazio = self.canvas.create_text(
+                    canvas_width / 2, canvas_height / 2,
+                    text="Árvore vazia", font=("Helvetica", 16, "italic"), fill="grey"
+                )
             return
+        if self._item_vazio is not None:
+            self.canvas.delete(self._item_vazio)
+            self._item_vazio = None
+
+        self._quadro = (root_node, highlighted_path)
+        self._posicionar(root_node, highlighted_path)
 
-        self.calcular_posicoes(root_node, 0, self.canvas.winfo_width() / 2)
-        self.desenho_node_recursivo(root_node, highlighted_path)
+    def _posicionar(self, root_node, highlighted_path, animar=True):
+        if self.pan_x is None:
+            self.pan_x = self.canvas.winfo_width() / 2
+        self._folhas = []
+        self._visiveis = []
+        self.calcular_posicoes(root_node, 0, 0)
+        destacado = None
+        # Um nó destacado dentro de uma subárvore resumida destaca o resumo
+        self._no_caminho = set()
+        if highlighted_path is not None:
+            caminho = nos_no_caminho(root_node, highlighted_path)
+            if len(caminho) == len(highlighted_path) + 1:
+                destacado = caminho[-1]
+                self._no_caminho = {node.uid for node in caminho}
+        self.sincronizar_itens(destacado, animar)
     
     # --- FUNÇÕES DE DESENHO CORRIGIDAS PARA SEREM GENÉRICAS ---
 
@@ -137,72 +491,243 @@ class TreeVisualizerGUI:
         """Função auxiliar para obter a lista de filhos, não importa o nome do atributo."""
         return getattr(node, 'children', getattr(node, 'filhos', []))
 
-    def get_node_width(self, node):
-        text = " | ".join(map(str, node.keys))
-        return max(25 * len(text), 70)
-
-    def calcular_posicoes(self, node, depth, x, parent_x=None):
-        if node is None:
-            return
+    # Larguras ficam em cache nos próprios nós (NoVisual). Os deltas do log
+    # invalidam só o nó alterado e seus ancestrais, então depois de uma
+    # inserção a medição refaz O(altura) nós em vez da árvore toda.
 
-        node._y = depth * self.VERTICAL_SPACING + 60
-        node._x = x
-        
-        if not node.folha:
-            children = self._get_children(node)
-            children_widths = [self.get_subtree_width(child) for child in children]
-            total_width = sum(children_widths) + self.HORIZONTAL_SPACING * (len(children) - 1)
-            
-            current_x = x - total_width / 2
-            
-            for i, child in enumerate(children):
-                subtree_width = children_widths[i]
-                child_x = current_x + subtree_width / 2
-                self.calcular_posicoes(child, depth + 1, child_x, parent_x=node._x)
-                current_x += subtree_width + self.HORIZONTAL_SPACING
+    def get_node_width(self, node):
+        if node._largura is None:
+            node._texto = " | ".join(map(str, node.keys))
+            node._largura = max(25 * len(node._texto), 70)
+        return node._largura
 
     def get_subtree_width(self, node):
+        # Pós-ordem memoizada; guarda também o deslocamento de cada filho
+        # em relação ao centro do pai, usado na passada de posicionamento.
         if node is None:
             return 0
-        if node.folha:
-            return self.get_node_width(node)
-        
+        if node._largura_sub is not None:
+            return node._largura_sub
         children = self._get_children(node)
-        children_total_width = sum(self.get_subtree_width(child) for child in children)
-        spacing = self.HORIZONTAL_SPACING * (len(children) - 1)
-        
-        return max(self.get_node_width(node), children_total_width + spacing)
+        if node.folha or not children:
+            node._deslocamentos = ()
+            node._chaves_sub = len(node.keys)
+            node._altura_sub = 1
+            node._largura_sub = self.get_node_width(node)
+            return node._largura_sub
 
-    def desenho_node_recursivo(self, node, highlighted_path=None, current_path=None):
-        if not node: return
-        if current_path is None: current_path = []
-        
-        x, y = node._x, node._y
-        width = self.get_node_width(node)
-        
-        is_bplus_leaf = hasattr(node, 'next') and node.folha
-        fill_color = self.colors['fill']
-        if is_bplus_leaf:
-            fill_color = "#C8E6C9" if self.colors['fill'] == '#9ACD32' else self.colors['fill']
-        
-        outline_color = self.colors['outline']
-        
-        if highlighted_path is not None and current_path == highlighted_path:
-            self.canvas.create_rectangle(x - width / 2, y - 20, x + width / 2, y + 20, outline="red", width=3, fill=fill_color)
-        else:
-            self.canvas.create_rectangle(x - width / 2, y - 20, x + width / 2, y + 20, fill=fill_color, outline=outline_color, width=2)
-            
-        text = " | ".join(map(str, node.keys))
-        self.canvas.create_text(x, y, text=text, font=("Helvetica", 10, "bold"))
-        
-        if is_bplus_leaf and node.next and hasattr(node.next, '_x'):
-            self.canvas.create_line(x + width / 2, y, node.next._x - self.get_node_width(node.next) / 2, node.next._y,
-                                    arrow=tk.LAST, dash=(5, 3), fill="blue")
+        children_widths = [self.get_subtree_width(child) for child in children]
+        node._chaves_sub = len(node.keys) + sum(child._chaves_sub for child in children)
+        node._altura_sub = 1 + max(child._altura_sub for child in children)
+        total_width = sum(children_widths) + self.HORIZONTAL_SPACING * (len(children) - 1)
+        deslocamentos = []
+        current_x = -total_width / 2
+        for subtree_width in children_widths:
+            deslocamentos.append(current_x + subtree_width / 2)
+            current_x += subtree_width + self.HORIZONTAL_SPACING
+        node._deslocamentos = deslocamentos
+        node._largura_sub = max(self.get_node_width(node), total_width)
+        return node._largura_sub
 
-        if not node.folha:
+    def calcular_posicoes(self, node, depth, x):
+        # Pré-ordem: cada nó fica no centro do pai mais o deslocamento medido.
+        # Coordenadas do mundo (zoom 1). Só a parte visível é percorrida:
+        # subárvores fora da vista são puladas inteiras pela largura em cache,
+        # e as que ficam estreitas demais na tela viram um resumo, então o
+        # custo acompanha o que aparece na tela e não o tamanho da árvore.
+        if node is None:
+            return
+        self.get_subtree_width(node)
+        escala_y = self._escala_vertical(self.zoom)
+        esquerda = -self.pan_x / self.zoom
+        direita = (self.canvas.winfo_width() - self.pan_x) / self.zoom
+        topo = -self.pan_y / escala_y
+        fundo = (self.canvas.winfo_height() - self.pan_y) / escala_y
+        pilha = [(node, None, depth, x)]
+        while pilha:
+            node, pai, depth, x = pilha.pop()
+            metade = node._largura_sub / 2
+            y = depth * self.VERTICAL_SPACING + 60
+            if x + metade < esquerda or x - metade > direita or y - 20 > fundo:
+                continue
+            node._x = x
+            node._y = y
+            resumo = not node.folha and node._largura_sub * self.zoom < self.LARGURA_MINIMA_SUBARVORE
+            base = y + (node._altura_sub - 1) * self.VERTICAL_SPACING if resumo else y
+            if base + 20 >= topo:
+                self._visiveis.append((node, pai, resumo))
+            if resumo:
+                # Um resumo interrompe a sequência de folhas desenhadas
+                self._folhas.append(None)
+                continue
+            if node.folha:
+                self._folhas.append(node)
+                continue
             children = self._get_children(node)
-            for idx, child in enumerate(children):
-                if hasattr(child, '_x'):
-                    cx, cy = child._x, child._y
-                    self.canvas.create_line(x, y + 20, cx, cy - 20, fill=outline_color, width=1.5)
-                    self.desenho_node_recursivo(child, highlighted_path, current_path + [idx])
\ No newline at end of file
+            for child, dx in reversed(list(zip(children, node._deslocamentos))):
+                pilha.append((child, node, depth + 1, x + dx))
+
+    def _na_tela(self, x, y):
+        return x * self.zoom + self.pan_x, y * self._escala_vertical(self.zoom) + self.pan_y
+
+    # --- Desenho retido ---
+    # Cada nó tem retângulo, texto, aresta até o pai e (folhas da B+) seta até
+    # a próxima folha. Entre quadros os itens só são movidos ou recoloridos
+    # quando algo mudou; criados e apagados só para nós que entraram ou saíram
+    # da vista. Um resumo usa o mesmo retângulo, cobrindo a subárvore inteira.
+
+    def sincronizar_itens(self, destacado, animar=True):
+        self._animar = animar and self.suavizar.get()
+        vistos = set()
+        novas_linhas = False
+        proxima_folha = {id(a): b for a, b in zip(self._folhas, self._folhas[1:]) if a is not None}
+        escala_y = self._escala_vertical(self.zoom)
+        meia_altura = 20 * escala_y
+        tamanho_fonte = round(10 * min(self.zoom, 1.0))
+        for node, pai, resumo in self._visiveis:
+            vistos.add(node.uid)
+            itens = self._itens.get(node.uid)
+            if itens is None:
+                itens = self._itens[node.uid] = {'rect': None, 'texto': None, 'aresta': None, 'seta': None,
+                                                 'estilo': None, 'rotulo': None}
+            x, y = self._na_tela(node._x, node._y)
+
+            is_bplus_leaf = hasattr(node, 'next') and node.folha
+            fill_color = self.colors['fill']
+            if is_bplus_leaf:
+                fill_color = "#C8E6C9" if self.colors['fill'] == '#9ACD32' else self.colors['fill']
+            if resumo:
+                fill_color = "#EEEEEE"
+            em_destaque = node is destacado or (resumo and node.uid in self._no_caminho)
+            contorno, espessura = ("red", 3) if em_destaque else (self.colors['outline'], 2)
+
+            if resumo:
+                metade = node._largura_sub * self.zoom / 2
+                base = y + (node._altura_sub - 1) * self.VERTICAL_SPACING * escala_y
+                retangulo = (x - metade, y - meia_altura, x + metade, base + meia_altura)
+                linha = f"{node._chaves_sub} chaves"
+                texto = f"{linha}\naltura {node._altura_sub}"
+                # O rótulo só aparece se couber no resumo
+                if 2 * metade < 6 * len(linha) + 4 or base - y + 2 * meia_altura < 28:
+                    texto = ""
+                centro = (x, (y + base) / 2)
+                estilo = (fill_color, contorno, espessura, (4, 2), 8)
+            else:
+                metade = self.get_node_width(node) * self.zoom / 2
+                retangulo = (x - metade, y - meia_altura, x + metade, y + meia_altura)
+                texto = node._texto if tamanho_fonte >= self.FONTE_MINIMA else ""
+                centro = (x, y)
+                estilo = (fill_color, contorno, espessura, (), max(tamanho_fonte, 1))
+
+            if itens['rect'] is None:
+                itens['rect'] = self._criar(self.canvas.create_rectangle, retangulo, tags=("no",))
+                itens['texto'] = self._criar(self.canvas.create_text, centro, tags=("no",))
+            else:
+                self._mover(itens['rect'], retangulo)
+                self._mover(itens['texto'], centro)
+            if itens['estilo'] != estilo:
+                # O destaque é uma etiqueta: o nó que o perde volta ao estilo normal
+                fill, outline, largura, tracejado, fonte = estilo
+                self.canvas.itemconfig(itens['rect'], fill=fill, outline=outline, width=largura, dash=tracejado)
+                self.canvas.itemconfig(itens['texto'], font=("Helvetica", fonte, "bold"))
+                if em_destaque:
+                    self.canvas.dtag("destaque", "destaque")
+                    self.canvas.addtag_withtag("destaque", itens['rect'])
+                itens['estilo'] = estilo
+            if itens['rotulo'] != texto:
+                self.canvas.itemconfig(itens['texto'], text=texto)
+                itens['rotulo'] = texto
+
+            aresta = None
+            if pai is not None:
+                px, py = self._na_tela(pai._x, pai._y)
+                aresta = (px, py + meia_altura, x, y - meia_altura)
+            novas_linhas |= self._sincronizar_linha(itens, 'aresta', aresta, fill=self.colors['outline'], width=1.5,
+                                                    tags=("aresta",))
+
+            proxima = proxima_folha.get(id(node)) if is_bplus_leaf else None
+            seta = None
+            if proxima is not None:
+                # Na B+ as folhas encadeadas são exatamente as folhas da esquerda
+                # para a direita; os snapshots não guardam 'next', então a seta
+                # segue a ordem do desenho.
+                px, py = self._na_tela(proxima._x, proxima._y)
+                seta = (x + metade, y, px - self.get_node_width(proxima) * self.zoom / 2, py)
+            novas_linhas |= self._sincronizar_linha(itens, 'seta', seta, arrow=tk.LAST, dash=(5, 3), fill="blue",
+                                                    tags=("aresta",))
+
+        self._remover_itens([uid for uid in self._itens if uid not in vistos])
+        if novas_linhas:
+            # Linhas criadas agora ficariam por cima dos nós
+            self.canvas.tag_lower("aresta")
+        self._iniciar_transicao()
+
+    def _sincronizar_linha(self, itens, chave, coords, **opcoes):
+        item = itens[chave]
+        if coords is None:
+            if item is not None:
+                self._apagar(item)
+                itens[chave] = None
+            return False
+        if item is None:
+            itens[chave] = self._criar(self.canvas.create_line, coords, **opcoes)
+            return True
+        self._mover(item, coords)
+        return False
+
+    def _criar(self, criar, coords, **opcoes):
+        item = criar(*coords, **opcoes)
+        self._coords[item] = coords
+        return item
+
+    def _apagar(self, item):
+        self.canvas.delete(item)
+        self._coords.pop(item, None)
+
+    def _remover_itens(self, uids):
+        for uid in uids:
+            for chave in ('rect', 'texto', 'aresta', 'seta'):
+                item = self._itens[uid][chave]
+                if item is not None:
+                    self._apagar(item)
+            del self._itens[uid]
+
+    # --- Transição suave ---
+
+    def _mover(self, item, destino):
+        origem = self._coords.get(item)
+        if origem == destino:
+            return
+        self._coords[item] = destino
+        if self._animar and origem is not None and len(origem) == len(destino):
+            self._transicao.append((item, origem, destino))
+        else:
+            self.canvas.coords(item, *destino)
+
+    def _iniciar_transicao(self):
+        if not self._transicao:
+            return
+        duracao = min(self.DURACAO_TRANSICAO_MS, self.speed_scale.get() // 2)
+        intervalo = max(1, duracao // self.PASSOS_TRANSICAO)
+        self._passo_transicao(1, intervalo)
+
+    def _passo_transicao(self, passo, intervalo):
+        self._transicao_agendada = None
+        fracao = passo / self.PASSOS_TRANSICAO
+        for item, origem, destino in self._transicao:
+            if item in self._coords:
+                self.canvas.coords(item, *[a + (b - a) * fracao for a, b in zip(origem, destino)])
+        if passo >= self.PASSOS_TRANSICAO:
+            self._transicao = []
+            return
+        self._transicao_agendada = self.master.after(intervalo, lambda: self._passo_transicao(passo + 1, intervalo))
+
+    def _terminar_transicao(self):
+        # Um quadro novo interrompe a transição anterior no ponto final
+        if self._transicao_agendada is not None:
+            self.master.after_cancel(self._transicao_agendada)
+            self._transicao_agendada = None
+        for item, _, destino in self._transicao:
+            if item in self._coords:
+                self.canvas.coords(item, *destino)
+        self._transicao = []
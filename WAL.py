@@ -0,0 +1,94 @@
+# WAL.py
+#
+# Log de escrita antecipada (write-ahead log). Cada registro descreve uma
+# operação inteira já concluída e é gravado como um único bloco com tamanho
+# e CRC; na recuperação, um bloco incompleto ou corrompido no fim do arquivo
+# (queda no meio da escrita) marca o fim do log e é descartado.
+#
+# Commit em grupo: registrar() só acumula o registro em memória; o fsync
+# acontece quando 'grupo' registros estão pendentes, quando o mais antigo
+# espera há mais de 'intervalo' segundos, ou em forcar(). Uma queda pode
+# perder as operações do último grupo, mas nunca deixa uma operação pela
+# metade.
+
+import os
+import pickle
+import struct
+import time
+import zlib
+
+# tamanho e CRC32 do registro
+_REGISTRO = struct.Struct('<II')
+
+
+class WAL:
+    def __init__(self, caminho, grupo=64, intervalo=0.01, ao_forcar=None):
+        if grupo < 1:
+            raise ValueError("O commit em grupo precisa de pelo menos um registro por fsync.")
+        self.caminho = caminho
+        self.grupo = grupo
+        self.intervalo = intervalo
+        # Chamado depois de cada fsync, quando os registros já são duráveis
+        self.ao_forcar = ao_forcar
+        self.fd = os.open(caminho, os.O_RDWR | os.O_CREAT | os.O_APPEND | getattr(os, 'O_BINARY', 0), 0o644)
+        self.tamanho = os.fstat(self.fd).st_size
+        self.estatisticas = {'registros': 0, 'fsyncs': 0}
+        self._buffer = []
+        self._primeiro_pendente = None
+
+    @property
+    def pendente(self):
+        return bool(self._buffer)
+
+    def registrar(self, registro):
+        dados = pickle.dumps(registro, protocol=pickle.HIGHEST_PROTOCOL)
+        self._buffer.append(_REGISTRO.pack(len(dados), zlib.crc32(dados)) + dados)
+        self.estatisticas['registros'] += 1
+        agora = time.monotonic()
+        if self._primeiro_pendente is None:
+            self._primeiro_pendente = agora
+        if len(self._buffer) >= self.grupo or agora - self._primeiro_pendente >= self.intervalo:
+            self.forcar()
+
+    def forcar(self):
+        """Grava e sincroniza todos os registros pendentes."""
+        if self._buffer:
+            bloco = b''.join(self._buffer)
+            os.write(self.fd, bloco)
+            os.fsync(self.fd)
+            self.tamanho += len(bloco)
+            self.estatisticas['fsyncs'] += 1
+            self._buffer = []
+            self._primeiro_pendente = None
+        if self.ao_forcar:
+            self.ao_forcar()
+
+    def registros(self):
+        """Registros completos do log em disco, em ordem. Descarta um final truncado."""
+        with open(self.caminho, 'rb') as f:
+            conteudo = f.read()
+        pos = 0
+        while pos + _REGISTRO.size <= len(conteudo):
+            n, crc = _REGISTRO.unpack_from(conteudo, pos)
+            dados = conteudo[pos + _REGISTRO.size:pos + _REGISTRO.size + n]
+            if len(dados) < n or zlib.crc32(dados) != crc:
+                break
+            yield pickle.loads(dados)
+            pos += _REGISTRO.size + n
+        if pos < len(conteudo):
+            os.ftruncate(self.fd, pos)
+            self.tamanho = pos
+
+    def truncar(self):
+        """Esvazia o log; chamado depois de um checkpoint."""
+        self._buffer = []
+        self._primeiro_pendente = None
+        os.ftruncate(self.fd, 0)
+        os.fsync(self.fd)
+        self.tamanho = 0
+
+    def fechar(self):
+        if self.fd is not None:
+            self.forcar()
+            os.close(self.fd)
+            self.fd = None
@@ -0,0 +1,4 @@
+# Benchmarks de linha de comando (sem interface gráfica).
+# Execute a partir da raiz do repositório, por exemplo:
+#   python -m benchmarks              (comparação das três árvores por carga)
+#   python -m benchmarks.grau
@@ -0,0 +1,195 @@
+# benchmarks/__main__.py
+#
+# Benchmark sem interface gráfica das árvores (B, B*, B+ e B-link) sob cargas
+# reproduzíveis (todas geradas a partir de --seed):
+#
+#   sequencial  n inserções em ordem crescente
+#   reversa     n inserções em ordem decrescente
+#   uniforme    n inserções em ordem aleatória
+#   zipf        n buscas com distribuição de Zipf (expoente --zipf) sobre uma
+#               árvore já carregada com as n chaves; as chaves quentes ficam
+#               espalhadas pela árvore
+#   misto       n operações sobre a árvore carregada: inserções de chaves
+#               novas e remoções de chaves presentes (--insercoes de cada)
+#
+# A carga prévia de 'zipf' e 'misto' não entra na medição. Para cada árvore e
+# carga: ops/s, latência por operação (p50/p95/p99/máx), leituras e escritas
+# do disk_counter (total e por operação) e, no fim, altura, nós e
+# preenchimento médio. Antes disso confere que nenhum nó passou da
+# capacidade: se algum passou, a execução para com erro.
+#
+# Com --bytes-por-no as árvores B, B* e B+ usam capacidade dos nós em bytes
+# (ver Capacidade.py) em vez de t, e cada tamanho de página da lista é medido
+# em separado: a varredura mostra onde as leituras por operação param de cair.
+# --chaves urls troca os inteiros por URLs de tamanho variável (uma por
+# inteiro, na mesma ordem de operações), para medir com chaves de texto.
+#
+#   python -m benchmarks --n 100000 --t 16
+#   python -m benchmarks --bytes-por-no 512 1024 4096 16384 --chaves urls
+#   python -m benchmarks --arvores B+ --cargas uniforme zipf --json resultado.json
+#   python -m benchmarks --json -        (só JSON, na saída padrão)
+
+import argparse
+import itertools
+import json
+import random
+import sys
+import time
+
+from Btree import BTree
+from BStarTree import BStarTree
+from BPlusTree import BPlusTree
+from BLinkTree import BLinkTree
+from benchmarks.estatisticas import conferir_capacidade, estatisticas_arvore
+
+ARVORES = {"B": BTree, "B*": BStarTree, "B+": BPlusTree, "B-link": BLinkTree}
+# Árvores que aceitam capacidade em bytes
+COM_BYTES = ("B", "B*", "B+")
+CARGAS = ("sequencial", "reversa", "uniforme", "zipf", "misto")
+DOMINIOS = ("https://www.lojaexemplo.com.br", "https://api.servico.example.com", "http://noticias.portal.net")
+SEGMENTOS = ("produtos", "categorias", "eletronicos", "livros", "2024", "artigos", "v2", "usuarios", "pedidos")
+
+
+def url(k):
+    # URL determinística e única para o inteiro k (o último segmento é o próprio k)
+    caminho = "/".join(SEGMENTOS[k // len(SEGMENTOS) ** j % len(SEGMENTOS)] for j in range(1 + k % 4))
+    return f"{DOMINIOS[k % len(DOMINIOS)]}/{caminho}/{k}"
+
+
+def gerar_carga(nome, n, rnd, zipf=1.1, insercoes=0.5):
+    """Retorna (chaves da carga prévia, lista de operações (op, chave))."""
+    if nome == "sequencial":
+        return [], [("insere", k) for k in range(n)]
+    if nome == "reversa":
+        return [], [("insere", k) for k in reversed(range(n))]
+    chaves = list(range(n))
+    rnd.shuffle(chaves)
+    if nome == "uniforme":
+        return [], [("insere", k) for k in chaves]
+    if nome == "zipf":
+        # Posição i (da permutação) tem peso 1/(i+1)^s
+        pesos = list(itertools.accumulate(1 / (i + 1) ** zipf for i in range(n)))
+        return chaves, [("busca", k) for k in rnd.choices(chaves, cum_weights=pesos, k=n)]
+    if nome == "misto":
+        vivas = list(chaves)
+        novas = iter(range(n, 2 * n))
+        operacoes = []
+        for _ in range(n):
+            if not vivas or rnd.random() < insercoes:
+                k = next(novas)
+                vivas.append(k)
+                operacoes.append(("insere", k))
+            else:
+                # Remove uma chave presente qualquer em O(1)
+                i = rnd.randrange(len(vivas))
+                vivas[i], vivas[-1] = vivas[-1], vivas[i]
+                operacoes.append(("remove", vivas.pop()))
+        return chaves, operacoes
+    raise ValueError(f"Carga desconhecida: {nome!r} (use {', '.join(CARGAS)}).")
+
+
+def _percentil(ordenadas, p):
+    return ordenadas[min(len(ordenadas) - 1, int(p / 100 * len(ordenadas)))]
+
+
+def medir(tree_class, t, previa, operacoes, bytes_por_no=None):
+    tree = tree_class(t=t) if bytes_por_no is None else tree_class(t=t, bytes_por_no=bytes_por_no)
+    for k in previa:
+        tree.insere(k)
+    disk_counter = {'reads': 0, 'writes': 0}
+    metodos = {"insere": tree.insere, "remove": tree.remover, "busca": tree.busca}
+    latencias = []
+    relogio = time.perf_counter_ns
+    inicio = relogio()
+    for op, k in operacoes:
+        antes = relogio()
+        metodos[op](k, disk_counter)
+        latencias.append(relogio() - antes)
+    total = (relogio() - inicio) / 1e9
+    latencias.sort()
+    n = len(operacoes)
+    resultado = {
+        'operacoes': n,
+        'segundos': total,
+        'ops_por_segundo': n / total if total else 0.0,
+        'latencia_us': {
+            'p50': _percentil(latencias, 50) / 1e3 if n else 0.0,
+            'p95': _percentil(latencias, 95) / 1e3 if n else 0.0,
+            'p99': _percentil(latencias, 99) / 1e3 if n else 0.0,
+            'max': latencias[-1] / 1e3 if n else 0.0,
+        },
+        'leituras': disk_counter['reads'],
+        'escritas': disk_counter['writes'],
+        'leituras_por_op': disk_counter['reads'] / n if n else 0.0,
+        'escritas_por_op': disk_counter['writes'] / n if n else 0.0,
+    }
+    # Um nó acima da capacidade invalida leituras e preenchimento: a
+    # execução para em vez de mostrar esses números
+    conferir_capacidade(tree)
+    resultado.update(estatisticas_arvore(tree))
+    return resultado
+
+
+def imprimir_tabela(resultados, saida=sys.stdout):
+    print(f"{'árvore':<7}{'carga':<12}{'página':>8}{'ops/s':>10}{'p50 µs':>9}{'p95 µs':>9}{'p99 µs':>9}{'máx µs':>10}"
+          f"{'leituras':>11}{'escritas':>11}{'leit/op':>9}{'escr/op':>9}{'altura':>8}{'nós':>9}{'cheio':>7}",
+          file=saida)
+    for r in resultados:
+        lat = r['latencia_us']
+        pagina = r['bytes_por_no'] if r['bytes_por_no'] is not None else "-"
+        print(f"{r['arvore']:<7}{r['carga']:<12}{pagina:>8}{r['ops_por_segundo']:>10.0f}{lat['p50']:>9.2f}{lat['p95']:>9.2f}"
+              f"{lat['p99']:>9.2f}{lat['max']:>10.1f}{r['leituras']:>11}{r['escritas']:>11}"
+              f"{r['leituras_por_op']:>9.2f}{r['escritas_por_op']:>9.2f}{r['altura']:>8}{r['nos']:>9}"
+              f"{r['preenchimento']:>7.0%}", file=saida)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Compara as Árvores B, B* e B+ sob cargas reproduzíveis.")
+    parser.add_argument("--n", type=int, default=50000, help="operações por carga")
+    parser.add_argument("--t", type=int, default=16)
+    parser.add_argument("--arvores", nargs="+", choices=list(ARVORES), default=list(ARVORES))
+    parser.add_argument("--cargas", nargs="+", choices=CARGAS, default=list(CARGAS))
+    parser.add_argument("--zipf", type=float, default=1.1, help="expoente da distribuição de Zipf")
+    parser.add_argument("--insercoes", type=float, default=0.5, help="fração de inserções na carga mista")
+    parser.add_argument("--bytes-por-no", type=int, nargs="+", metavar="BYTES",
+                        help="tamanhos de página a varrer (capacidade em bytes em vez de --t)")
+    parser.add_argument("--chaves", choices=("inteiros", "urls"), default="inteiros")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", metavar="ARQUIVO", nargs="?", const="-",
+                        help="grava os resultados em JSON ('-' ou sem valor: só JSON, na saída padrão)")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for carga in args.cargas:
+        # A mesma sequência de operações para todas as árvores
+        previa, operacoes = gerar_carga(carga, args.n, random.Random(args.seed), args.zipf, args.insercoes)
+        if args.chaves == "urls":
+            previa = [url(k) for k in previa]
+            operacoes = [(op, url(k)) for op, k in operacoes]
+        for nome in args.arvores:
+            paginas = args.bytes_por_no or [None]
+            if args.bytes_por_no and nome not in COM_BYTES:
+                print(f"{nome} ignorada: sem capacidade em bytes", file=sys.stderr)
+                continue
+            for bytes_por_no in paginas:
+                try:
+                    r = medir(ARVORES[nome], args.t, previa, operacoes, bytes_por_no)
+                except ValueError as e:
+                    print(f"{nome} ignorada: {e}", file=sys.stderr)
+                    continue
+                r.update(arvore=nome, carga=carga, t=args.t, bytes_por_no=bytes_por_no, seed=args.seed)
+                resultados.append(r)
+
+    if args.json == "-":
+        json.dump(resultados, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return
+    imprimir_tabela(resultados)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# benchmarks/carga_em_massa.py
+#
+# Compara N chamadas a BPlusTree.insere com BPlusTree.construir_em_massa.
+#
+#   python -m benchmarks.carga_em_massa --n 1000000 --t 64
+
+import argparse
+import time
+
+from BPlusTree import BPlusTree
+from benchmarks.estatisticas import estatisticas_arvore
+
+
+def _linha(nome, segundos, disk_counter, tree):
+    est = estatisticas_arvore(tree)
+    print(f"{nome:<22}{segundos:>9.3f}{disk_counter['writes']:>11}{est['altura']:>8}"
+          f"{est['nos']:>9}{est['preenchimento']:>8.0%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inserções repetidas x carga em massa na Árvore B+.")
+    parser.add_argument("--n", type=int, default=200000)
+    parser.add_argument("--t", type=int, default=32)
+    parser.add_argument("--fatores", type=float, nargs="+", default=[1.0, 0.9, 0.7])
+    args = parser.parse_args(argv)
+
+    print(f"{'método':<22}{'seg':>9}{'escritas':>11}{'altura':>8}{'nós':>9}{'cheio':>8}")
+
+    tree = BPlusTree(t=args.t)
+    disk_counter = {'reads': 0, 'writes': 0}
+    inicio = time.perf_counter()
+    for k in range(args.n):
+        tree.insere(k, disk_counter)
+    _linha("insere x N", time.perf_counter() - inicio, disk_counter, tree)
+
+    for fator in args.fatores:
+        disk_counter = {'reads': 0, 'writes': 0}
+        inicio = time.perf_counter()
+        tree = BPlusTree.construir_em_massa(range(args.n), t=args.t, fator_preenchimento=fator,
+                                            disk_counter=disk_counter)
+        _linha(f"em massa (f={fator:g})", time.perf_counter() - inicio, disk_counter, tree)
+
+
+if __name__ == "__main__":
+    main()
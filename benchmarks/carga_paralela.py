@@ -0,0 +1,78 @@
+# benchmarks/carga_paralela.py
+#
+# Tempo da carga em massa serial (BPlusTree.construir_em_massa) contra a
+# carga repartida entre processos (CargaParalela.construir_em_paralelo) com
+# 1..N trabalhadores, e o ganho de cada uma sobre a serial. Confere também
+# que a árvore paralela é igual à serial: os mesmos nós em cada nível, com as
+# mesmas chaves, e a mesma lista de folhas.
+#
+#   python -m benchmarks.carga_paralela --n 10000000 --t 64 --trabalhadores 1 2 4 8
+
+import argparse
+from itertools import zip_longest
+import os
+import time
+
+from BPlusTree import BPlusTree
+from CargaParalela import construir_em_paralelo
+
+
+def _folhas(tree):
+    node = tree.raiz
+    while not node.folha:
+        node = node.children[0]
+    while node is not None:
+        yield node
+        node = node.next
+
+
+def _niveis(tree):
+    # Chaves de cada nó, um nível por vez
+    nivel = [tree.raiz]
+    while nivel:
+        yield [list(node.keys) for node in nivel]
+        nivel = [filho for node in nivel if not node.folha for filho in node.children]
+
+
+def _iguais(a, b):
+    # zip_longest: uma árvore com um nível, nó ou folha a mais ou a menos
+    # não passa por igual
+    if any(x != y for x, y in zip_longest(_niveis(a), _niveis(b))):
+        return False
+    return all(x is not None and y is not None and list(x.keys) == list(y.keys)
+               for x, y in zip_longest(_folhas(a), _folhas(b)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Carga em massa serial x paralela na Árvore B+.")
+    parser.add_argument("--n", type=int, default=2000000)
+    parser.add_argument("--t", type=int, default=64)
+    parser.add_argument("--fator", type=float, default=1.0, help="fator de preenchimento")
+    parser.add_argument("--trabalhadores", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--compacta", action="store_true", help="chaves em array('q')")
+    parser.add_argument("--lista", action="store_true",
+                        help="entrada como lista (o padrão é um range, barato de repartir)")
+    args = parser.parse_args(argv)
+
+    chaves = list(range(args.n)) if args.lista else range(args.n)
+    print(f"{'método':<16}{'seg':>9}{'ganho':>8}")
+    inicio = time.perf_counter()
+    serial = BPlusTree.construir_em_massa(chaves, t=args.t, fator_preenchimento=args.fator,
+                                          compacta=args.compacta)
+    base = time.perf_counter() - inicio
+    print(f"{'serial':<16}{base:>9.3f}{1:>8.2f}")
+
+    for trabalhadores in args.trabalhadores:
+        inicio = time.perf_counter()
+        tree = construir_em_paralelo(chaves, t=args.t, fator_preenchimento=args.fator,
+                                     trabalhadores=trabalhadores, compacta=args.compacta)
+        segundos = time.perf_counter() - inicio
+        assert _iguais(serial, tree), "árvore paralela diferente da serial"
+        print(f"{f'paralela ({trabalhadores})':<16}{segundos:>9.3f}{base / segundos:>8.2f}")
+    print(f"({os.cpu_count()} CPUs; a partida dos processos e a remontagem dos nós no processo "
+          f"principal limitam o ganho)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# benchmarks/chaves_texto.py
+#
+# Chaves de texto (URLs) na Árvore B+ com capacidade dos nós em bytes:
+# BPlusTree com as chaves inteiras nos nós e separadores copiados das folhas,
+# contra BPlusTreeTexto (truncamento de sufixo nos separadores e compressão
+# de prefixo por nó). Para cada tamanho de nó mostra altura, nós, fanout
+# médio dos internos, tamanho médio dos separadores, preenchimento em bytes
+# e as leituras do disk_counter por busca.
+#
+# As URLs são sintéticas e reproduzíveis (--seed): poucos domínios, caminhos
+# com segmentos repetidos e um identificador no fim, então as chaves vizinhas
+# compartilham prefixos longos, como num índice real de URLs.
+#
+# Antes de medir, cada árvore passa por uma carga misturada de put, delete e
+# remove_range; o conteúdo é conferido contra um dicionário e nenhum nó pode
+# passar de bytes_por_no.
+#
+#   python -m benchmarks.chaves_texto --n 100000 --bytes-por-no 4096 16384
+#   python -m benchmarks.chaves_texto --em-massa
+
+import argparse
+import random
+
+from BPlusTree import BPlusTree
+from BPlusTreeTexto import BPlusTreeTexto
+from Capacidade import tamanho_chave
+from benchmarks.estatisticas import conferir_capacidade, estatisticas_arvore
+
+DOMINIOS = ["https://www.lojaexemplo.com.br", "https://blog.exemplo.org", "https://api.servico.example.com",
+            "http://noticias.portal.net", "https://docs.projeto.io", "https://cdn.imagens-exemplo.com"]
+SEGMENTOS = ["produtos", "categorias", "eletronicos", "livros", "2023", "2024", "artigos", "v1", "v2",
+             "usuarios", "pedidos", "busca", "tags", "imagens", "assets", "static", "pt-br", "en-us"]
+
+
+def gerar_urls(n, seed):
+    rnd = random.Random(seed)
+    urls = set()
+    while len(urls) < n:
+        caminho = "/".join(rnd.choice(SEGMENTOS) for _ in range(rnd.randint(1, 4)))
+        urls.add(f"{rnd.choice(DOMINIOS)}/{caminho}/{rnd.randrange(10 ** 7)}")
+    return list(urls)
+
+
+def _separadores(tree):
+    tamanhos = []
+    nivel = [tree.raiz]
+    while not nivel[0].folha:
+        for node in nivel:
+            tamanhos.extend(tamanho_chave(k) for k in node.keys)
+        nivel = [c for node in nivel for c in node.children]
+    return sum(tamanhos) / len(tamanhos) if tamanhos else 0.0
+
+
+def _conteudo(tree):
+    node = tree.raiz
+    while not node.folha:
+        node = node.children[0]
+    chaves = []
+    while node is not None:
+        chaves.extend(node.keys)
+        node = node.next
+    return chaves
+
+
+def conferir_remocao(classe, urls, bytes_por_no, operacoes, seed):
+    """Carga misturada de put, delete e remove_range conferida contra um dict,
+    com a capacidade dos nós conferida depois de cada operação."""
+    rnd = random.Random(seed)
+    tree = classe(bytes_por_no=bytes_por_no)
+    esperado = {}
+    for i in range(operacoes):
+        sorteio, url = rnd.random(), rnd.choice(urls)
+        if sorteio < 0.6:
+            tree.put(url, i)
+            esperado[url] = i
+        elif sorteio < 0.9:
+            tree.delete(url)
+            esperado.pop(url, None)
+        else:
+            lo, hi = sorted(rnd.sample(urls, 2))
+            removidas = [k for k in esperado if lo <= k < hi]
+            assert tree.remove_range(lo, hi) == len(removidas), f"remove_range({lo!r}, {hi!r}) contou errado"
+            for k in removidas:
+                del esperado[k]
+        conferir_capacidade(tree)
+    assert _conteudo(tree) == sorted(esperado), f"{classe.__name__} com {bytes_por_no} bytes/nó perdeu chaves"
+
+
+def medir(classe, urls, bytes_por_no, em_massa, buscas):
+    if em_massa:
+        tree = classe.construir_em_massa(sorted(urls), bytes_por_no=bytes_por_no)
+    else:
+        tree = classe(bytes_por_no=bytes_por_no)
+        for url in urls:
+            tree.insere(url)
+    disk_counter = {'reads': 0, 'writes': 0}
+    for url in buscas:
+        tree.busca(url, disk_counter)
+    resultado = estatisticas_arvore(tree)
+    resultado['separador'] = _separadores(tree)
+    resultado['leituras'] = disk_counter['reads'] / len(buscas)
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="URLs na Árvore B+: chaves inteiras x separadores curtos "
+                                                 "e prefixos comprimidos.")
+    parser.add_argument("--n", type=int, default=100000)
+    parser.add_argument("--bytes-por-no", type=int, nargs="+", default=[1024, 4096, 16384])
+    parser.add_argument("--buscas", type=int, default=20000)
+    parser.add_argument("--em-massa", action="store_true", help="carga em massa em vez de inserções")
+    parser.add_argument("--conferir", type=int, default=6000, help="operações da carga de conferência")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    urls = gerar_urls(args.n, args.seed)
+    rnd = random.Random(args.seed + 1)
+    buscas = [rnd.choice(urls) for _ in range(args.buscas)]
+    media = sum(map(tamanho_chave, urls)) / len(urls)
+    print(f"{args.n} URLs, {media:.0f} bytes em média, "
+          f"{'carga em massa' if args.em_massa else 'inserções em ordem aleatória'}")
+    print(f"{'bytes/nó':>9} {'árvore':<15}{'altura':>7}{'nós':>9}{'fanout':>8}{'separador':>10}"
+          f"{'cheio':>7}{'leituras/busca':>16}")
+    # Nós pequenos e URLs curtas: muitas divisões e junções por operação
+    curtas = [url[:50] for url in urls[:args.conferir // 2]]
+    for bytes_por_no in sorted({512, *args.bytes_por_no}):
+        for classe in (BPlusTree, BPlusTreeTexto):
+            conferir_remocao(classe, curtas, bytes_por_no, args.conferir, args.seed)
+    for bytes_por_no in args.bytes_por_no:
+        for nome, classe in (("B+", BPlusTree), ("B+ texto", BPlusTreeTexto)):
+            r = medir(classe, urls, bytes_por_no, args.em_massa, buscas)
+            print(f"{bytes_por_no:>9} {nome:<15}{r['altura']:>7}{r['nos']:>9}{r['fanout']:>8.1f}"
+                  f"{r['separador']:>10.1f}{r['preenchimento']:>7.0%}{r['leituras']:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
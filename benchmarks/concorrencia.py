@@ -0,0 +1,267 @@
+# benchmarks/concorrencia.py
+#
+# Vazão da BPlusTreeConcorrente (latch crabbing) e da BLinkTree (leituras
+# otimistas, ligações à direita) com 1, 2, 4 e 8 threads, comparadas com a
+# BPlusTree comum atrás de um único lock global. Cada thread
+# faz uma mistura de buscas, inserções, remoções e varreduras curtas sobre
+# uma árvore pré-carregada.
+#
+# Com --estresse roda um teste de estresse em vez do benchmark. Escritores
+# inserem e removem chaves de conjuntos disjuntos, e leitores fazem buscas
+# e varreduras ao mesmo tempo. No fim confere as chaves de cada escritor,
+# a ordem das varreduras e a estrutura da árvore (ordem, altura uniforme,
+# ocupação mínima e lista de folhas; na B-link, as ligações e chaves altas
+# de todos os níveis). Na B-link roda antes uma regressão determinística:
+# busca e get numa folha dividida entre a descida e a leitura.
+#
+#   python -m benchmarks.concorrencia --n 50000 --ops 20000 --threads 1 2 4 8
+#   python -m benchmarks.concorrencia --estresse --threads 8 --ops 20000 --arvore b-link
+
+import argparse
+import random
+import sys
+import threading
+import time
+
+from BLinkTree import BLinkTree
+from BPlusTree import BPlusTree
+from BPlusTreeConcorrente import BPlusTreeConcorrente
+
+CONCORRENTES = {"crabbing": BPlusTreeConcorrente, "b-link": BLinkTree}
+
+
+class _ComLockGlobal:
+    """A BPlusTree comum serializada por um lock, como referência."""
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.lock = threading.Lock()
+
+    def busca(self, key):
+        with self.lock:
+            return self.tree.busca(key)
+
+    def insere(self, key):
+        with self.lock:
+            self.tree.insere(key)
+
+    def remover(self, key):
+        with self.lock:
+            self.tree.remover(key)
+
+    def range(self, lo, limite):
+        with self.lock:
+            return list(self.tree.range(lo, limite=limite))
+
+
+def _carregar(tree_class, n, t):
+    return tree_class.construir_em_massa(range(0, 2 * n, 2), t=t, fator_preenchimento=0.7)
+
+
+def _trabalho(tree, n, ops, seed, leituras, varreduras):
+    rnd = random.Random(seed)
+    for _ in range(ops):
+        k = rnd.randrange(2 * n)
+        r = rnd.random()
+        if r < leituras:
+            tree.busca(k)
+        elif r < leituras + varreduras:
+            list(tree.range(k, limite=20))
+        elif r < (1 + leituras + varreduras) / 2:
+            tree.insere(k)
+        else:
+            tree.remover(k)
+
+
+def _protegido(alvo, erros):
+    # Sem isto a exceção de uma thread só chega ao threading.excepthook e a
+    # execução segue como se nada tivesse acontecido
+    def rodar(*args):
+        try:
+            alvo(*args)
+        except BaseException as e:
+            erros.append(f"{threading.current_thread().name}: {type(e).__name__}: {e}")
+    return rodar
+
+
+def _rodar_threads(alvo, argumentos, erros):
+    """Roda alvo(*a) numa thread para cada a; exceções das threads vão para 'erros'."""
+    threads = [threading.Thread(target=_protegido(alvo, erros), args=a) for a in argumentos]
+    inicio = time.perf_counter()
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    return time.perf_counter() - inicio
+
+
+def benchmark(args):
+    fabricas = (
+        ("lock global", lambda: _ComLockGlobal(_carregar(BPlusTree, args.n, args.t))),
+        ("crabbing", lambda: _carregar(BPlusTreeConcorrente, args.n, args.t)),
+        ("b-link", lambda: _carregar(BLinkTree, args.n, args.t)),
+    )
+    print(f"{'threads':>8}" + "".join(f"{nome:>14}" for nome, _ in fabricas))
+    for n_threads in args.threads:
+        linha = f"{n_threads:>8}"
+        for _, fabrica in fabricas:
+            tree = fabrica()
+            erros = []
+            segundos = _rodar_threads(_trabalho, [(tree, args.n, args.ops, args.seed + i, args.leituras,
+                                                   args.varreduras) for i in range(n_threads)], erros)
+            if erros:
+                raise RuntimeError(f"{len(erros)} thread(s) falharam: {erros[:5]}")
+            linha += f"{n_threads * args.ops / segundos:>14.0f}"
+        print(linha)
+    print("(operações por segundo, somando todas as threads)")
+    if getattr(sys, '_is_gil_enabled', lambda: True)():
+        # Com o GIL só uma thread executa Python por vez: os latches custam
+        # mais que o lock único e não há paralelismo real para ganhar
+        print("GIL ativo: use um Python sem GIL (3.13t) para ver o ganho com várias threads.")
+
+
+# --- Teste de estresse ---
+
+def _escritor(tree, chaves, ops, seed, presentes):
+    rnd = random.Random(seed)
+    for _ in range(ops):
+        k = rnd.choice(chaves)
+        if k in presentes:
+            tree.remover(k)
+            presentes.discard(k)
+        else:
+            tree.insere(k)
+            presentes.add(k)
+        # Cada escritor é o único dono das suas chaves: ele sempre as enxerga
+        assert tree.busca(k) == (k in presentes), f"busca({k}) inconsistente para o próprio escritor"
+
+
+def _leitor(tree, universo, parar, seed, erros):
+    rnd = random.Random(seed)
+    while not parar.is_set():
+        lo = rnd.randrange(universo)
+        vistas = list(tree.range(lo, lo + 500))
+        if vistas != sorted(vistas) or len(vistas) != len(set(vistas)) or (vistas and vistas[0] < lo):
+            erros.append(f"varredura a partir de {lo} fora de ordem ou repetida")
+        tree.busca(rnd.randrange(universo))
+
+
+class _SplitNaLeitura(BLinkTree):
+    # Insere 'intrometida' logo depois da descida de uma operação, como um
+    # escritor concorrente que divide a folha antes de ela ser lida
+    intrometida = None
+
+    def _descer(self, key, *args, **kwargs):
+        folha = super()._descer(key, *args, **kwargs)
+        if self.intrometida is not None:
+            k, self.intrometida = self.intrometida, None
+            self.insere(k)
+        return folha
+
+
+def regressao_split_na_leitura():
+    """Busca e get numa folha dividida entre a descida e a leitura (B-link)."""
+    for ler, esperado in ((lambda tree: tree.busca(30), True), (lambda tree: tree.get(30, 'ausente'), None)):
+        tree = _SplitNaLeitura(t=2)
+        for k in (10, 20, 30):
+            tree.insere(k)
+        # A folha [10, 20, 30] vira [10, 15] + [20, 30]: a chave 30 vai para o irmão
+        tree.intrometida = 15
+        assert ler(tree) == esperado, "chave perdida num split entre a descida e a leitura da folha"
+
+
+def verificar_estrutura(tree):
+    """Confere ordem, altura uniforme, ocupação mínima e a lista de folhas."""
+    t = tree.t
+    folhas = []
+    # A B-link não funde nós: a ocupação mínima não vale, mas cada nível
+    # inteiro é uma lista ligada com chaves altas
+    blink = isinstance(tree, BLinkTree)
+    niveis = {}
+
+    def visitar(node, lo, hi, nivel, eh_raiz):
+        keys = list(node.keys)
+        assert keys == sorted(keys), "chaves fora de ordem"
+        assert all((lo is None or k >= lo) and (hi is None or k < hi) for k in keys), "chave fora do intervalo"
+        assert eh_raiz or blink or len(keys) >= t - 1, "nó abaixo da ocupação mínima"
+        assert len(keys) <= 2 * t - 1, "nó acima da capacidade"
+        if blink:
+            assert node.alta == hi, "chave alta diferente do limite do pai"
+            niveis.setdefault(nivel, []).append(node)
+        if node.folha:
+            folhas.append((node, nivel))
+            return
+        assert len(node.children) == len(keys) + 1, "filhos e chaves não batem"
+        limites = [lo] + keys + [hi]
+        for i, filho in enumerate(node.children):
+            visitar(filho, limites[i], limites[i + 1], nivel + 1, False)
+
+    visitar(tree.raiz, None, None, 0, True)
+    assert len({nivel for _, nivel in folhas}) == 1, "folhas em alturas diferentes"
+    for (a, _), (b, _) in zip(folhas, folhas[1:]):
+        assert a.next is b, "lista de folhas quebrada"
+    assert folhas[-1][0].next is None, "última folha com próxima"
+    for nos in niveis.values():
+        for a, b in zip(nos, nos[1:]):
+            assert a.next is b, "ligação à direita quebrada"
+        assert nos[-1].next is None, "último nó do nível com próximo"
+
+
+def estresse(args):
+    if args.arvore == "b-link":
+        regressao_split_na_leitura()
+    sys.setswitchinterval(1e-5)  # mais trocas de thread, mais intercalações
+    n_escritores = max(1, args.threads[-1])
+    universo = 2 * args.n
+    tree = _carregar(CONCORRENTES[args.arvore], args.n, args.t)
+    inicial = set(range(0, universo, 2))
+    # Chaves do escritor i: as congruentes a i módulo n_escritores
+    conjuntos = [[k for k in range(i, universo, n_escritores)] for i in range(n_escritores)]
+    presentes = [{k for k in chaves if k in inicial} for chaves in conjuntos]
+    parar = threading.Event()
+    erros = []
+    leitores = [threading.Thread(target=_protegido(_leitor, erros),
+                                 args=(tree, universo, parar, args.seed + 1000 + i, erros))
+                for i in range(args.leitores)]
+    for th in leitores:
+        th.start()
+    inicio = time.perf_counter()
+    _rodar_threads(_escritor, [(tree, conjuntos[i], args.ops, args.seed + i, presentes[i])
+                               for i in range(n_escritores)], erros)
+    parar.set()
+    for th in leitores:
+        th.join()
+    segundos = time.perf_counter() - inicio
+
+    # Uma thread que morreu (inclusive por um assert do escritor) falha o teste
+    if erros:
+        raise AssertionError(f"{len(erros)} erro(s) nas threads: {erros[:5]}")
+    esperadas = sorted(set().union(*presentes))
+    assert list(tree.range()) == esperadas, "conteúdo final diferente do esperado"
+    verificar_estrutura(tree)
+    print(f"estresse ok ({args.arvore}): {n_escritores} escritores x {args.ops} ops, {args.leitores} leitores, "
+          f"{len(esperadas)} chaves no fim, {segundos:.1f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Árvores B+ concorrentes: vazão e teste de estresse.")
+    parser.add_argument("--n", type=int, default=50000, help="chaves pré-carregadas")
+    parser.add_argument("--t", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=20000, help="operações por thread")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--leituras", type=float, default=0.7, help="fração de buscas")
+    parser.add_argument("--varreduras", type=float, default=0.1, help="fração de varreduras de 20 chaves")
+    parser.add_argument("--estresse", action="store_true", help="roda o teste de estresse")
+    parser.add_argument("--leitores", type=int, default=4, help="threads leitoras no teste de estresse")
+    parser.add_argument("--arvore", choices=list(CONCORRENTES), default="crabbing",
+                        help="árvore usada no teste de estresse")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    if args.estresse:
+        estresse(args)
+    else:
+        benchmark(args)
+
+
+if __name__ == "__main__":
+    main()
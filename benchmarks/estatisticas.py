@@ -0,0 +1,67 @@
+# benchmarks/estatisticas.py
+#
+# Medidas estruturais comuns aos benchmarks: altura, quantidade de nós e
+# preenchimento médio, para qualquer uma das três árvores, e a conferência
+# de que nenhum nó passou da capacidade.
+
+
+def _filhos(node):
+    return getattr(node, 'children', getattr(node, 'filhos', []))
+
+
+def conferir_capacidade(tree):
+    """Falha se algum nó tem mais de 2t-1 chaves ou, com capacidade em bytes,
+    mais de bytes_por_no bytes: resultados de uma árvore assim não valem."""
+    capacidade_bytes = getattr(tree, 'capacidade', None)
+    pilha = [tree.raiz]
+    while pilha:
+        node = pilha.pop()
+        if capacidade_bytes is not None:
+            tamanho = capacidade_bytes.tamanho(node.keys, node.folha)
+            if tamanho > capacidade_bytes.bytes_por_no:
+                raise AssertionError(f"{type(tree).__name__}: nó com {tamanho} bytes, acima da capacidade "
+                                     f"de {capacidade_bytes.bytes_por_no}")
+        elif len(node.keys) > 2 * tree.t - 1:
+            raise AssertionError(f"{type(tree).__name__}: nó com {len(node.keys)} chaves, acima do máximo "
+                                 f"de {2 * tree.t - 1}")
+        if not node.folha:
+            pilha.extend(_filhos(node))
+
+
+def estatisticas_arvore(tree):
+    """Retorna altura, nós, chaves, fanout médio dos nós internos e
+    preenchimento médio (chaves / 2t-1, ou bytes / bytes_por_no quando a
+    capacidade é em bytes)."""
+    capacidade_bytes = getattr(tree, 'capacidade', None)
+    capacidade = 2 * tree.t - 1
+    nos = 0
+    chaves = 0
+    ocupado = 0
+    internos = 0
+    filhos = 0
+    altura = 0
+    nivel = [tree.raiz]
+    while nivel:
+        altura += 1
+        proximo = []
+        for node in nivel:
+            nos += 1
+            chaves += len(node.keys)
+            if capacidade_bytes is not None:
+                ocupado += capacidade_bytes.tamanho(node.keys, node.folha)
+            if not node.folha:
+                internos += 1
+                filhos += len(_filhos(node))
+                proximo.extend(_filhos(node))
+        nivel = proximo
+    if capacidade_bytes is not None:
+        preenchimento = ocupado / (nos * capacidade_bytes.bytes_por_no) if nos else 0.0
+    else:
+        preenchimento = chaves / (nos * capacidade) if nos else 0.0
+    return {
+        'altura': altura,
+        'nos': nos,
+        'chaves': chaves,
+        'fanout': filhos / internos if internos else 0.0,
+        'preenchimento': preenchimento,
+    }
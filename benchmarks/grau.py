@@ -0,0 +1,78 @@
+# benchmarks/grau.py
+#
+# Custo por operação em função do grau t. Mostra o efeito da busca binária
+# dentro dos nós: com t grande, uma varredura linear custaria O(t) por nível.
+#
+#   python -m benchmarks.grau --n 50000 --graus 2 8 32 128 512
+
+import argparse
+import random
+import time
+
+from Btree import BTree
+from BStarTree import BStarTree
+from BPlusTree import BPlusTree
+from benchmarks.estatisticas import conferir_capacidade
+
+ARVORES = (("B", BTree), ("B*", BStarTree), ("B+", BPlusTree))
+
+
+def _busca_linear(tree, key):
+    # Referência: a mesma descida, mas com a varredura linear antiga em cada nó.
+    bplus = isinstance(tree, BPlusTree)
+    node = tree.raiz
+    while True:
+        i = 0
+        while i < len(node.keys) and key > node.keys[i]:
+            i += 1
+        achou = i < len(node.keys) and node.keys[i] == key
+        if node.folha or (achou and not bplus):
+            return achou
+        if achou:
+            # Na B+ a chave igual ao separador fica na subárvore da direita
+            i += 1
+        node = node.children[i] if bplus else node.filhos[i]
+
+
+def _cronometrar(fn, chaves):
+    inicio = time.perf_counter()
+    for k in chaves:
+        fn(k)
+    return (time.perf_counter() - inicio) / len(chaves) * 1e6
+
+
+def medir(tree_class, t, chaves, consultas):
+    tree = tree_class(t=t)
+    disk_counter = {'reads': 0, 'writes': 0}
+    insere = _cronometrar(lambda k: tree.insere(k, disk_counter), chaves)
+    leituras_insercao = disk_counter['reads'] / len(chaves)
+    conferir_capacidade(tree)
+    busca = _cronometrar(tree.busca, consultas)
+    linear = _cronometrar(lambda k: _busca_linear(tree, k), consultas)
+    remove = _cronometrar(tree.remover, chaves)
+    return insere, busca, linear, remove, leituras_insercao
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Custo por operação (µs) conforme t cresce.")
+    parser.add_argument("--n", type=int, default=50000, help="quantidade de chaves")
+    parser.add_argument("--graus", type=int, nargs="+", default=[3, 8, 32, 64, 128, 256, 512])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rnd = random.Random(args.seed)
+    chaves = list(range(args.n))
+    rnd.shuffle(chaves)
+    consultas = rnd.sample(chaves, min(len(chaves), 20000))
+
+    print(f"{'árvore':<7}{'t':>5}{'insere':>10}{'busca':>10}{'linear':>10}{'remove':>10}{'leit/ins':>10}")
+    for nome, tree_class in ARVORES:
+        for t in args.graus:
+            if tree_class is BStarTree and t < 3:
+                continue
+            insere, busca, linear, remove, leituras = medir(tree_class, t, chaves, consultas)
+            print(f"{nome:<7}{t:>5}{insere:>10.2f}{busca:>10.2f}{linear:>10.2f}{remove:>10.2f}{leituras:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/historico.py
+#
+# Saltos na linha do tempo (ver Historico.py): grava n operações (inserções
+# e remoções aleatórias) num Historico e mede saltos para posições
+# aleatórias, para cada intervalo entre checkpoints em --a-cada. Mostra a
+# latência dos saltos (p50/p99/máx), as operações reaplicadas no pior caso e
+# a memória dos checkpoints, contra reaplicar o log desde a árvore vazia.
+#
+#   python -m benchmarks.historico --arvore B+ --n 50000 --a-cada 64 256 1024
+
+import argparse
+import random
+import time
+
+from Btree import BTree
+from BStarTree import BStarTree
+from BPlusTree import BPlusTree
+from BLinkTree import BLinkTree
+from Historico import Historico
+
+ARVORES = {"B": BTree, "B*": BStarTree, "B+": BPlusTree, "B-link": BLinkTree}
+
+
+def percentil(ordenados, p):
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latência de saltos no histórico com checkpoints.")
+    parser.add_argument("--arvore", choices=list(ARVORES), default="B+")
+    parser.add_argument("--n", type=int, default=50000, help="operações gravadas")
+    parser.add_argument("--t", type=int, default=3)
+    parser.add_argument("--a-cada", type=int, nargs="+", default=[64, 256, 1024])
+    parser.add_argument("--max-checkpoints", type=int, default=1024)
+    parser.add_argument("--saltos", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rnd = random.Random(args.seed)
+    operacoes = [("insere" if rnd.random() < 0.7 else "remover", rnd.randrange(args.n)) for _ in range(args.n)]
+    destinos = [rnd.randrange(args.n + 1) for _ in range(args.saltos)]
+    classe = ARVORES[args.arvore]
+    fabrica = lambda: classe(t=args.t)
+
+    print(f"{'a_cada':>8}{'gravar s':>10}{'p50 ms':>9}{'p99 ms':>9}{'máx ms':>9}{'reaplicadas':>13}"
+          f"{'checkpoints':>13}{'chaves':>12}")
+    for a_cada in args.a_cada:
+        historico = Historico(fabrica(), fabrica, a_cada, args.max_checkpoints)
+        inicio = time.perf_counter()
+        for op, k in operacoes:
+            historico.executar(op, k)
+        gravar = time.perf_counter() - inicio
+        latencias = []
+        pior = 0
+        for n in destinos:
+            inicio = time.perf_counter()
+            historico.ir_para(n)
+            latencias.append((time.perf_counter() - inicio) * 1e3)
+            pior = max(pior, historico.ultimo_salto[1])
+        latencias.sort()
+        memoria = historico.memoria()
+        print(f"{memoria['a_cada']:>8}{gravar:>10.2f}{percentil(latencias, 50):>9.2f}{percentil(latencias, 99):>9.2f}"
+              f"{latencias[-1]:>9.2f}{pior:>13}{memoria['checkpoints']:>13}{memoria['chaves_em_checkpoints']:>12}")
+
+    # Sem checkpoints: cada salto reaplica o log desde o início
+    latencias = []
+    for n in destinos[:20]:
+        inicio = time.perf_counter()
+        tree = fabrica()
+        for op, k in operacoes[:n]:
+            getattr(tree, op)(k)
+        latencias.append((time.perf_counter() - inicio) * 1e3)
+    latencias.sort()
+    print(f"\nreaplicando desde a árvore vazia ({len(latencias)} saltos): p50 {percentil(latencias, 50):.2f} ms, "
+          f"máx {latencias[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
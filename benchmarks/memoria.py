@@ -0,0 +1,70 @@
+# benchmarks/memoria.py
+#
+# Bytes por chave (tracemalloc) de cada árvore em três representações:
+#
+#   dict    nós com __dict__ por instância e chaves em lista (a representação
+#           antiga, recriada aqui a partir da classe atual sem __slots__)
+#   slots   nós com __slots__, chaves em lista
+#   array   nós com __slots__, chaves em array('q') (compacta=True)
+#
+# As chaves são geradas durante a construção, então o custo dos objetos int
+# guardados nas listas entra na conta, como numa árvore real.
+#
+#   python -m benchmarks.memoria --n 200000 --t 16
+
+import argparse
+import tracemalloc
+import types
+
+from Btree import BTree, BTreeNode
+from BStarTree import BStarTree, BStarTreeNode
+from BPlusTree import BPlusTree, BPlusTreeNode
+
+ARVORES = (("B", BTree, BTreeNode), ("B*", BStarTree, BStarTreeNode), ("B+", BPlusTree, BPlusTreeNode))
+
+
+def _classe_com_dict(node_class):
+    # Mesmos métodos, sem __slots__: cada nó volta a ter um __dict__
+    atributos = {nome: valor for nome, valor in vars(node_class).items()
+                 if nome != '__slots__' and not isinstance(valor, types.MemberDescriptorType)}
+    return type(node_class.__name__ + 'ComDict', (), atributos)
+
+
+def _arvore_com_dict(tree_class, node_class):
+    classe_no = _classe_com_dict(node_class)
+
+    def _novo_no(self, folha):
+        return classe_no(self.t, folha)
+
+    return type(tree_class.__name__ + 'ComDict', (tree_class,), {'_novo_no': _novo_no})
+
+
+def medir(fabrica, t, n):
+    tracemalloc.start()
+    tree = fabrica(t=t)
+    for i in range(n):
+        # Permutação de 0..2^32-1: chaves distintas, fora do cache de ints pequenos
+        tree.insere((i * 2654435761) % 2 ** 32)
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tree
+    return atual / n
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memória por chave: __dict__ x __slots__ x array('q').")
+    parser.add_argument("--n", type=int, default=200000)
+    parser.add_argument("--t", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    print(f"{'árvore':<7}{'dict':>10}{'slots':>10}{'array':>10}{'economia':>10}")
+    for nome, tree_class, node_class in ARVORES:
+        com_dict = medir(_arvore_com_dict(tree_class, node_class), args.t, args.n)
+        slots = medir(tree_class, args.t, args.n)
+        compacta = medir(lambda t: tree_class(t=t, compacta=True), args.t, args.n)
+        print(f"{nome:<7}{com_dict:>10.1f}{slots:>10.1f}{compacta:>10.1f}{1 - compacta / com_dict:>10.0%}")
+    print("(bytes por chave)")
+
+
+if __name__ == "__main__":
+    main()
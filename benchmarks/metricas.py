@@ -0,0 +1,83 @@
+# benchmarks/metricas.py
+#
+# Eventos estruturais (ver Metricas.py) de uma carga: n inserções em ordem
+# aleatória seguidas de n/2 remoções. Mostra, por operação, o total de
+# splits, fusões, empréstimos e redistribuições, a distribuição de splits por
+# inserção (as inserções que dividem dois ou mais nós são os splits em
+# cascata) com a latência média de cada grupo, e a altura ao longo da carga.
+# Com --formato json ou prometheus imprime as métricas completas nesse
+# formato em vez do resumo.
+#
+#   python -m benchmarks.metricas --arvore B+ --n 100000 --t 8
+#   python -m benchmarks.metricas --arvore B* --formato prometheus > metricas.prom
+
+import argparse
+import random
+import time
+
+from Btree import BTree
+from BStarTree import BStarTree
+from BPlusTree import BPlusTree
+from BLinkTree import BLinkTree
+from Metricas import EVENTOS, Metricas
+
+ARVORES = {"B": BTree, "B*": BStarTree, "B+": BPlusTree, "B-link": BLinkTree}
+
+
+def rodar(tree, chaves, remocoes):
+    """Executa a carga através de um Metricas; retorna ele e, para cada
+    inserção, (splits, latência em µs)."""
+    metricas = Metricas(tree)
+    insercoes = []
+    por_insercao = metricas.operacoes
+    for k in chaves:
+        antes = por_insercao['insere'].eventos['split'] if 'insere' in por_insercao else 0
+        inicio = time.perf_counter_ns()
+        metricas.executar('insere', k)
+        us = (time.perf_counter_ns() - inicio) / 1e3
+        insercoes.append((por_insercao['insere'].eventos['split'] - antes, us))
+    for k in remocoes:
+        metricas.executar('remover', k)
+    return metricas, insercoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Splits, fusões, empréstimos e altura de uma carga.")
+    parser.add_argument("--arvore", choices=list(ARVORES), default="B+")
+    parser.add_argument("--n", type=int, default=50000, help="inserções (e n/2 remoções)")
+    parser.add_argument("--t", type=int, default=4)
+    parser.add_argument("--formato", choices=("resumo", "json", "prometheus"), default="resumo")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rnd = random.Random(args.seed)
+    chaves = list(range(args.n))
+    rnd.shuffle(chaves)
+    remocoes = rnd.sample(chaves, args.n // 2)
+    metricas, insercoes = rodar(ARVORES[args.arvore](t=args.t), chaves, remocoes)
+
+    if args.formato == "json":
+        print(metricas.para_json(indent=2))
+        return
+    if args.formato == "prometheus":
+        print(metricas.para_prometheus(), end="")
+        return
+
+    print(f"{'operação':<10}{'total':>9}" + "".join(f"{e:>16}" for e in EVENTOS))
+    for op, por_op in metricas.operacoes.items():
+        print(f"{op:<10}{por_op.total:>9}" + "".join(f"{por_op.eventos[e]:>16}" for e in EVENTOS))
+
+    print("\nsplits por inserção   inserções   latência média µs")
+    grupos = {}
+    for splits, us in insercoes:
+        grupos.setdefault(splits, []).append(us)
+    for splits in sorted(grupos):
+        latencias = grupos[splits]
+        print(f"{splits:>19}{len(latencias):>12}{sum(latencias) / len(latencias):>20.2f}")
+
+    print("\naltura ao longo da carga (operação: altura): "
+          + ", ".join(f"{n}: {h}" for n, h in metricas.alturas))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/paginas.py
+#
+# Compara a contagem simulada de acessos a disco da BPlusTree com as
+# páginas realmente lidas e gravadas pela BPlusTreePaginada, e mostra a taxa
+# de acerto do buffer pool. A fase 'zipf' repete buscas com distribuição
+# enviesada, onde os níveis de cima e as chaves quentes ficam no cache.
+# --grupo controla quantas operações dividem um fsync do WAL (1 = um fsync
+# por inserção/remoção).
+#
+#   python -m benchmarks.paginas --n 20000 --t 32 --cache 64 --politica clock --grupo 64
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from BPlusTreePaginada import BPlusTreePaginada
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="I/O simulado x I/O real na Árvore B+ paginada.")
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--t", type=int, default=32)
+    parser.add_argument("--pagina", type=int, default=4096, help="tamanho da página em bytes")
+    parser.add_argument("--arquivo", default=None, help="arquivo de páginas (padrão: temporário)")
+    parser.add_argument("--cache", type=int, default=64, help="páginas no buffer pool")
+    parser.add_argument("--politica", choices=("lru", "clock"), default="lru")
+    parser.add_argument("--grupo", type=int, default=64, help="operações por fsync do WAL (commit em grupo)")
+    parser.add_argument("--sem-wal", action="store_true", help="desativa o WAL")
+    parser.add_argument("--zipf", type=float, default=1.2, help="expoente da distribuição das buscas enviesadas")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    caminho = args.arquivo or os.path.join(tempfile.mkdtemp(), "arvore.db")
+    if os.path.exists(caminho):
+        os.remove(caminho)
+    rnd = random.Random(args.seed)
+    chaves = list(range(args.n))
+    rnd.shuffle(chaves)
+    # Chaves quentes espalhadas pela árvore, não concentradas numa folha
+    enviesadas = [chaves[int(rnd.paretovariate(args.zipf)) % args.n] for _ in range(args.n)]
+
+    print(f"{'fase':<10}{'seg':>8}{'leit. sim':>11}{'leit. real':>12}{'escr. sim':>11}{'escr. real':>12}"
+          f"{'acerto':>9}")
+    with BPlusTreePaginada(caminho, t=args.t, tamanho_pagina=args.pagina, paginas_em_cache=args.cache,
+                           politica=args.politica, wal=not args.sem_wal, grupo_commit=args.grupo) as tree:
+        fases = (
+            ("insere", chaves, lambda k, dc: tree.insere(k, dc)),
+            ("busca", chaves, lambda k, dc: tree.busca(k, dc)),
+            ("zipf", enviesadas, lambda k, dc: tree.busca(k, dc)),
+            ("remove", chaves, lambda k, dc: tree.remover(k, dc)),
+        )
+        for nome, entrada, operacao in fases:
+            simulado = dict(tree.simulado)
+            real = {'reads': 0, 'writes': 0}
+            inicio = time.perf_counter()
+            for k in entrada:
+                operacao(k, real)
+            segundos = time.perf_counter() - inicio
+            logicas = real.get('hits', 0) + real.get('misses', 0)
+            acerto = real.get('hits', 0) / logicas if logicas else 0.0
+            print(f"{nome:<10}{segundos:>8.2f}{tree.simulado['reads'] - simulado['reads']:>11}{real['reads']:>12}"
+                  f"{tree.simulado['writes'] - simulado['writes']:>11}{real['writes']:>12}{acerto:>9.1%}")
+        print(f"páginas no arquivo: {tree.arquivo.total_paginas} ({caminho})")
+        if tree.wal:
+            print(f"WAL: {tree.wal.estatisticas['registros']} registros, {tree.wal.estatisticas['fsyncs']} fsyncs")
+
+
+if __name__ == "__main__":
+    main()
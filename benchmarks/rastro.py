@@ -0,0 +1,68 @@
+# benchmarks/rastro.py
+#
+# Grava o trace de uma carga em JSONL (ver Rastro.py) sem interface gráfica,
+# para abrir depois com o botão "Abrir trace" do visualizador. Mostra o custo
+# da gravação: a mesma carga sem trace, em modo trace com um callback que
+# não faz nada e com o RastroJSONL gravando o arquivo.
+#
+#   python -m benchmarks.rastro --arvore B+ --n 5000 --saida trace.jsonl
+
+import argparse
+import os
+import random
+import time
+
+from Btree import BTree
+from BStarTree import BStarTree
+from BPlusTree import BPlusTree
+from BLinkTree import BLinkTree
+from Rastro import RastroJSONL
+
+ARVORES = {"B": BTree, "B*": BStarTree, "B+": BPlusTree, "B-link": BLinkTree}
+
+
+def gerar_operacoes(n, seed):
+    rnd = random.Random(seed)
+    return [(rnd.choice(("insere", "insere", "remover", "busca")), rnd.randrange(2 * n)) for _ in range(n)]
+
+
+def _sem_trace(tree, operacoes):
+    for op, k in operacoes:
+        getattr(tree, op)(k)
+
+
+def _callback_vazio(tree, operacoes):
+    vazio = lambda message, path, disk_counter: None
+    for op, k in operacoes:
+        getattr(tree, f"{op}_com_trace")(k, vazio)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grava o trace de uma carga em JSONL e mede o custo.")
+    parser.add_argument("--arvore", choices=list(ARVORES), default="B+")
+    parser.add_argument("--n", type=int, default=5000, help="operações")
+    parser.add_argument("--t", type=int, default=3)
+    parser.add_argument("--saida", default="trace.jsonl")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    operacoes = gerar_operacoes(args.n, args.seed)
+    classe = ARVORES[args.arvore]
+    print(f"{'modo':<16}{'segundos':>10}{'µs/op':>10}")
+    for nome, rodar in (("sem trace", _sem_trace), ("callback vazio", _callback_vazio)):
+        inicio = time.perf_counter()
+        rodar(classe(t=args.t), operacoes)
+        segundos = time.perf_counter() - inicio
+        print(f"{nome:<16}{segundos:>10.2f}{segundos / args.n * 1e6:>10.1f}")
+
+    inicio = time.perf_counter()
+    with RastroJSONL(classe(t=args.t), args.saida) as rastro:
+        for op, k in operacoes:
+            rastro.executar(op, k)
+    segundos = time.perf_counter() - inicio
+    print(f"{'RastroJSONL':<16}{segundos:>10.2f}{segundos / args.n * 1e6:>10.1f}")
+    print(f"\n{args.saida}: {os.path.getsize(args.saida) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
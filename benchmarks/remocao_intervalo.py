@@ -0,0 +1,48 @@
+# benchmarks/remocao_intervalo.py
+#
+# Expiração por TTL na Árvore B+: as chaves são instantes crescentes e, a cada
+# rodada, as --janela chaves mais antigas expiram. Compara uma chamada a
+# remover por chave com uma chamada a remove_range por rodada (tempo, leituras
+# e escritas do disk_counter) e confere que as duas árvores ficam iguais.
+#
+#   python -m benchmarks.remocao_intervalo --n 200000 --t 16 --janela 5000
+
+import argparse
+import time
+
+from BPlusTree import BPlusTree
+from benchmarks.estatisticas import estatisticas_arvore
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Remoção chave a chave x remove_range (expiração por TTL).")
+    parser.add_argument("--n", type=int, default=200000)
+    parser.add_argument("--t", type=int, default=16)
+    parser.add_argument("--janela", type=int, default=5000, help="chaves que expiram por rodada")
+    parser.add_argument("--rodadas", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    print(f"{'método':<16}{'seg':>9}{'leituras':>11}{'escritas':>11}{'escr/chave':>12}{'altura':>8}{'nós':>9}")
+    arvores = []
+    for nome in ("remover x k", "remove_range"):
+        tree = BPlusTree.construir_em_massa(range(args.n), t=args.t, fator_preenchimento=0.7)
+        disk_counter = {'reads': 0, 'writes': 0}
+        removidas = 0
+        inicio = time.perf_counter()
+        for rodada in range(args.rodadas):
+            lo, hi = rodada * args.janela, (rodada + 1) * args.janela
+            if nome == "remove_range":
+                removidas += tree.remove_range(lo, hi, disk_counter=disk_counter)
+            else:
+                for k in range(lo, hi):
+                    removidas += tree.delete(k, disk_counter)
+        segundos = time.perf_counter() - inicio
+        est = estatisticas_arvore(tree)
+        print(f"{nome:<16}{segundos:>9.3f}{disk_counter['reads']:>11}{disk_counter['writes']:>11}"
+              f"{disk_counter['writes'] / max(1, removidas):>12.3f}{est['altura']:>8}{est['nos']:>9}")
+        arvores.append(list(tree.range()))
+    assert arvores[0] == arvores[1], "as duas remoções deixaram conteúdos diferentes"
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,14 @@ import tkinter as tk
 from Btree import BTree
 from BStarTree import BStarTree
 from BPlusTree import BPlusTree
+from BLinkTree import BLinkTree
 from TreeVisualizerGUI import TreeVisualizerGUI
 
 class AppSelector:
     def __init__(self, master):
         self.master = master
         self.master.title("Seletor de Visualizador de Árvore")
-        self.master.geometry("400x250")
+        self.master.geometry("400x290")
 
         label = tk.Label(master, text="Escolha qual tipo de árvore você deseja visualizar:", font=("Helvetica", 12))
         label.pack(pady=20)
@@ -24,6 +25,9 @@ class AppSelector:
         bplustree_button = tk.Button(master, text="Árvore B+ (t=3)", command=self.launch_bplustree, font=("Helvetica", 10), bg="#9ACD32")
         bplustree_button.pack(pady=5, fill=tk.X, padx=50)
 
+        blinktree_button = tk.Button(master, text="Árvore B-link (t=3)", command=self.launch_blinktree, font=("Helvetica", 10), bg="#AFEEEE")
+        blinktree_button.pack(pady=5, fill=tk.X, padx=50)
+
 
     def launch_btree(self):
         self.master.destroy()
@@ -46,6 +50,13 @@ class AppSelector:
         TreeVisualizerGUI(root, BPlusTree, "Árvore B+", t_param=3, colors=colors)
         root.mainloop()
 
+    def launch_blinktree(self):
+        self.master.destroy()
+        root = tk.Tk()
+        colors = {'fill': '#AFEEEE', 'outline': 'teal', 'status': 'teal'}
+        TreeVisualizerGUI(root, BLinkTree, "Árvore B-link", t_param=3, colors=colors)
+        root.mainloop()
+
 
 if __name__ == "__main__":
     root = tk.Tk()